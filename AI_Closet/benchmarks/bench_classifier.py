@@ -0,0 +1,66 @@
+"""
+Images/sec of the batched CPU classifier vs the notebook's one-image-at-a-time loop.
+
+Runs with random weights unless --weights is given (speed doesn't depend on them).
+
+Usage:
+    python benchmarks/bench_classifier.py --n 64 --batch-size 32 --workers 2 --threads 4
+"""
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import argparse
+import tempfile
+import time
+
+import torch
+from PIL import Image
+
+from bench_tagger import make_images
+from src.vision.classifier import TRANSFORM, classify_images, load_model
+
+
+def notebook_loop(paths, model):
+    """extract_features from image_tagger.ipynb: open, transform, forward with batch size 1."""
+    out = []
+    for p in paths:
+        tensor = TRANSFORM(Image.open(p).convert("RGB")).unsqueeze(0)
+        with torch.no_grad():
+            probs = torch.softmax(model(tensor), dim=1)
+        out.append(torch.topk(probs, 5))
+    return out
+
+
+def rate(fn, n):
+    t0 = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - t0)
+
+
+def main(n: int, size: int, arch: str, weights: str | None, batch_size: int, workers: int, threads: int | None):
+    if threads:
+        torch.set_num_threads(threads)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_images(tmp, n, size)
+        print(f"images: {n} ({size}x{size} JPEG), {arch}, {torch.get_num_threads()} threads")
+        plain = load_model(weights, arch)
+        quant = load_model(weights, arch, quantize=True)
+        print(f"{'notebook loop (bs=1)':>28}: {rate(lambda: notebook_loop(paths, plain), n):7.1f} img/s")
+        for label, model in (("batched", plain), ("batched + int8 dynamic", quant)):
+            run = lambda: list(classify_images(paths, model, batch_size=batch_size, num_workers=workers))
+            print(f"{label:>28}: {rate(run, n):7.1f} img/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=64)
+    parser.add_argument("--size", type=int, default=800)
+    parser.add_argument("--arch", default="resnet50")
+    parser.add_argument("--weights", default=None)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+    main(args.n, args.size, args.arch, args.weights, args.batch_size, args.workers, args.threads)
@@ -0,0 +1,67 @@
+"""
+Time query_items / list_items against a synthetic wardrobe DB.
+
+Usage:
+    python benchmarks/bench_db.py --items 500000
+"""
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import argparse
+import random
+import tempfile
+import time
+
+from src.db.db import init_db, add_items, list_items, query_items
+
+TYPES = ["top", "bottom", "outerwear", "shoes", "unknown"]
+SEASONS = ["spring", "summer", "fall", "winter", None]
+
+
+def synthetic_rows(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(n):
+        rgb = ",".join(str(rng.randrange(256)) for _ in range(3))
+        yield (f"item_{i}.jpg", rng.choice(TYPES), f"rgb({rgb})", None,
+               rng.choice(SEASONS), rng.randrange(6), None)
+
+
+def timed(label: str, fn, repeat: int = 50):
+    fn()  # warm page cache
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    ms = 1000 * (time.perf_counter() - t0) / repeat
+    print(f"{label:<50} {ms:8.3f} ms  ({len(out)} rows)")
+
+
+def main(n: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "wardrobe.db")
+        init_db(db)
+        t0 = time.perf_counter()
+        add_items(synthetic_rows(n), db_path=db)
+        print(f"inserted {n} items in {time.perf_counter() - t0:.1f}s")
+
+        import src.db.db as dbmod
+        dbmod.DEFAULT_DB = db  # list_items always uses the default DB
+
+        deep = n // 2
+        timed("list_items(limit=200)", lambda: list_items(limit=200))
+        timed("query_items(type='top')", lambda: query_items(type="top", db_path=db))
+        timed("query_items(type='top', after_id=n/2)", lambda: query_items(type="top", after_id=deep, db_path=db))
+        timed("query_items(type, season)", lambda: query_items(type="bottom", season="winter", db_path=db))
+        timed("query_items(formality_range=(4, 5))", lambda: query_items(formality_range=(4, 5), db_path=db))
+        timed("query_items(type='top', formality 4-5, after_id)",
+              lambda: query_items(type="top", formality_range=(4, 5), after_id=deep, db_path=db))
+        timed("query_items(type=[top,bottom], formality 2-3)",
+              lambda: query_items(type=["top", "bottom"], formality_range=(2, 3), db_path=db))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=500_000)
+    args = parser.parse_args()
+    main(args.items)
@@ -0,0 +1,102 @@
+"""
+Read/write throughput of the DB layer under N concurrent threads.
+
+Compares the pooled, WAL-tuned connections in src/db/db.py against opening a
+fresh default sqlite3 connection per operation (the old get_conn behavior).
+
+Usage:
+    python benchmarks/bench_db_concurrency.py --threads 1 4 16 --seconds 3
+"""
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import argparse
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+import src.db.db as db
+from bench_db import synthetic_rows
+
+INSERT = "INSERT INTO items(filename, type, dominant_color) VALUES(?,?,?)"
+READ = f"{db.ITEM_SELECT} WHERE type = ? ORDER BY id DESC LIMIT 50"
+
+
+def naive_read(path):
+    conn = sqlite3.connect(path, timeout=5)
+    try:
+        return conn.execute(READ, ("top",)).fetchall()
+    finally:
+        conn.close()
+
+
+def naive_write(path):
+    conn = sqlite3.connect(path, timeout=5)
+    try:
+        with conn:
+            conn.execute(INSERT, ("new.jpg", "top", "rgb(1,2,3)"))
+    finally:
+        conn.close()
+
+
+def pooled_read(path):
+    return db.read_conn(path).execute(READ, ("top",)).fetchall()
+
+
+def pooled_write(path):
+    with db.write_conn(path) as conn:
+        conn.execute(INSERT, ("new.jpg", "top", "rgb(1,2,3)"))
+
+
+def run(path, read_fn, write_fn, threads: int, seconds: float, write_ratio: float):
+    stop = time.perf_counter() + seconds
+    counts = {"read": 0, "write": 0, "error": 0}
+    lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local = {"read": 0, "write": 0, "error": 0}
+        while time.perf_counter() < stop:
+            kind = "write" if rng.random() < write_ratio else "read"
+            try:
+                (write_fn if kind == "write" else read_fn)(path)
+                local[kind] += 1
+            except sqlite3.OperationalError:  # "database is locked"
+                local["error"] += 1
+        with lock:
+            for k, v in local.items():
+                counts[k] += v
+
+    ts = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    return {k: v / seconds for k, v in counts.items()}
+
+
+def main(thread_counts, seconds: float, items: int, write_ratio: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "wardrobe.db")
+        db.init_db(path)
+        db.add_items(synthetic_rows(items), db_path=path)
+        print(f"{'mode':<8}{'threads':>8}{'reads/s':>12}{'writes/s':>12}{'errors/s':>12}")
+        for n in thread_counts:
+            for mode, (r, w) in {"naive": (naive_read, naive_write), "pooled": (pooled_read, pooled_write)}.items():
+                res = run(path, r, w, n, seconds, write_ratio)
+                print(f"{mode:<8}{n:>8}{res['read']:>12,.0f}{res['write']:>12,.0f}{res['error']:>12,.1f}")
+        db.close_all()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+    main(args.threads, args.seconds, args.items, args.write_ratio)
@@ -0,0 +1,73 @@
+"""
+Similar-item lookups on a synthetic memory-mapped embedding store: exact scan vs IVF vs IVF-PQ.
+
+Usage:
+    python benchmarks/bench_embeddings.py --rows 1000000 --dim 256
+(the matrix file takes rows * dim * 2 bytes in a temp dir)
+"""
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+import src.db.db as db
+from src.vision.embeddings import EmbeddingStore
+
+
+def fill(store: EmbeddingStore, rows: int, dim: int, clusters: int = 2000, chunk: int = 100_000, seed: int = 0):
+    """Clustered random vectors, written in chunks so RAM stays bounded."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    for start in range(0, rows, chunk):
+        n = min(chunk, rows - start)
+        x = centers[rng.integers(0, clusters, n)] + 0.5 * rng.normal(size=(n, dim)).astype(np.float32)
+        store.add(range(start + 1, start + n + 1), x)
+
+
+def bench(store: EmbeddingStore, queries, exact: bool, k: int = 10):
+    t0 = time.perf_counter()
+    results = [store.similar(q, k, exact=exact) for q in queries]
+    return (time.perf_counter() - t0) / len(queries), results
+
+
+def recall(approx, exact):
+    hits = sum(len({i for i, _ in a} & {i for i, _ in e}) for a, e in zip(approx, exact))
+    return hits / max(1, sum(len(e) for e in exact))
+
+
+def main(rows: int, dim: int, n_queries: int, pq_m: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "wardrobe.db")
+        db.init_db(db_path)
+        store = EmbeddingStore(dim=dim, path=os.path.join(tmp, "embeddings.f16"), db_path=db_path)
+        t0 = time.perf_counter()
+        fill(store, rows, dim)
+        print(f"filled {rows:,} x {dim} float16 rows in {time.perf_counter() - t0:.1f}s")
+        queries = np.random.default_rng(1).integers(1, rows + 1, n_queries).tolist()
+
+        exact_t, exact = bench(store, queries, exact=True)
+        print(f"{'exact scan':>12}: {exact_t * 1000:8.2f} ms/query")
+        for label, m in (("IVF", None), ("IVF-PQ", pq_m)):
+            t0 = time.perf_counter()
+            store.build_index(pq_m=m)
+            build = time.perf_counter() - t0
+            t, approx = bench(store, queries, exact=False)
+            print(f"{label:>12}: {t * 1000:8.2f} ms/query  recall@10 {recall(approx, exact):.2f}  (build {build:.1f}s)")
+        store.close()
+        db.close_all()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--pq-m", type=int, default=32, help="PQ sub-vectors (must divide --dim)")
+    args = parser.parse_args()
+    main(args.rows, args.dim, args.queries, args.pq_m)
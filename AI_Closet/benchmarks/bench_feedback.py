@@ -0,0 +1,51 @@
+"""
+Time the feedback-learned scorer: ranking N x N top/bottom pairs and one SGD update.
+
+Usage:
+    python benchmarks/bench_feedback.py --sizes 1000 3000
+"""
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import argparse
+import random
+import time
+
+from src.recommender.engine import contrast_score, top_k_pairs
+from src.recommender.feedback import FeedbackScorer
+from src.recommender.rules import Item
+
+
+def synthetic_items(n: int, type_: str, rng: random.Random):
+    return [Item(i, type_, "rgb({},{},{})".format(*(rng.randrange(256) for _ in range(3))),
+                 season=rng.choice([None, "spring", "summer", "fall", "winter"]),
+                 formality=rng.choice([None, 0, 1, 2, 3, 4, 5]))
+            for i in range(n)]
+
+
+def timed(fn, repeat: int):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main(sizes):
+    rng = random.Random(0)
+    scorer = FeedbackScorer()
+    print(f"{'pairs':>14}{'contrast':>12}{'learned':>12}{'update':>12}")
+    for n in sizes:
+        tops, bottoms = synthetic_items(n, "top", rng), synthetic_items(n, "bottom", rng)
+        base = timed(lambda: top_k_pairs(tops, bottoms, 10, contrast_score), 3)
+        learned = timed(lambda: top_k_pairs(tops, bottoms, 10, scorer.score_fn), 3)
+        update = timed(lambda: scorer.update([rng.choice(tops), rng.choice(bottoms)], rng.random() < 0.5), 200)
+        print(f"{n * n:>14,}{base * 1000:10.1f}ms{learned * 1000:10.1f}ms{update * 1e6:10.1f}us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 3000])
+    args = parser.parse_args()
+    main(args.sizes)
@@ -0,0 +1,76 @@
+"""
+Image path resolution: per-item filesystem probing (the old find_image_path) vs ImageIndex.
+
+Usage:
+    python benchmarks/bench_image_index.py --files 10000 --lookups 30
+"""
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import argparse
+import glob
+import random
+import tempfile
+import time
+
+from src.utils.image_index import ImageIndex
+
+ALLOWED_EXTS = {".jpg", ".jpeg", ".png"}
+
+
+def legacy_find_image_path(images_dir: str, filename: str) -> str | None:
+    """streamlit_app.find_image_path before the index: exists() probes, then a glob."""
+    if not filename:
+        return None
+    base, ext = os.path.splitext(filename)
+    direct = os.path.join(images_dir, filename)
+    if os.path.exists(direct):
+        return direct
+    for e in (ALLOWED_EXTS - {ext.lower()} if ext else ALLOWED_EXTS):
+        cand = os.path.join(images_dir, base + e)
+        if os.path.exists(cand):
+            return cand
+    for m in glob.glob(os.path.join(images_dir, base + ".*")):
+        if os.path.splitext(m)[1].lower() in ALLOWED_EXTS and os.path.exists(m):
+            return m
+    return None
+
+
+def main(files: int, lookups: int, pages: int):
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(files):
+            ext = rng.choice([".jpg", ".jpeg", ".png"])
+            open(os.path.join(tmp, f"item_{i:06d}{ext}"), "wb").close()
+        # DB filenames: a third have a stale extension, a few are missing from disk
+        names = [f"item_{rng.randrange(int(files * 1.05)):06d}{rng.choice(['.jpg', '.jpg', '.png'])}"
+                 for _ in range(lookups * pages)]
+
+        t0 = time.perf_counter()
+        legacy = [legacy_find_image_path(tmp, n) for n in names]
+        t_legacy = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        index = ImageIndex(tmp)
+        index.refresh(force=True)
+        t_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        fast = [index.resolve(n) for n in names]
+        t_index = time.perf_counter() - t0
+
+    assert [p is None for p in legacy] == [p is None for p in fast]
+    per_page = lambda t: 1000 * t / pages
+    print(f"{files} files, {pages} pages x {lookups} lookups")
+    print(f"{'probing':>10}: {per_page(t_legacy):8.3f} ms/page")
+    print(f"{'index':>10}: {per_page(t_index):8.3f} ms/page  (one-time scandir {t_build * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--lookups", type=int, default=30, help="Images per page")
+    parser.add_argument("--pages", type=int, default=100)
+    args = parser.parse_args()
+    main(args.files, args.lookups, args.pages)
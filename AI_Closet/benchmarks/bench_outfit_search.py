@@ -0,0 +1,53 @@
+"""
+Time the full-outfit beam search (top/bottom/shoes/outerwear) as the wardrobe grows.
+
+Usage:
+    python benchmarks/bench_outfit_search.py --sizes 1000 5000 20000
+"""
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import argparse
+import random
+import time
+
+from src.recommender.rules import Item
+from src.recommender.outfit_search import search_outfits
+
+
+def synthetic_wardrobe(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    items = []
+    for id_ in range(n):
+        rgb = ",".join(str(rng.randrange(256)) for _ in range(3))
+        items.append(Item(id_, rng.choice(["top", "bottom", "shoes", "outerwear"]), f"rgb({rgb})",
+                          season=rng.choice([None, "winter", "summer", "all"]),
+                          formality=rng.choice([None, 0, 1, 2, 3, 4, 5])))
+    return items
+
+
+def timed(fn, repeat: int):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main(sizes, k: int, beam_width: int):
+    contexts = {"open": {"temp_f": 55}, "work/winter": {"temp_f": 55, "occasion": "work", "season": "winter"}}
+    print(f"{'items':>10}" + "".join(f"{name:>16}" for name in contexts))
+    for n in sizes:
+        items = synthetic_wardrobe(n)
+        row = [timed(lambda: search_outfits(items, ctx, k=k, beam_width=beam_width), 5) for ctx in contexts.values()]
+        print(f"{n:>10}" + "".join(f"{t * 1000:14.1f}ms" for t in row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--beam-width", type=int, default=256)
+    args = parser.parse_args()
+    main(args.sizes, args.k, args.beam_width)
@@ -0,0 +1,95 @@
+"""
+Time rules.recommend (vectorized top-k engine) against the original nested loop.
+
+Usage:
+    python benchmarks/bench_recommend.py --sizes 1000 10000
+"""
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import argparse
+import random
+import time
+
+from src.recommender.rules import Item, recommend, basic_color_ok, is_cool
+from src.recommender.engine import contrast_score
+from src.recommender.index import WardrobeIndex
+
+
+def legacy_recommend(items, context):
+    """The pre-engine implementation: every pair in Python, slice at the end."""
+    tops = [i for i in items if i.type == "top"]
+    bottoms = [i for i in items if i.type == "bottom"]
+    outer = [i for i in items if i.type == "outerwear"]
+    recs = []
+    for t in tops:
+        for b in bottoms:
+            if not basic_color_ok(t.color, b.color):
+                continue
+            outfit = [t, b]
+            if is_cool(context.get("temp_f", 70)) and outer:
+                outfit.append(outer[0])
+            recs.append(outfit)
+    return recs[:10]
+
+
+def synthetic_items(n_each: int, seed: int = 0):
+    rng = random.Random(seed)
+    items = []
+    for kind in ("top", "bottom"):
+        for _ in range(n_each):
+            rgb = ",".join(str(rng.randrange(256)) for _ in range(3))
+            items.append(Item(len(items), kind, f"rgb({rgb})"))
+    items.append(Item(len(items), "outerwear", "rgb(90,60,30)"))
+    return items
+
+
+def timed(fn, repeat: int):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main(sizes, legacy_max: int):
+    ctx = {"temp_f": 55}
+    print(f"{'tops x bottoms':>16}{'legacy':>12}{'engine':>12}{'engine (ΔE)':>14}")
+    for n in sizes:
+        items = synthetic_items(n)
+        repeat = 3 if n >= 5000 else 10
+        legacy = f"{timed(lambda: legacy_recommend(items, ctx), 1) * 1000:10.1f}ms" if n <= legacy_max else f"{'skipped':>12}"
+        engine = timed(lambda: recommend(items, ctx), repeat)
+        scored = timed(lambda: recommend(items, ctx, score_fn=contrast_score), repeat)
+        print(f"{f'{n}x{n}':>16}{legacy}{engine * 1000:10.1f}ms{scored * 1000:12.1f}ms")
+
+
+def bench_index(sizes):
+    """Latency of one upload, recommend and a Regenerate sample on a WardrobeIndex as the wardrobe grows."""
+    ctx = {"temp_f": 55}
+    print(f"\n{'index items':>16}{'build':>12}{'add 1':>12}{'recommend':>12}{'sample 10':>12}")
+    for n in sizes:
+        items = synthetic_items(n // 2)
+        t0 = time.perf_counter()
+        index = WardrobeIndex()
+        for it in items:
+            index.add(it)
+        build = time.perf_counter() - t0
+        new = Item(len(items), "top", "rgb(250,250,250)")
+        add = timed(lambda: index.add(new), 100)
+        rec = timed(lambda: index.recommend(ctx), 100)
+        seeds = iter(range(1, 10**9))
+        sample = timed(lambda: index.sample(ctx, next(seeds)), 100)
+        print(f"{n:>16}{build:11.2f}s{add * 1e6:10.1f}us{rec * 1e6:10.1f}us{sample * 1e6:10.1f}us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--index-sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--legacy-max", type=int, default=2000,
+                        help="Skip the nested-loop baseline above this many tops (it is O(T*B) Python work)")
+    args = parser.parse_args()
+    main(args.sizes, args.legacy_max)
+    bench_index(args.index_sizes)
@@ -0,0 +1,72 @@
+"""
+Compare per-image throughput of extract_dominant_color vs extract_dominant_colors.
+
+Usage:
+    python benchmarks/bench_tagger.py --n 200 --size 1024
+"""
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from src.vision.tagger import extract_dominant_color, extract_dominant_colors
+
+
+def make_images(out_dir: str, n: int, size: int, seed: int = 0) -> list[str]:
+    """Write n synthetic JPEG 'garment' photos: a colored blob on a light background."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:size, 0:size]
+    paths = []
+    for i in range(n):
+        bg = rng.integers(200, 256, size=3)
+        fg = rng.integers(0, 256, size=3)
+        r = size * rng.uniform(0.25, 0.45)
+        mask = (yy - size / 2) ** 2 + (xx - size / 2) ** 2 < r ** 2
+        arr = np.where(mask[..., None], fg, bg).astype(np.uint8)
+        arr = np.clip(arr + rng.normal(0, 6, arr.shape), 0, 255).astype(np.uint8)
+        path = os.path.join(out_dir, f"img_{i:05d}.jpg")
+        Image.fromarray(arr).save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def main(n: int, size: int, batch_size: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_images(tmp, n, size)
+
+        t0 = time.perf_counter()
+        single = [extract_dominant_color(p) for p in paths]
+        t_single = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        batch = extract_dominant_colors(paths, batch_size=batch_size)
+        t_batch = time.perf_counter() - t0
+
+    def dist(a: str, b: str) -> float:
+        pa = np.array([int(x) for x in a[4:-1].split(",")])
+        pb = np.array([int(x) for x in b[4:-1].split(",")])
+        return float(np.linalg.norm(pa - pb))
+
+    diffs = [dist(a, b) for a, b in zip(single, batch)]
+    print(f"images: {n} ({size}x{size} JPEG)")
+    print(f"extract_dominant_color : {n / t_single:8.1f} img/s  ({1000 * t_single / n:.2f} ms/img)")
+    print(f"extract_dominant_colors: {n / t_batch:8.1f} img/s  ({1000 * t_batch / n:.2f} ms/img)")
+    print(f"speedup: {t_single / t_batch:.1f}x")
+    # Near 50/50 foreground/background splits can legitimately flip the winner
+    print(f"agreement with KMeans (distance <= 10): {np.mean(np.array(diffs) <= 10):.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=200, help="Number of synthetic images")
+    parser.add_argument("--size", type=int, default=1024, help="Image side length in pixels")
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+    main(args.n, args.size, args.batch_size)
@@ -0,0 +1,94 @@
+"""
+Time type classification of filenames / label lists: old nested any() scans vs taxonomy.classify_series.
+
+Usage:
+    python benchmarks/bench_taxonomy.py --n 1000000
+"""
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from src.utils.colab_postprocess import safe_parse_labels
+from src.utils.taxonomy import TYPE_KEYWORDS, classify_series
+
+WORDS = ["blue", "red", "vintage", "slim", "summer", "img", "wool", "denim"] + [
+    k.replace(" ", "_") for keys in TYPE_KEYWORDS.values() for k in keys]
+LABELS = ["jersey", "sweatshirt", "running shoe", "jean", "trench coat", "cardigan", "miniskirt", "bolo tie",
+          "mask", "sock", "Loafer", "pajama", "suit", "apron"]
+
+
+def legacy_from_name(filename: str) -> str:
+    """classify_type_from_name before the taxonomy module."""
+    name = filename.lower()
+    if any(k in name for k in ["hoodie", "sweater", "tee", "shirt", "top", "blouse"]):
+        return "top"
+    if any(k in name for k in ["jeans", "pants", "trouser", "skirt", "short"]):
+        return "bottom"
+    if any(k in name for k in ["jacket", "coat", "parka", "hoodie"]):
+        return "outerwear"
+    if any(k in name for k in ["sneaker", "shoe", "boot"]):
+        return "shoes"
+    return "unknown"
+
+
+LEGACY_LABEL_MAP = {
+    "top": ["shirt", "t-shirt", "tee", "sweatshirt", "sweater", "cardigan", "hoodie", "jersey", "blouse",
+            "pullover", "pajama", "flannel"],
+    "bottom": ["jean", "jeans", "trousers", "pants", "slacks", "chinos", "shorts", "skirt", "miniskirt", "sarong",
+               "overskirt"],
+    "shoes": ["sneaker", "running shoe", "boot", "loafer", "Loafer", "sandal", "clog", "slipper", "shoe"],
+    "outerwear": ["coat", "trench coat", "fur coat", "jacket", "parka", "windbreaker", "raincoat", "overcoat",
+                  "cloak", "stole"],
+}
+
+
+def legacy_to_coarse_type(labels) -> str:
+    """colab_postprocess.to_coarse_type before the taxonomy module."""
+    joined = " ".join(labels).lower()
+    for coarse, keys in LEGACY_LABEL_MAP.items():
+        for k in keys:
+            if k.lower() in joined:
+                return coarse
+    return "unknown"
+
+
+def synthetic(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    names = [f"{'_'.join(rng.sample(WORDS, 3))}_{i}.jpg" for i in range(n)]
+    labels = [rng.sample(LABELS, 5) for _ in range(n)]
+    return names, labels
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = list(fn())
+    return time.perf_counter() - t0, out
+
+
+def main(n: int):
+    names, labels = synthetic(n)
+    label_cells = pd.Series([str(x) for x in labels])  # as read from the Colab CSV
+    print(f"{'':<28}{'legacy':>10}{'taxonomy':>10}{'changed':>10}")
+    for title, legacy, new in [
+        ("filenames", lambda: map(legacy_from_name, names), lambda: classify_series(pd.Series(names))),
+        ("Colab label cells (5 each)", lambda: (legacy_to_coarse_type(safe_parse_labels(v)) for v in label_cells),
+         lambda: classify_series(label_cells, labels=True)),
+    ]:
+        t_old, old = timed(legacy)
+        t_new, cur = timed(new)
+        changed = sum(a != b for a, b in zip(old, cur))
+        print(f"{title:<28}{t_old:9.2f}s{t_new:9.2f}s{changed / n:9.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=1_000_000)
+    args = parser.parse_args()
+    main(args.n)
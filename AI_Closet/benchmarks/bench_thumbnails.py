@@ -0,0 +1,90 @@
+"""
+Bytes and time per outfit page: full-size originals vs cached thumbnails.
+
+"Original" approximates what st.image does with a photo shown at a fixed
+width: read and decode the full file, downscale, re-encode. "Thumbnail" is
+reading the cached small file, which is all st.image has to do with it.
+
+Usage:
+    python benchmarks/bench_thumbnails.py --outfits 10 --width 4032 --height 3024
+"""
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import argparse
+import io
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from src.vision.thumbnails import ThumbnailStore
+
+
+def make_photos(out_dir: str, n: int, width: int, height: int, seed: int = 0):
+    """Phone-sized JPEGs: a smooth gradient with sensor-like noise (a few MB each)."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    paths = []
+    for i in range(n):
+        base = rng.integers(0, 256, size=3)
+        arr = (base + 60 * np.sin(xx / (200 + 50 * i))[..., None] + 40 * np.cos(yy / 300)[..., None]
+               + rng.normal(0, 12, (height, width, 3)))
+        path = os.path.join(out_dir, f"IMG_{i:04d}.jpg")
+        Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8)).save(path, quality=92)
+        paths.append(path)
+    return paths
+
+
+def render_original(path: str, width: int = 200) -> int:
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        img.thumbnail((width, width * 4))
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG")
+    with open(path, "rb") as f:  # the full file is read either way
+        f.read()
+    return os.path.getsize(path)
+
+
+def render_thumbnail(store: ThumbnailStore, path: str) -> int:
+    thumb = store.get(path)
+    with open(thumb, "rb") as f:
+        return len(f.read())
+
+
+def main(outfits: int, per_outfit: int, width: int, height: int):
+    n = outfits * per_outfit
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_photos(tmp, n, width, height)
+        store = ThumbnailStore(os.path.join(tmp, "thumbs"))
+
+        t0 = time.perf_counter()
+        for p in paths:
+            store.generate(p)
+        ingest = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        orig_bytes = sum(render_original(p) for p in paths)
+        orig_t = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        thumb_bytes = sum(render_thumbnail(store, p) for p in paths)
+        thumb_t = time.perf_counter() - t0
+
+    print(f"page: {outfits} outfits x {per_outfit} items ({width}x{height} JPEG originals)")
+    print(f"{'originals':>12}: {orig_t * 1000:9.1f} ms  {orig_bytes / 1e6:8.2f} MB")
+    print(f"{'thumbnails':>12}: {thumb_t * 1000:9.1f} ms  {thumb_bytes / 1e6:8.2f} MB")
+    print(f"one-time thumbnail generation at ingest: {1000 * ingest / n:.1f} ms/image")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--outfits", type=int, default=10)
+    parser.add_argument("--per-outfit", type=int, default=3)
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    args = parser.parse_args()
+    main(args.outfits, args.per_outfit, args.width, args.height)
@@ -0,0 +1,81 @@
+"""
+Time web/app.py's data path: DataFrame + iterrows + per-item mask scans vs the columnar WardrobeStore.
+
+Usage:
+    python benchmarks/bench_wardrobe_store.py --items 100000 1000000
+"""
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import argparse
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from src.recommender.rules import Item
+from src.utils.wardrobe_store import WardrobeStore
+
+CATEGORIES = ["pants", "shirt", "dress", "jacket", "shoes", "skirt", "sweater", "boots"]
+COLORS = ["black", "gray", "red", "navy", "white", "beige", "green", "brown"]
+SHOWN = 30  # items rendered per click: 10 outfits x 3
+
+
+def write_csv(path: str, n: int, seed: int = 0):
+    rng = random.Random(seed)
+    cats = [rng.choice(CATEGORIES) for _ in range(n)]
+    pd.DataFrame({
+        "item_id": range(1, n + 1),
+        "item_name": [f"{c} {i}" for i, c in enumerate(cats, 1)],
+        "category": cats,
+        "color": [rng.choice(COLORS) for _ in range(n)],
+        "image_path": [f"images/{c}{i}.jpg" for i, c in enumerate(cats, 1)],
+    }).to_csv(path, index=False)
+
+
+def legacy(csv_path: str, shown_ids):
+    """The old app: read the CSV, build Items with iterrows, one mask scan per rendered item."""
+    df = pd.read_csv(csv_path).rename(columns={"item_id": "id"})
+    t0 = time.perf_counter()
+    items = [Item(id=row["id"], type=row["category"], color=row["color"], image_path=row["image_path"])
+             for _, row in df.iterrows()]
+    t1 = time.perf_counter()
+    names = [df[df["id"] == i].iloc[0]["item_name"] for i in shown_ids]
+    return items, names, t1 - t0, time.perf_counter() - t1
+
+
+def columnar(csv_path: str, shown_ids):
+    store = WardrobeStore.load(csv_path)
+    t0 = time.perf_counter()
+    items = store.items()
+    t1 = time.perf_counter()
+    names = [store.get(i)["name"] for i in shown_ids]
+    return items, names, t1 - t0, time.perf_counter() - t1
+
+
+def main(sizes):
+    print(f"{'items':>10}{'':>4}{'load':>10}{'to Items':>10}{f'{SHOWN} lookups':>12}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "cleaned_tags.csv")
+            write_csv(csv_path, n)
+            shown = random.Random(1).sample(range(1, n + 1), SHOWN)
+            runs = [("legacy", lambda: legacy(csv_path, shown)),
+                    ("first run", lambda: columnar(csv_path, shown)),  # parses CSV, writes snapshot
+                    ("snapshot", lambda: columnar(csv_path, shown))]
+            for label, fn in runs:
+                t0 = time.perf_counter()
+                _, names, t_items, t_lookup = fn()
+                total = time.perf_counter() - t0
+                load = total - t_items - t_lookup
+                print(f"{n:>10,} {label:<10}{load:9.2f}s{t_items:9.2f}s{t_lookup * 1000:10.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+    main(args.items)
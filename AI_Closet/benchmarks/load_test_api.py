@@ -0,0 +1,121 @@
+"""
+Local load test for the FastAPI service: p50/p99 latency and requests/sec per endpoint.
+
+Without --url, starts the app with uvicorn in a child process on a synthetic
+wardrobe (a temp DB with --items rows) and tests that.
+
+Usage:
+    python benchmarks/load_test_api.py --items 20000 --concurrency 32 --requests 2000
+    python benchmarks/load_test_api.py --url http://127.0.0.1:8000
+"""
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import argparse
+import asyncio
+import random
+import socket
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+
+import httpx
+import numpy as np
+
+from bench_db import synthetic_rows
+
+# (name, weight, request factory) - a rough mix of what the UI does
+def scenarios(rng: random.Random):
+    occasions = ["class", "work", "casual", "formal"]
+    return [
+        ("GET /items", 4, lambda: ("GET", "/items", {"params": {"limit": 50}})),
+        ("GET /items?type", 2, lambda: ("GET", "/items", {"params": {"type": rng.choice(["top", "bottom"]),
+                                                                      "formality_min": 2}})),
+        ("POST /recommend", 4, lambda: ("POST", "/recommend", {"json": {
+            "temp_f": rng.choice([50, 65, 80]), "occasion": rng.choice(occasions)}})),
+        ("POST /recommend seed", 2, lambda: ("POST", "/recommend", {"json": {
+            "temp_f": 55, "seed": rng.randrange(1, 10**6)}})),
+        ("POST /recommend outfit", 1, lambda: ("POST", "/recommend", {"json": {
+            "temp_f": rng.choice([50, 80]), "ranking": "outfit"}})),
+        ("GET /health", 1, lambda: ("GET", "/health", {})),
+    ]
+
+
+async def run(url: str, concurrency: int, total: int, seed: int = 0):
+    rng = random.Random(seed)
+    mix = scenarios(rng)
+    names = [m[0] for m in mix]
+    weights = [m[1] for m in mix]
+    todo = [rng.choices(range(len(mix)), weights)[0] for _ in range(total)]
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    queue = iter(todo)
+
+    async def user(client: httpx.AsyncClient):
+        for i in queue:  # shared iterator: each request is taken once
+            method, path, kwargs = mix[i][2]()
+            t0 = time.perf_counter()
+            res = await client.request(method, path, **kwargs)
+            latencies[names[i]].append(time.perf_counter() - t0)
+            if res.status_code >= 400:
+                errors[names[i]] += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        await client.get("/health")  # warm up
+        t0 = time.perf_counter()
+        await asyncio.gather(*(user(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    print(f"{total} requests, concurrency {concurrency}: {total / elapsed:.0f} req/s overall")
+    print(f"{'endpoint':<24}{'n':>7}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name in names:
+        lat = np.array(latencies[name]) * 1000
+        if len(lat):
+            print(f"{name:<24}{len(lat):>7}{np.percentile(lat, 50):>10.2f}{np.percentile(lat, 99):>10.2f}{errors[name]:>8}")
+
+
+@contextmanager
+def local_server(items: int, tmp: str):
+    """uvicorn in a child process (its own GIL) on a synthetic wardrobe; yields the base URL."""
+    import src.db.db as db
+
+    db_path = os.path.join(tmp, "wardrobe.db")
+    db.init_db(db_path)
+    db.add_items(synthetic_rows(items), db_path=db_path)
+    db.close_all()
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = {**os.environ, "DB_PATH": db_path, "THUMB_CACHE_DIR": os.path.join(tmp, "thumbs")}
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "src.api.app:app", "--port", str(port),
+                             "--log-level", "warning"], cwd=ROOT, env=env)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(600):
+            try:
+                httpx.get(url + "/health")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        yield url
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=None, help="Test a running server instead of starting one")
+    parser.add_argument("--items", type=int, default=20000, help="Synthetic wardrobe size (local server only)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    if args.url:
+        asyncio.run(run(args.url, args.concurrency, args.requests))
+    else:
+        with tempfile.TemporaryDirectory() as tmp, local_server(args.items, tmp) as url:
+            asyncio.run(run(url, args.concurrency, args.requests))
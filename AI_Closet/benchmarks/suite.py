@@ -0,0 +1,228 @@
+"""
+Benchmark suite: time the hot paths on a seeded synthetic wardrobe and compare with benchmarks/baseline.json.
+
+Cases (each over wardrobes of 10^2 .. 10^6 items, capped per case):
+    recommend         rules.recommend on n items (~30% tops, ~30% bottoms)
+    validate          validate_dataframe on an n-row tags DataFrame (1% bad rows)
+    sync              sync_items_from_df of that DataFrame into an empty DB
+    list_items        list_items(limit=200) on a DB of n items
+    dominant_color    extract_dominant_color over n synthetic 256px JPEGs
+
+Each timing is the median of at least 5 runs (more for fast cases, up to
+about a second of runs), which steadies it against one-off stalls such as
+an fsync that waits on the disk. A case is a regression when it is more
+than --threshold times slower than its baseline and also slower by more
+than the case's absolute floor (the "floor" column in CASES), so noise on
+small sizes and disk-bound cases doesn't fail the run; any regression makes
+the run exit with status 1.
+
+Usage:
+    python benchmarks/suite.py                      # sizes up to 10^4, compare
+    python benchmarks/suite.py --max-size 1000000   # full scale
+    python benchmarks/suite.py --update-baseline    # record the current timings
+"""
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+import src.db.db as dbmod
+from src.db.db import add_items, init_db, list_items
+from src.recommender.rules import Item, recommend
+from src.utils.data_loader import sync_items_from_df
+from src.utils.validate_data import validate_dataframe
+from src.vision.tagger import extract_dominant_color
+from bench_tagger import make_images
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SIZES = [10 ** e for e in range(2, 7)]
+
+TYPES = ["top", "top", "top", "bottom", "bottom", "bottom", "outerwear", "shoes", "unknown", "unknown"]
+SEASONS = ["spring", "summer", "fall", "winter", None]
+PATTERNS = ["solid", "striped", "plaid", None]
+
+
+# ---- Synthetic data ----
+def wardrobe_rows(n: int, seed: int = 0) -> list[tuple]:
+    """n item tuples ordered like db.ITEM_COLUMNS; the same for the same seed."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        rgb = ",".join(str(rng.randrange(256)) for _ in range(3))
+        rows.append((f"item_{i:07d}.jpg", rng.choice(TYPES), f"rgb({rgb})", rng.choice(PATTERNS),
+                     rng.choice(SEASONS), rng.randrange(6), None))
+    return rows
+
+
+def wardrobe_frame(n: int, seed: int = 0, bad_fraction: float = 0.01) -> pd.DataFrame:
+    """tags.csv-shaped DataFrame of the same wardrobe, with a few invalid rows for the validator to find."""
+    df = pd.DataFrame(wardrobe_rows(n, seed), columns=["filename", "type", "dominant_color", "pattern",
+                                                       "season", "formality", "notes"]).drop(columns="notes")
+    df["formality"] = df["formality"].astype(object)
+    rng = random.Random(seed + 1)
+    for i in rng.sample(range(n), int(n * bad_fraction)):
+        col, value = rng.choice([("filename", None), ("dominant_color", "blue"), ("formality", "very formal"),
+                                 ("formality", 9), ("season", "monsoon")])
+        df.at[i, col] = value
+    return df
+
+
+def wardrobe_items(n: int, seed: int = 0) -> list[Item]:
+    return [Item(i, r[1], r[2], r[0], season=r[4], formality=r[5]) for i, r in enumerate(wardrobe_rows(n, seed))]
+
+
+# ---- Cases ----
+# name -> (max size, setup(n, tmp) -> (run, before), floor in seconds); before (or None) runs untimed
+# ahead of each run; a slowdown smaller than the floor never counts as a regression
+def _recommend(n, tmp):
+    items = wardrobe_items(n)
+    ctx = {"temp_f": 55}
+    return (lambda: recommend(items, ctx)), None
+
+
+def _validate(n, tmp):
+    df = wardrobe_frame(n)
+    return (lambda: validate_dataframe(df)), None
+
+
+def _sync(n, tmp):
+    df = wardrobe_frame(n)
+    state = {"runs": 0}
+
+    def before():
+        state["runs"] += 1
+        state["db"] = os.path.join(tmp, f"sync_{state['runs']}.db")
+        init_db(state["db"])
+
+    return (lambda: sync_items_from_df(df, db_path=state["db"])), before
+
+
+def _list_items(n, tmp):
+    db = os.path.join(tmp, "list.db")
+    init_db(db)
+    add_items(wardrobe_rows(n), db_path=db)
+    dbmod.DEFAULT_DB = db  # list_items always uses the default DB
+    return (lambda: list_items(limit=200)), None
+
+
+def _dominant_color(n, tmp):
+    paths = make_images(tmp, n, 256)
+    return (lambda: [extract_dominant_color(p) for p in paths]), None
+
+
+CASES = {
+    "recommend": (10 ** 5, _recommend, 0.005),
+    "validate": (10 ** 6, _validate, 0.01),
+    "sync": (10 ** 6, _sync, 0.1),  # a fresh DB per run: WAL writes and fsyncs dominate small sizes
+    "list_items": (10 ** 6, _list_items, 0.002),
+    "dominant_color": (10 ** 3, _dominant_color, 0.05),
+}
+
+
+def median_time(run, before=None, min_time: float = 1.0, min_runs: int = 5, max_runs: int = 15) -> float:
+    """Median of at least min_runs runs, adding runs (up to max_runs) until min_time has been spent."""
+    times: list[float] = []
+    while len(times) < min_runs or (sum(times) < min_time and len(times) < max_runs):
+        if before:
+            before()
+        t0 = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def run_suite(cases, max_size: int) -> dict:
+    """{case: {str(n): seconds}} for every case and size up to its cap and max_size."""
+    results = {}
+    default_db = dbmod.DEFAULT_DB
+    try:
+        for name in cases:
+            cap, setup, _ = CASES[name]
+            for n in SIZES:
+                if n > min(cap, max_size):
+                    break
+                with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+                    run, before = setup(n, tmp)  # init_db prints on every new DB
+                    results.setdefault(name, {})[str(n)] = median_time(run, before)
+                print(f"  {name:<16}{n:>10,}{results[name][str(n)] * 1000:12.2f} ms", flush=True)
+    finally:
+        dbmod.DEFAULT_DB = default_db
+    return results
+
+
+# ---- Baseline ----
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"results": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[tuple]:
+    """(case, n, seconds, baseline seconds or None, ratio or None, regressed) per measured timing."""
+    rows = []
+    for name, timings in results.items():
+        min_delta = CASES[name][2]
+        for n, t in timings.items():
+            base = baseline.get(name, {}).get(n)
+            ratio = t / base if base else None
+            regressed = base is not None and t > base * threshold and t - base > min_delta
+            rows.append((name, int(n), t, base, ratio, regressed))
+    return rows
+
+
+def save_baseline(path: str, results: dict):
+    """Merge results into the baseline file (sizes not measured this run are kept)."""
+    data = load_baseline(path)
+    for name, timings in results.items():
+        data["results"].setdefault(name, {}).update({n: round(t, 6) for n, t in timings.items()})
+    data["machine"] = {"python": platform.python_version(), "platform": platform.platform(),
+                       "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count()}
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main(cases, max_size: int, baseline_path: str, threshold: float, update: bool) -> int:
+    print(f"{'case':<18}{'items':>10}{'time':>15}")
+    results = run_suite(cases, max_size)
+    if update:
+        save_baseline(baseline_path, results)
+        print(f"\nbaseline written to {baseline_path}")
+        return 0
+
+    rows = compare(results, load_baseline(baseline_path)["results"], threshold)
+    print(f"\n{'case':<18}{'items':>10}{'now':>12}{'baseline':>12}{'ratio':>9}")
+    for name, n, t, base, ratio, regressed in rows:
+        base_s = f"{base * 1000:10.2f}ms" if base else f"{'-':>12}"
+        ratio_s = f"{ratio:8.2f}x" if ratio else f"{'-':>9}"
+        print(f"{name:<18}{n:>10,}{t * 1000:10.2f}ms{base_s}{ratio_s}{'  REGRESSION' if regressed else ''}")
+    regressions = sum(r[-1] for r in rows)
+    if regressions:
+        print(f"\n❌ {regressions} timing(s) more than {threshold}x slower than {os.path.basename(baseline_path)}")
+        return 1
+    print(f"\n✅ no regressions beyond {threshold}x")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--max-size", type=int, default=10 ** 4, help="Largest wardrobe to run (default: 10^4)")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=1.5, help="Slowdown ratio that fails the run")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the timings instead of comparing")
+    args = parser.parse_args()
+    sys.exit(main(args.cases, args.max_size, args.baseline, args.threshold, args.update_baseline))
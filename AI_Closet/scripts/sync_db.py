@@ -1,4 +1,5 @@
 import os, sys
+import argparse
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
@@ -8,11 +9,17 @@ from src.utils.data_loader import load_and_sync
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Sync data/tags.csv into wardrobe.db")
+    parser.add_argument("--csv", default=None, help="Tags CSV (default: data/tags.csv)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Stream the CSV in chunks of this many rows (resumable)")
+    args = parser.parse_args()
+
     # Ensure schema exists
     init_db()
-    # Load CSV and insert into DB
-    inserted = load_and_sync()
-    print(f"✅ Inserted {inserted} items into wardrobe.db")
+    # Load CSV and upsert into DB (keyed on filename, safe to re-run)
+    synced = load_and_sync(args.csv, upsert=True, chunksize=args.chunksize)
+    print(f"✅ Synced {synced} items into wardrobe.db")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,232 @@
+"""
+Headless HTTP API over the wardrobe DB and the recommender.
+
+One process keeps the recommender state warm (WardrobeIndex, feedback
+scorer, recommendation cache, thumbnail store, tagging workers), shared by
+all requests and kept current through db.py change notifications.
+Everything that blocks — SQLite, file I/O, NumPy scoring — runs in the
+thread pool via run_in_threadpool, so the event loop only routes requests.
+
+Run:
+    uvicorn src.api.app:app --port 8000
+"""
+import os
+from contextlib import asynccontextmanager
+from typing import List, Literal
+
+from fastapi import FastAPI, File, HTTPException, Query, UploadFile
+from fastapi.responses import FileResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+
+import src.db.db as db
+from src.recommender.cache import RecommendationCache
+from src.recommender.feedback import FeedbackScorer
+from src.recommender.index import WardrobeIndex
+from src.recommender.outfit_search import search_outfits
+from src.recommender.rules import recommend
+from src.utils import metrics
+from src.utils.image_index import ImageIndex
+from src.vision.tag_worker import TagWorker
+from src.vision.thumbnails import THUMB_SIZES, ThumbnailStore
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+IMAGES_DIR = os.path.join(ROOT, "data", "images")
+
+
+# ---- Schemas ----
+class ItemOut(BaseModel):
+    id: int
+    filename: str
+    type: str | None = None
+    dominant_color: str | None = None
+    pattern: str | None = None
+    season: str | None = None
+    formality: int | None = None
+    color_rgb: int | None = None
+    tag_status: str | None = None
+
+    @classmethod
+    def from_row(cls, r) -> "ItemOut":
+        return cls(id=r[0], filename=r[1], type=r[2], dominant_color=r[3], pattern=r[4], season=r[5],
+                   formality=r[6], color_rgb=r[7], tag_status=r[11])
+
+
+class OutfitItem(BaseModel):
+    id: int
+    type: str
+    color: str
+    filename: str
+
+
+class RecommendRequest(BaseModel):
+    temp_f: float = 70
+    occasion: str | None = None
+    season: str | None = None
+    k: int = Field(10, ge=1, le=100)
+    seed: int = Field(0, ge=0, description="0 = best outfits; >0 = Regenerate with that seed (ranking=basic)")
+    ranking: Literal["basic", "feedback", "outfit"] = "basic"
+
+
+class RecommendResponse(BaseModel):
+    version: int
+    outfits: List[List[OutfitItem]]
+
+
+class FeedbackIn(BaseModel):
+    item_ids: List[int] = Field(min_length=1)
+    label: Literal["like", "dislike"]
+    reason: str | None = None
+
+
+class UploadOut(BaseModel):
+    ids: List[int]
+    status: str = "pending"
+
+
+# ---- App ----
+def create_app(db_path: str | None = None, images_dir: str | None = None, workers: int = 2,
+               thumbnails_dir: str | None = None, tag_cache_path: str | None = None) -> FastAPI:
+    """App bound to one DB, images dir and tag cache; workers=0 leaves tagging to another process."""
+    db_path = os.path.abspath(db_path or db.DEFAULT_DB)
+    images_dir = images_dir or IMAGES_DIR
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        s = app.state
+        os.makedirs(images_dir, exist_ok=True)
+        await run_in_threadpool(db.init_db, db_path)
+        await run_in_threadpool(db.check_external_writes, db_path)  # baseline before loading
+        s.index = await run_in_threadpool(WardrobeIndex.from_db, db_path)
+        s.scorer = await run_in_threadpool(FeedbackScorer.from_db, db_path)
+        s.cache = RecommendationCache(maxsize=1024)
+        s.images = ImageIndex(images_dir)
+        s.thumbnails = ThumbnailStore(thumbnails_dir)
+        s.worker = (TagWorker(workers, db_path=db_path, cache_path=tag_cache_path, thumbnails=s.thumbnails).start()
+                    if workers else None)
+        yield
+        if s.worker:
+            s.worker.stop(timeout=5)
+        s.index.close()
+        s.scorer.close()
+
+    app = FastAPI(title="AI Closet API", lifespan=lifespan)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "items": len(app.state.index), "version": db.wardrobe_version()}
+
+    @app.get("/metrics")
+    async def metrics_export(format: Literal["prometheus", "json"] = "prometheus"):
+        """Latency histograms and counters (collected when METRICS=1)."""
+        if format == "json":
+            return metrics.snapshot()
+        return PlainTextResponse(metrics.to_prometheus(), media_type="text/plain; version=0.0.4")
+
+    # ---- items ----
+    @app.get("/items", response_model=List[ItemOut])
+    async def list_items(type: List[str] | None = Query(None), season: List[str] | None = Query(None),
+                         formality_min: int | None = None, formality_max: int | None = None,
+                         after_id: int | None = None, limit: int = Query(50, ge=1, le=500)):
+        """Newest first; pass the last id you got as after_id for the next page."""
+        formality = None
+        if formality_min is not None or formality_max is not None:
+            formality = (formality_min if formality_min is not None else 0,
+                         formality_max if formality_max is not None else 5)
+        rows = await run_in_threadpool(db.query_items, type, season, formality, None, after_id, limit, db_path)
+        return [ItemOut.from_row(r) for r in rows]
+
+    @app.get("/items/{item_id}", response_model=ItemOut)
+    async def get_item(item_id: int):
+        rows = await run_in_threadpool(db.get_items, [item_id], db_path)
+        if not rows:
+            raise HTTPException(404, f"No item with id {item_id}")
+        return ItemOut.from_row(rows[0])
+
+    @app.delete("/items/{item_id}", status_code=204)
+    async def delete_item(item_id: int):
+        if not await run_in_threadpool(db.delete_item, item_id, db_path):
+            raise HTTPException(404, f"No item with id {item_id}")
+
+    @app.post("/items", response_model=UploadOut, status_code=202)
+    async def upload(files: List[UploadFile] = File(...)):
+        """Save images and queue them for tagging; poll GET /items/{id} for tag_status."""
+        saved = []
+        for f in files:
+            name = os.path.basename(f.filename or "")
+            if not name.lower().endswith((".jpg", ".jpeg", ".png")):
+                raise HTTPException(415, f"Unsupported file: {f.filename!r}")
+            data = await f.read()
+            path = os.path.join(images_dir, name)
+            await run_in_threadpool(_write_file, path, data)
+            app.state.images.add(path)
+            saved.append((name, path))
+        ids = await run_in_threadpool(db.enqueue_uploads, saved, db_path)
+        if app.state.worker:
+            app.state.worker.wake()
+        return UploadOut(ids=ids)
+
+    @app.get("/items/{item_id}/thumbnail")
+    async def thumbnail(item_id: int, size: Literal[tuple(THUMB_SIZES)] = "small"):
+        def resolve():
+            rows = db.get_items([item_id], db_path)
+            src = app.state.images.resolve(rows[0][1]) if rows else None
+            return app.state.thumbnails.get(src, size) if src else None
+        path = await run_in_threadpool(resolve)
+        if path is None:
+            raise HTTPException(404, f"No image for item {item_id}")
+        return FileResponse(path, headers={"Cache-Control": "public, max-age=3600"})
+
+    @app.get("/queue")
+    async def queue():
+        return await run_in_threadpool(db.tag_queue_counts, db_path)
+
+    # ---- recommendations ----
+    @app.post("/recommend", response_model=RecommendResponse)
+    async def recommend_outfits(req: RecommendRequest):
+        s = app.state
+        ctx = {"temp_f": req.temp_f}
+        if req.occasion:
+            ctx["occasion"] = req.occasion
+        if req.season:
+            ctx["season"] = req.season
+        # Other processes' writes (scripts/sync_db.py, the app) must bump the version the cache keys on
+        await run_in_threadpool(db.check_external_writes, db_path)
+        if s.index.stale:
+            await run_in_threadpool(s.index.reload)
+        version = db.wardrobe_version()
+        # Off the event loop: both take the index lock, which a reload or tag worker may hold
+        if req.ranking == "basic" and req.seed:
+            outfits = await run_in_threadpool(s.index.sample, ctx, req.seed, req.k)
+        elif req.ranking == "basic":
+            outfits = await run_in_threadpool(s.cache.get_or_compute, version, ctx,
+                                              lambda: s.index.recommend(ctx, req.k), req.k)
+        elif req.ranking == "feedback":
+            compute = lambda: recommend(s.index.items(), ctx, req.k, score_fn=s.scorer.score_fn)
+            outfits = await run_in_threadpool(s.cache.get_or_compute, version, {**ctx, "ranking": "feedback"},
+                                              compute, req.k)
+        else:
+            compute = lambda: [items for _, items in search_outfits(s.index.items(), ctx, req.k)]
+            outfits = await run_in_threadpool(s.cache.get_or_compute, version, {**ctx, "ranking": "outfit"},
+                                              compute, req.k)
+        return RecommendResponse(version=version, outfits=[
+            [OutfitItem(id=i.id, type=i.type, color=i.color, filename=i.image_path) for i in outfit]
+            for outfit in outfits
+        ])
+
+    @app.post("/feedback", status_code=201)
+    async def feedback(body: FeedbackIn):
+        feedback_id = await run_in_threadpool(db.add_feedback, body.item_ids, body.label, body.reason, db_path)
+        return {"id": feedback_id}
+
+    return app
+
+
+def _write_file(path: str, data: bytes):
+    tmp = path + ".part"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+app = create_app()
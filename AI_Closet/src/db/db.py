@@ -1,39 +1,457 @@
-
 import os
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
 from dotenv import load_dotenv
 
+from src.utils import metrics
+from src.utils.colors import color_columns
+
 DEFAULT_DB = os.environ.get("DB_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "metadata", "wardrobe.db"))
 
+# Applied to every connection we open. WAL lets readers run while one writer
+# commits; NORMAL sync is safe with WAL and skips an fsync per commit.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+    "PRAGMA cache_size=-32768",    # 32 MiB
+    "PRAGMA temp_store=MEMORY",
+)
+
+def _tune(conn: sqlite3.Connection, read_only: bool = False) -> sqlite3.Connection:
+    for pragma in PRAGMAS:
+        if read_only and "journal_mode" in pragma:
+            continue  # changing the journal mode needs write access
+        conn.execute(pragma)
+    return conn
+
 def get_conn(db_path: str | None = None):
-    return sqlite3.connect(db_path or DEFAULT_DB)
+    """New tuned connection owned by the caller (close it when done)."""
+    return _tune(sqlite3.connect(db_path or DEFAULT_DB))
+
+# ---- Connection reuse ----
+# Readers: one read-only connection per (thread, db). Writers: one shared
+# connection per db, used under a lock, so writes are serialized in-process
+# instead of fighting over SQLite's file lock ("database is locked").
+_local = threading.local()
+_writers: dict[str, tuple[sqlite3.Connection, threading.Lock]] = {}
+_writers_lock = threading.Lock()
+
+def read_conn(db_path: str | None = None) -> sqlite3.Connection:
+    """This thread's read-only connection to db_path (created on first use)."""
+    path = os.path.abspath(db_path or DEFAULT_DB)
+    conns = getattr(_local, "readers", None)
+    if conns is None:
+        conns = _local.readers = {}
+    conn = conns.get(path)
+    if conn is None:
+        uri = Path(path).as_uri() + "?mode=ro"
+        with metrics.span("db.connect"):
+            conn = conns[path] = _tune(sqlite3.connect(uri, uri=True), read_only=True)
+        metrics.incr("db.connections")
+    return conn
+
+def _writer(path: str) -> tuple[sqlite3.Connection, threading.Lock]:
+    with _writers_lock:
+        entry = _writers.get(path)
+        if entry is None:
+            with metrics.span("db.connect"):
+                conn = _tune(sqlite3.connect(path, check_same_thread=False))
+            metrics.incr("db.connections")
+            entry = _writers[path] = (conn, threading.Lock())
+    return entry
+
+@contextmanager
+def write_conn(db_path: str | None = None) -> Iterator[sqlite3.Connection]:
+    """
+    Exclusive use of the shared writer connection for one transaction:
+    commits on success, rolls back on error.
+    """
+    conn, lock = _writer(os.path.abspath(db_path or DEFAULT_DB))
+    with metrics.span("db.write_lock_wait"):
+        lock.acquire()
+    try:
+        with conn:
+            yield conn
+    finally:
+        lock.release()
+
+def close_all():
+    """Close the shared writers and this thread's readers (tests, shutdown)."""
+    with _writers_lock:
+        for conn, lock in _writers.values():
+            with lock:
+                conn.close()
+        _writers.clear()
+        _data_versions.clear()
+    for conn in getattr(_local, "readers", {}).values():
+        conn.close()
+    _local.readers = {}
+
+# ---- Change notifications ----
+# Every write calls notify(), which bumps wardrobe_version(). In-process listeners (e.g. the recommender's WardrobeIndex) are told about
+# writes so they can update incrementally instead of re-reading the table.
+# Writes from other processes (scripts/sync_db.py, the API, a second app
+# worker) are only seen by check_external_writes(), which turns them into a
+# "bulk" notification; long-lived readers call it before serving.
+# listener(event, payload, db_path) with event one of:
+#   "add"    payload = full item row (ITEM_SELECT shape)
+#   "delete" payload = item id
+#   "bulk"   payload = None (many rows changed; reload)
+#   "feedback" payload = (feedback id, [item ids], label)
+_listeners: list[Callable] = []
+
+def subscribe(listener: Callable):
+    _listeners.append(listener)
+
+def unsubscribe(listener: Callable):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+# Bumped by every write that goes through this module, and by
+# check_external_writes() for everyone else's; caches of derived data (e.g.
+# recommendations) key on it. The number itself is process-local.
+_version = 0
+_version_lock = threading.Lock()
+
+def wardrobe_version() -> int:
+    return _version
+
+def notify(event: str, payload=None, db_path: str | None = None):
+    global _version
+    path = os.path.abspath(db_path or DEFAULT_DB)
+    for listener in list(_listeners):
+        listener(event, payload, path)
+    # After the listeners: anything computed under the new version sees their updates
+    with _version_lock:
+        _version += 1
+
+# Last PRAGMA data_version read on each db's shared writer connection
+_data_versions: dict[str, int] = {}
+
+def check_external_writes(db_path: str | None = None) -> bool:
+    """
+    Notify "bulk" if another connection (another process, usually) has
+    committed to db_path since the previous check; returns whether it did.
+
+    PRAGMA data_version on the shared writer only changes for commits made
+    by other connections, so this process's own writes never count. The
+    first check of a db records a baseline, so call it once before loading
+    anything from the db. The check waits for an in-process write that holds
+    the writer to finish (the PRAGMA itself is a cheap header read).
+    """
+    path = os.path.abspath(db_path or DEFAULT_DB)
+    conn, lock = _writer(path)
+    with lock:
+        (version,) = conn.execute("PRAGMA data_version").fetchone()
+        seen = _data_versions.get(path)
+        _data_versions[path] = version
+    if seen is None or seen == version:
+        return False
+    notify("bulk", db_path=path)
+    return True
 
 def init_db(db_path: str | None = None):
-    from pathlib import Path
     dbp = db_path or DEFAULT_DB
     Path(os.path.dirname(dbp)).mkdir(parents=True, exist_ok=True)
-    with get_conn(dbp) as conn:
+    with write_conn(dbp) as conn:
         schema_path = os.path.join(os.path.dirname(__file__), "schema.sql")
         with open(schema_path, "r", encoding="utf-8") as f:
             conn.executescript(f.read())
-        conn.commit()
+        migrate(conn)
+    notify("bulk", db_path=dbp)
     print(f"Initialized DB at {dbp}")
 
+# Columns added after the first schema version: (table, column, type)
+ADDED_COLUMNS = (
+    ("items", "color_rgb", "INTEGER"),
+    ("items", "color_l", "REAL"),
+    ("items", "color_a", "REAL"),
+    ("items", "color_b", "REAL"),
+    ("items", "tag_status", "TEXT DEFAULT 'done'"),
+    ("tag_jobs", "lease_until", "REAL"),
+)
+
+def migrate(conn: sqlite3.Connection):
+    """
+    Bring an existing DB up to the current schema: add missing columns and
+    backfill the numeric color columns from dominant_color.
+    """
+    for table, column, type_ in ADDED_COLUMNS:
+        existing = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {type_}")
+    todo = conn.execute(
+        "SELECT id, dominant_color FROM items WHERE color_rgb IS NULL AND dominant_color IS NOT NULL"
+    ).fetchall()
+    if todo:
+        derived = color_columns(color for _, color in todo)
+        conn.executemany(
+            "UPDATE items SET color_rgb = ?, color_l = ?, color_a = ?, color_b = ? WHERE id = ?",
+            [cols + (id_,) for (id_, _), cols in zip(todo, derived) if cols[0] is not None],
+        )
+
 def add_item(filename: str, type_: str | None = None, dominant_color: str | None = None, pattern: str | None = None, season: str | None = None, formality: int | None = None, notes: str | None = None):
-    with get_conn() as conn:
+    colors = color_columns([dominant_color])[0]
+    with write_conn() as conn:
         cur = conn.cursor()
         cur.execute(
-            "INSERT INTO items(filename, type, dominant_color, pattern, season, formality, notes) VALUES(?,?,?,?,?,?,?)",
-            (filename, type_, dominant_color, pattern, season, formality, notes)
+            "INSERT INTO items(filename, type, dominant_color, pattern, season, formality, notes, "
+            "color_rgb, color_l, color_a, color_b) VALUES(?,?,?,?,?,?,?,?,?,?,?)",
+            (filename, type_, dominant_color, pattern, season, formality, notes) + colors
         )
-        conn.commit()
-        return cur.lastrowid
+        item_id = cur.lastrowid
+    notify("add", (item_id, filename, type_, dominant_color, pattern, season, formality) + colors + ("done",))
+    return item_id
+
+def delete_item(item_id: int, db_path: str | None = None) -> bool:
+    """Delete one item; returns False if it didn't exist."""
+    with write_conn(db_path) as conn:
+        deleted = conn.execute("DELETE FROM items WHERE id = ?", (item_id,)).rowcount > 0
+    if deleted:
+        notify("delete", item_id, db_path)
+    return deleted
 
+ITEM_COLUMNS = ("filename", "type", "dominant_color", "pattern", "season", "formality", "notes")
+# Derived from dominant_color at write time (see src/utils/colors.py)
+COLOR_COLUMNS = ("color_rgb", "color_l", "color_a", "color_b")
+
+def _write_items(conn: sqlite3.Connection, rows: list[tuple], upsert: bool):
+    rows = [r + c for r, c in zip(rows, color_columns(r[2] for r in rows))]
+    columns = ITEM_COLUMNS + COLOR_COLUMNS
+    cols = ",".join(columns)
+    marks = ",".join("?" * len(columns))
+    if upsert:
+        conn.executemany(
+            "UPDATE items SET " + ",".join(f"{c} = ?" for c in columns[1:]) + " WHERE filename = ?",
+            [r[1:] + r[:1] for r in rows],
+        )
+        conn.executemany(
+            f"INSERT INTO items({cols}) SELECT {marks} "
+            "WHERE NOT EXISTS (SELECT 1 FROM items WHERE filename = ?)",
+            [r + r[:1] for r in rows],
+        )
+    else:
+        conn.executemany(f"INSERT INTO items({cols}) VALUES({marks})", rows)
+
+@metrics.timed("db.add_items")
+def add_items(rows: Iterable[tuple], upsert: bool = False, db_path: str | None = None, conn: sqlite3.Connection | None = None) -> int:
+    """
+    Bulk insert of item tuples ordered like ITEM_COLUMNS, on one connection and
+    in one transaction.
+
+    With upsert=True rows are keyed on filename: existing items are updated in
+    place and only unseen filenames are inserted, so re-syncing the same data
+    does not create duplicates (the last row wins for repeated filenames).
+
+    If conn is given the caller owns the transaction and must commit (and
+    call notify("bulk") once it has).
+
+    Returns the number of rows written.
+    """
+    rows = list(rows)
+    if upsert:
+        rows = list({r[0]: r for r in rows}.values())
+    if conn is not None:
+        _write_items(conn, rows, upsert)
+        return len(rows)
+    with write_conn(db_path) as conn:  # single transaction
+        _write_items(conn, rows, upsert)
+    notify("bulk", db_path=db_path)
+    return len(rows)
+
+# Row shape: (id, filename, type, dominant_color, pattern, season, formality,
+#             color_rgb, color_l, color_a, color_b, tag_status)
+ITEM_SELECT = ("SELECT id, filename, type, dominant_color, pattern, season, formality, "
+               "color_rgb, color_l, color_a, color_b, tag_status FROM items")
+
+@metrics.timed("db.list_items")
 def list_items(limit: int = 50):
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT id, filename, type, dominant_color, pattern, season, formality FROM items ORDER BY id DESC LIMIT ?", (limit,))
-        return cur.fetchall()
+    cur = read_conn().cursor()
+    cur.execute(f"{ITEM_SELECT} ORDER BY id DESC LIMIT ?", (limit,))
+    return cur.fetchall()
+
+@metrics.timed("db.all_items")
+def all_items(db_path: str | None = None):
+    """Every item, newest first (same row shape as list_items)."""
+    return read_conn(db_path).execute(f"{ITEM_SELECT} ORDER BY id DESC").fetchall()
+
+def _match(column: str, value, where: list[str], params: list):
+    """Add `column = ?` (scalar) or `column IN (...)` (list/tuple/set) to a WHERE clause."""
+    if value is None:
+        return
+    if isinstance(value, (list, tuple, set)):
+        value = list(value)
+        where.append(f"{column} IN ({','.join('?' * len(value))})")
+        params.extend(value)
+    else:
+        where.append(f"{column} = ?")
+        params.append(value)
+
+@metrics.timed("db.query_items")
+def query_items(type: str | list[str] | None = None, season: str | list[str] | None = None,
+                formality_range: tuple[int, int] | None = None, added_since: str | None = None,
+                after_id: int | None = None, limit: int = 50, db_path: str | None = None):
+    """
+    Filtered, newest-first item listing with keyset pagination.
+
+    Rows have the same shape as list_items. To fetch the next page pass the
+    id of the last row you received as after_id; unlike OFFSET this stays an
+    index seek however deep you page.
+    """
+    where: list[str] = []
+    params: list = []
+    _match("type", type, where, params)
+    _match("season", season, where, params)
+    if formality_range is not None:
+        lo, hi = int(formality_range[0]), int(formality_range[1])
+        if hi - lo < 64:
+            # Formality is a small integer scale: an IN list lets SQLite walk
+            # each index run in id order instead of sorting the whole range
+            _match("formality", list(range(lo, hi + 1)), where, params)
+        else:
+            where.append("+formality BETWEEN ? AND ?")  # "+" = don't use the index, scan by id
+            params.extend([lo, hi])
+    if added_since is not None:
+        where.append("added_at >= ?")
+        params.append(added_since)
+    if after_id is not None:
+        where.append("id < ?")
+        params.append(after_id)
+    sql = ITEM_SELECT
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id DESC LIMIT ?"
+    params.append(limit)
+    return read_conn(db_path).execute(sql, params).fetchall()
+
+# ---- Tagging queue ----
+# Uploads are inserted untagged (tag_status 'pending') together with a job;
+# workers claim jobs, tag the image and write the result with finish_tag_job.
+# A claim is a lease: a 'running' job whose lease has run out (its worker
+# died) is claimable again, while live workers in other processes keep theirs.
+
+MAX_TAG_ATTEMPTS = 3
+TAG_LEASE_SECONDS = 120  # far longer than tagging one batch takes
+
+def enqueue_uploads(files: Iterable[tuple[str, str]], db_path: str | None = None) -> list[int]:
+    """
+    Insert pending items for (filename, image path) pairs and queue a tagging
+    job for each, in one transaction. Returns the new item ids.
+    """
+    ids = []
+    with write_conn(db_path) as conn:
+        for filename, path in files:
+            item_id = conn.execute(
+                "INSERT INTO items(filename, tag_status) VALUES(?, 'pending')", (filename,)
+            ).lastrowid
+            conn.execute("INSERT INTO tag_jobs(item_id, path) VALUES(?,?)", (item_id, path))
+            ids.append(item_id)
+    for item_id in ids:
+        notify("add", get_items([item_id], db_path)[0], db_path)
+    return ids
+
+def claim_tag_jobs(limit: int, db_path: str | None = None,
+                   lease: float = TAG_LEASE_SECONDS) -> list[tuple[int, int, str]]:
+    """
+    Atomically mark up to limit pending jobs (or running ones whose lease has
+    expired) running, leased for `lease` seconds; returns (job id, item id,
+    path), oldest first.
+    """
+    now = time.time()
+    with write_conn(db_path) as conn:
+        rows = conn.execute(
+            "UPDATE tag_jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, "
+            "updated_at = CURRENT_TIMESTAMP "
+            "WHERE id IN (SELECT id FROM tag_jobs WHERE status = 'pending' "
+            "             OR (status = 'running' AND COALESCE(lease_until, 0) < ?) ORDER BY id LIMIT ?) "
+            "RETURNING id, item_id, path",
+            (now + lease, now, limit),
+        ).fetchall()
+    return sorted(rows)
+
+def finish_tag_job(job_id: int, item_id: int, type_: str | None = None, dominant_color: str | None = None,
+                   error: str | None = None, db_path: str | None = None):
+    """
+    Record a job's outcome. On success the item gets its tags; on error the
+    job is retried until MAX_TAG_ATTEMPTS, then the item is marked failed.
+    """
+    with write_conn(db_path) as conn:
+        if error is None:
+            conn.execute(
+                "UPDATE items SET type = ?, dominant_color = ?, color_rgb = ?, color_l = ?, color_a = ?, "
+                "color_b = ?, tag_status = 'done' WHERE id = ?",
+                (type_, dominant_color) + color_columns([dominant_color])[0] + (item_id,),
+            )
+            status = "done"
+        else:
+            (attempts,) = conn.execute("SELECT attempts FROM tag_jobs WHERE id = ?", (job_id,)).fetchone()
+            status = "pending" if attempts < MAX_TAG_ATTEMPTS else "failed"
+            if status == "failed":
+                conn.execute("UPDATE items SET tag_status = 'failed' WHERE id = ?", (item_id,))
+        conn.execute(
+            "UPDATE tag_jobs SET status = ?, error = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (status, error, job_id),
+        )
+    if status != "pending":
+        rows = get_items([item_id], db_path)
+        if rows:
+            notify("add", rows[0], db_path)  # re-add replaces the item in listeners
+
+def requeue_running_jobs(db_path: str | None = None) -> int:
+    """
+    Put jobs left 'running' by a stopped process back in the queue (call
+    before starting workers). Only expired leases count: jobs claimed by a
+    worker that is still alive, e.g. in another process, are left alone.
+    """
+    with write_conn(db_path) as conn:
+        return conn.execute(
+            "UPDATE tag_jobs SET status = 'pending' WHERE status = 'running' AND COALESCE(lease_until, 0) < ?",
+            (time.time(),),
+        ).rowcount
+
+def tag_queue_counts(db_path: str | None = None) -> dict[str, int]:
+    rows = read_conn(db_path).execute("SELECT status, COUNT(*) FROM tag_jobs GROUP BY status").fetchall()
+    return dict(rows)
+
+@metrics.timed("db.get_items")
+def get_items(ids: Iterable[int], db_path: str | None = None):
+    """Rows (ITEM_SELECT shape) for the given ids that exist, in id order."""
+    ids = list(ids)
+    if not ids:
+        return []
+    sql = f"{ITEM_SELECT} WHERE id IN ({','.join('?' * len(ids))}) ORDER BY id"
+    return read_conn(db_path).execute(sql, ids).fetchall()
+
+# ---- Feedback ----
+# item_ids is stored comma-separated (see schema.sql)
+
+def add_feedback(item_ids: Iterable[int], label: str, reason: str | None = None,
+                 db_path: str | None = None) -> int:
+    """Record a like/dislike for an outfit and notify listeners (e.g. the feedback scorer)."""
+    if label not in ("like", "dislike"):
+        raise ValueError(f"label must be 'like' or 'dislike', got {label!r}")
+    ids = [int(i) for i in item_ids]
+    with write_conn(db_path) as conn:
+        cur = conn.execute(
+            "INSERT INTO feedback(item_ids, label, reason) VALUES(?,?,?)",
+            (",".join(map(str, ids)), label, reason),
+        )
+        feedback_id = cur.lastrowid
+    notify("feedback", (feedback_id, ids, label), db_path)
+    return feedback_id
+
+def list_feedback(after_id: int = 0, db_path: str | None = None) -> list[tuple[int, list[int], str]]:
+    """(id, [item ids], label) for feedback newer than after_id, oldest first."""
+    rows = read_conn(db_path).execute(
+        "SELECT id, item_ids, label FROM feedback WHERE id > ? ORDER BY id", (after_id,)
+    ).fetchall()
+    return [(id_, [int(x) for x in ids.split(",") if x.strip()], label) for id_, ids, label in rows]
 
 if __name__ == "__main__":
     import argparse
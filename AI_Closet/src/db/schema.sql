@@ -9,7 +9,43 @@ CREATE TABLE IF NOT EXISTS items (
     season TEXT,
     formality INTEGER,
     notes TEXT,
-    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Numeric forms of dominant_color, filled at ingest (db.migrate backfills old DBs)
+    color_rgb INTEGER,  -- packed 0xRRGGBB
+    color_l REAL,       -- CIELAB L*
+    color_a REAL,       -- CIELAB a*
+    color_b REAL,       -- CIELAB b*
+    tag_status TEXT DEFAULT 'done'  -- 'pending' while queued for tagging, 'done' or 'failed' after
+);
+
+-- Lookup key for upserts during CSV sync (not UNIQUE: older DBs may hold duplicates)
+CREATE INDEX IF NOT EXISTS idx_items_filename ON items(filename);
+-- Filters for query_items; SQLite appends the rowid (id) to every index, so
+-- "WHERE type = ? AND id < ? ORDER BY id DESC" is a single index range scan
+CREATE INDEX IF NOT EXISTS idx_items_type ON items(type);
+CREATE INDEX IF NOT EXISTS idx_items_season ON items(season);
+CREATE INDEX IF NOT EXISTS idx_items_formality ON items(formality);
+CREATE INDEX IF NOT EXISTS idx_items_added_at ON items(added_at);
+
+-- Background tagging queue for uploads (db.enqueue_uploads, src/vision/tag_worker.py);
+-- persisted so queued work survives restarts
+CREATE TABLE IF NOT EXISTS tag_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending','running','done','failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    lease_until REAL,  -- unix time until which the claiming worker owns a 'running' job
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_tag_jobs_status ON tag_jobs(status, id);
+
+-- Row of each item's embedding in the float16 matrix file (src/vision/embeddings.py)
+CREATE TABLE IF NOT EXISTS item_embeddings (
+    item_id INTEGER PRIMARY KEY,
+    row INTEGER NOT NULL UNIQUE
 );
 
 CREATE TABLE IF NOT EXISTS feedback (
@@ -19,3 +55,11 @@ CREATE TABLE IF NOT EXISTS feedback (
     reason TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+
+-- Checkpoints for chunked CSV ingestion (data_loader.stream_and_sync)
+CREATE TABLE IF NOT EXISTS ingest_progress (
+    source TEXT PRIMARY KEY,     -- absolute CSV path
+    fingerprint TEXT NOT NULL,   -- size:mtime_ns of the CSV when the run started
+    rows_done INTEGER NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,136 @@
+import os
+import time
+import hashlib
+import sqlite3
+
+from src.db.db import DEFAULT_DB
+
+# Lives next to wardrobe.db unless TAG_CACHE_PATH is set
+DEFAULT_CACHE_DB = os.environ.get("TAG_CACHE_PATH", os.path.join(os.path.dirname(DEFAULT_DB), "tag_cache.db"))
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tags (
+    sha256 TEXT PRIMARY KEY,
+    dominant_color TEXT,
+    type TEXT,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tags_last_used ON tags(last_used);
+
+-- Fast path: a file whose (mtime, size) is unchanged keeps its known hash
+CREATE TABLE IF NOT EXISTS paths (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+"""
+
+TAG_FIELDS = ("dominant_color", "type")
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class TagCache:
+    """
+    Persistent cache of tagger outputs keyed by image content hash.
+
+    Files are only hashed when their (mtime, size) differs from what the cache
+    last saw at that path. Once more than max_entries results are stored, the
+    least recently used ones are evicted.
+    """
+
+    def __init__(self, db_path: str | None = None, max_entries: int = 100_000):
+        self.db_path = db_path or DEFAULT_CACHE_DB
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(CACHE_SCHEMA)
+        # path -> (mtime_ns, size, sha256) resolved in this session; re-validated on every call
+        self._keys: dict[str, tuple[int, int, str]] = {}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def content_key(self, path: str) -> str:
+        """sha256 of the file, skipping the hash when mtime+size are unchanged."""
+        st = os.stat(path)
+        cached = self._keys.get(path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        row = self.conn.execute("SELECT mtime_ns, size, sha256 FROM paths WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == st.st_mtime_ns and row[1] == st.st_size:
+            key = row[2]
+        else:
+            key = file_sha256(path)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO paths(path, mtime_ns, size, sha256) VALUES(?,?,?,?)",
+                (path, st.st_mtime_ns, st.st_size, key),
+            )
+        self._keys[path] = (st.st_mtime_ns, st.st_size, key)
+        return key
+
+    def lookup(self, paths: list[str]) -> dict[str, dict]:
+        """Return {path: {"dominant_color": ..., "type": ...}} for cached paths only."""
+        keys = {}
+        for p in paths:
+            try:
+                keys[p] = self.content_key(p)
+            except OSError:
+                continue
+        found: dict[str, tuple] = {}
+        uniq = list(set(keys.values()))
+        for i in range(0, len(uniq), 500):  # stay under SQLite's variable limit
+            batch = uniq[i:i + 500]
+            marks = ",".join("?" * len(batch))
+            for sha, color, type_ in self.conn.execute(
+                f"SELECT sha256, dominant_color, type FROM tags WHERE sha256 IN ({marks})", batch
+            ):
+                found[sha] = (color, type_)
+        if found:
+            now = time.time()
+            self.conn.executemany("UPDATE tags SET last_used = ? WHERE sha256 = ?", [(now, s) for s in found])
+        self.conn.commit()
+        return {p: dict(zip(TAG_FIELDS, found[k])) for p, k in keys.items() if k in found}
+
+    def store(self, results: dict[str, dict]):
+        """Cache tagger outputs, given as {path: {"dominant_color": ..., "type": ...}}."""
+        now = time.time()
+        rows = []
+        for p, tags in results.items():
+            try:
+                key = self.content_key(p)
+            except OSError:
+                continue
+            rows.append((key, tags.get("dominant_color"), tags.get("type"), now))
+        self.conn.executemany(
+            "INSERT INTO tags(sha256, dominant_color, type, last_used) VALUES(?,?,?,?) "
+            "ON CONFLICT(sha256) DO UPDATE SET "
+            "dominant_color = COALESCE(excluded.dominant_color, tags.dominant_color), "
+            "type = COALESCE(excluded.type, tags.type), last_used = excluded.last_used",
+            rows,
+        )
+        self._evict()
+        self.conn.commit()
+
+    def _evict(self):
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM tags").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        self.conn.execute(
+            "DELETE FROM tags WHERE sha256 IN (SELECT sha256 FROM tags ORDER BY last_used LIMIT ?)", (excess,)
+        )
+        self.conn.execute("DELETE FROM paths WHERE sha256 NOT IN (SELECT sha256 FROM tags)")
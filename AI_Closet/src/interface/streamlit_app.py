@@ -2,8 +2,8 @@
 
 import os
 import sys
-import glob
 import random
+from contextlib import nullcontext
 from dataclasses import dataclass
 
 import streamlit as st
@@ -15,9 +15,17 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 # ---------- Project imports ----------
-from src.db.db import list_items, add_item
-from src.vision.tagger import extract_dominant_color, classify_type_from_name
-from src.recommender.rules import recommend  # don't import Item from rules
+from src.db.db import add_feedback, check_external_writes, delete_item, enqueue_uploads, query_items, tag_queue_counts, wardrobe_version
+from src.vision.tag_worker import TagWorker
+from src.vision.thumbnails import ThumbnailStore
+from src.recommender.index import WardrobeIndex
+from src.recommender.cache import RecommendationCache
+from src.recommender.feedback import FeedbackScorer
+from src.recommender.rules import recommend
+from src.recommender.sampler import stable_seed
+from src.utils.colors import parse_rgb, pack_rgb, unpack_rgb, GRAY
+from src.utils import metrics
+from src.utils.image_index import ImageIndex
 
 # ---------- Types ----------
 @dataclass
@@ -26,51 +34,73 @@ class Item:
     filename: str
     type: str
     color: str
+    rgb: int | None = None  # packed 0xRRGGBB from items.color_rgb
+    season: str | None = None
+    formality: int | None = None
     # Extend later if you want:
     # pattern: str | None = None
-    # season: str | None = None
-    # formality: int | None = None
 
 # ---------- Helpers ----------
-ALLOWED_EXTS = {".jpg", ".jpeg", ".png"}
+@st.cache_resource
+def get_image_index(images_dir: str) -> ImageIndex:
+    """One scandir'd filename index per images dir, rescanned when the dir changes."""
+    return ImageIndex(images_dir)
 
 def find_image_path(images_dir: str, filename: str) -> str | None:
     """
     Return a valid local path to the image, trying .jpg/.jpeg/.png.
     Works even if DB has a different extension than the file on disk.
+    (A dict lookup in the cached directory index, no filesystem probing.)
     """
-    if not filename:
-        return None
-    base, ext = os.path.splitext(filename)
-    # 1) If full filename exists, use it
-    direct = os.path.join(images_dir, filename)
-    if os.path.exists(direct):
-        return direct
-    # 2) Try other allowed extensions for same basename
-    for e in (ALLOWED_EXTS - {ext.lower()} if ext else ALLOWED_EXTS):
-        cand = os.path.join(images_dir, base + e)
-        if os.path.exists(cand):
-            return cand
-    # 3) Last resort: glob basename.*
-    for m in glob.glob(os.path.join(images_dir, base + ".*")):
-        if os.path.splitext(m)[1].lower() in ALLOWED_EXTS and os.path.exists(m):
-            return m
-    return None
-
-def rgb_swatch(rgb_str: str, size=(224, 224)) -> Image.Image:
+    return get_image_index(images_dir).resolve(filename)
+
+def rgb_swatch(color: int | str | None, size=(224, 224)) -> Image.Image:
     """
-    Create a solid color image from 'rgb(R,G,B)'.
+    Create a solid color image from a packed 0xRRGGBB int (preferred, no
+    parsing) or an 'rgb(R,G,B)' string.
     Falls back to mid-gray on parse errors.
     """
-    try:
-        s = rgb_str.strip()
-        if s.lower().startswith("rgb(") and s.endswith(")"):
-            nums = [int(x) for x in s[4:-1].split(",")]
-            if len(nums) == 3:
-                return Image.new("RGB", size, tuple(nums))
-    except Exception:
-        pass
-    return Image.new("RGB", size, (128, 128, 128))
+    if isinstance(color, str):
+        rgb = parse_rgb(color)
+        color = pack_rgb(rgb) if rgb else None
+    if color is None:
+        color = GRAY
+    return Image.new("RGB", size, tuple(int(c) for c in unpack_rgb(color)))
+
+def item_from_row(r) -> Item:
+    return Item(
+        id=r[0],
+        filename=r[1],
+        type=(r[2] or "unknown"),
+        color=(r[3] or "rgb(128,128,128)"),
+        rgb=r[7],
+        season=r[5],
+        formality=r[6],
+    )
+
+@st.cache_resource
+def get_index() -> WardrobeIndex:
+    """One wardrobe index per server process, kept current by db.py writes."""
+    return WardrobeIndex.from_db(make_item=item_from_row)
+
+@st.cache_resource
+def get_feedback_scorer() -> FeedbackScorer:
+    """Outfit scorer learned from 👍/👎, one SGD step per click (see recommender/feedback.py)."""
+    return FeedbackScorer.from_db(make_item=item_from_row)
+
+@st.cache_resource
+def get_thumbnails() -> ThumbnailStore:
+    """Small WebP/JPEG copies of the images; st.image gets these, never the originals."""
+    return ThumbnailStore()
+
+@st.cache_resource
+def get_tag_worker() -> TagWorker:
+    """Background taggers for uploads; resumes jobs queued before a restart."""
+    return TagWorker(workers=2, thumbnails=get_thumbnails()).start()
+
+@st.cache_resource
+def get_rec_cache() -> RecommendationCache:
+    return RecommendationCache(maxsize=256)
 
 # ---------- Streamlit page setup ----------
 st.set_page_config(page_title="AI Closet", page_icon="👕", layout="wide")
@@ -83,43 +113,136 @@ os.makedirs(IMAGES_DIR, exist_ok=True)
 # ---------- Sidebar: upload & auto-tag ----------
 with st.sidebar:
     st.header("Upload Clothing")
-    upl = st.file_uploader("Add image", type=["png", "jpg", "jpeg"])
-    if upl is not None:
-        save_path = os.path.join(IMAGES_DIR, upl.name)
-        with open(save_path, "wb") as f:
-            f.write(upl.getbuffer())
-        # quick auto-tags
-        color = extract_dominant_color(save_path)
-        itype = classify_type_from_name(upl.name)
-        add_item(filename=upl.name, type_=itype, dominant_color=color)
-        st.success(f"Saved {upl.name} as {itype} with color {color}")
+    worker = get_tag_worker()
+    uploads = st.file_uploader("Add images", type=["png", "jpg", "jpeg"], accept_multiple_files=True)
+    # The uploader keeps its files across reruns: only queue ones we haven't yet
+    seen = st.session_state.setdefault("queued_uploads", set())
+    new = [u for u in uploads or [] if (u.name, u.size) not in seen]
+    if new:
+        saved = []
+        for upl in new:
+            save_path = os.path.join(IMAGES_DIR, upl.name)
+            with open(save_path, "wb") as f:
+                f.write(upl.getbuffer())
+            get_image_index(IMAGES_DIR).add(save_path)
+            saved.append((upl.name, save_path))
+            seen.add((upl.name, upl.size))
+        # Tagging (colors, type, thumbnails) happens in the background
+        enqueue_uploads(saved)
+        worker.wake()
+        st.success(f"Saved {len(saved)} image(s); tagging in the background.")
+
+    queue = tag_queue_counts()
+    busy = queue.get("pending", 0) + queue.get("running", 0)
+    if busy:
+        st.caption(f"Tagging queue: {busy} waiting" + (f", {queue['failed']} failed" if queue.get("failed") else ""))
+        if st.button("Refresh"):
+            st.rerun()
+
+    stats = get_rec_cache().stats()
+    st.caption(
+        f"Recommendation cache: {stats['hits']} hits / {stats['misses']} misses "
+        f"({stats['hit_rate']:.0%}), {stats['evictions']} evictions, {stats['size']}/{stats['maxsize']} entries"
+    )
+
+    # Timings are process-wide and shown as of the start of this rerun
+    with st.expander("⏱ Performance"):
+        metrics.enable(st.checkbox("Collect timings", value=metrics.enabled()))
+        snap = metrics.snapshot()
+        if snap["histograms"]:
+            st.dataframe([
+                {"op": op, "calls": h["count"], "mean ms": 1000 * h["sum"] / h["count"],
+                 "p50 ≤ ms": 1000 * h["p50"], "p95 ≤ ms": 1000 * h["p95"], "max ms": 1000 * h["max"]}
+                for op, h in snap["histograms"].items()
+            ], use_container_width=True)
+            st.caption(", ".join(f"{name}: {metrics.format_value(value)}" for name, value in snap["counters"].items()))
+        elif metrics.enabled():
+            st.caption("Nothing recorded yet.")
+        d1, d2 = st.columns(2)
+        with d1:
+            st.download_button("JSON", metrics.to_json(), "metrics.json", "application/json")
+        with d2:
+            st.download_button("Prometheus", metrics.to_prometheus(), "metrics.prom", "text/plain")
+        if st.button("Reset timings"):
+            metrics.reset()
+            st.rerun()
+        if st.button("Profile next recommendation"):
+            st.session_state.profile_next = True
+        if st.session_state.get("profile_next"):
+            st.caption("Click **Suggest Outfits** or **Regenerate** to capture a profile.")
+        if st.session_state.get("last_profile"):
+            st.code(st.session_state.last_profile, language=None)
 
 # ---------- Current wardrobe ----------
 st.subheader("Current Wardrobe")
-rows = list_items(limit=200)  # (id, filename, type, dominant_color, pattern, season, formality)
-if rows:
-    st.dataframe(rows, use_container_width=True)
+PAGE_SIZE = 50
+f1, f2, f3 = st.columns(3)
+with f1:
+    type_filter = st.multiselect("Type", ["top", "bottom", "outerwear", "shoes", "unknown"])
+with f2:
+    season_filter = st.multiselect("Season", ["spring", "summer", "fall", "winter"])
+with f3:
+    formality_filter = st.slider("Formality", 0, 5, value=(0, 5))
+
+# Keyset pagination: remember the last id of each page we've shown
+filters = (tuple(type_filter), tuple(season_filter), formality_filter)
+if st.session_state.get("page_filters") != filters:
+    st.session_state.page_filters = filters
+    st.session_state.page_cursors = [None]
+
+page = query_items(
+    type=type_filter or None,
+    season=season_filter or None,
+    formality_range=None if formality_filter == (0, 5) else formality_filter,
+    after_id=st.session_state.page_cursors[-1],
+    limit=PAGE_SIZE,
+)  # (id, filename, type, dominant_color, pattern, season, formality, <colors>, tag_status)
+if page:
+    shown = ("id", "filename", "type", "dominant_color", "pattern", "season", "formality", "status")
+    st.dataframe(
+        [dict(zip(shown, r[:7] + (r[11],))) for r in page],  # hide derived color columns
+        use_container_width=True,
+    )
+    p1, p2 = st.columns([1, 1])
+    with p1:
+        if len(st.session_state.page_cursors) > 1 and st.button("◀ Previous page"):
+            st.session_state.page_cursors.pop()
+            st.rerun()
+    with p2:
+        if len(page) == PAGE_SIZE and st.button("Next page ▶"):
+            st.session_state.page_cursors.append(page[-1][0])
+            st.rerun()
+    with st.expander("Delete an item"):
+        del_id = st.number_input("Item id", min_value=1, step=1)
+        if st.button("Delete"):
+            if delete_item(int(del_id)):
+                st.success(f"Deleted item {int(del_id)}")
+                st.rerun()
+            else:
+                st.warning(f"No item with id {int(del_id)}")
+elif any(filters[:2]) or formality_filter != (0, 5):
+    st.info("No items match these filters.")
 else:
     st.info("No items yet — upload from the sidebar.")
 
+
 # ---------- Controls ----------
 st.subheader("Get Recommendations")
-c1, c2 = st.columns(2)
+c1, c2, c3 = st.columns(3)
 with c1:
     temp = st.slider("Temperature (°F)", 30, 100, value=68)
 with c2:
     occasion = st.selectbox("Occasion", ["class", "work", "casual", "formal"])
+with c3:
+    personalize = st.checkbox("Rank by my 👍/👎 feedback", value=False)
 
-# Build items fresh each run (keeps in sync with DB)
-items = [
-    Item(
-        id=r[0],
-        filename=r[1],
-        type=(r[2] or "unknown"),
-        color=(r[3] or "rgb(128,128,128)"),
-    )
-    for r in rows
-]
+# Recommendations come from the shared in-memory index (updated incrementally
+# on upload/delete; reloaded only after bulk syncs, including writes made by
+# other processes, which check_external_writes turns into a bulk notification)
+check_external_writes()
+index = get_index()
+if index.stale:
+    index.reload()
 
 # ---- Session state for context, results, and regen ----
 ctx = {"temp_f": temp, "occasion": occasion}
@@ -138,6 +261,22 @@ with b1:
 with b2:
     regen_clicked = st.button("Regenerate")
 
+def compute_recs(ctx, seed):
+    if seed == 0:
+        # Compute recommendations (served from cache until the wardrobe or ctx changes)
+        # (feedback is a DB write too, so it bumps wardrobe_version; other
+        # processes' writes bump it via the check_external_writes above)
+        if personalize:
+            scorer = get_feedback_scorer()
+            return get_rec_cache().get_or_compute(
+                wardrobe_version(), {**ctx, "ranking": "feedback"},
+                lambda: recommend(index.items(), ctx, score_fn=scorer.score_fn),
+            )
+        return get_rec_cache().get_or_compute(wardrobe_version(), ctx, lambda: index.recommend(ctx))
+    # Regenerate: fresh outfits from a seeded walk over the pair space,
+    # O(10) work however large the wardrobe is
+    return index.sample(ctx, seed, n=10)
+
 # We ONLY compute on button clicks (no auto-run on context change)
 should_compute = run_clicked or regen_clicked
 
@@ -151,13 +290,16 @@ if should_compute:
 
     st.session_state.last_ctx = ctx
 
-    # Deterministic variety for same (ctx, seed)
-    rng = random.Random(hash((ctx["temp_f"], ctx["occasion"], st.session_state.regen_seed)))
-
-    # Compute recommendations
-    recs = recommend(items, ctx)  # expects objects with .type and .color
+    seed = st.session_state.regen_seed
+    # cProfile of this one computation, opted into from the Performance panel
+    profile = st.session_state.pop("profile_next", False)
+    with metrics.profiled() if profile else nullcontext() as prof:
+        recs = compute_recs(ctx, seed)
+    if profile:
+        st.session_state.last_profile = prof.text
 
-    # Shuffle for variety (stable for same ctx+seed)
+    # Shuffle for variety (stable for same ctx+seed, across restarts too)
+    rng = random.Random(stable_seed(ctx, seed))
     if recs:
         rng.shuffle(recs)
         for outfit in recs:
@@ -173,14 +315,25 @@ if recs is None:
 elif not recs:
     st.warning("No valid outfits yet. Try uploading at least one top and one bottom.")
 else:
-    for outfit in recs:
+    for n, outfit in enumerate(recs):
         st.write("— **Outfit** —")
+        ids = [it.id for it in outfit]
+        f1, f2, _ = st.columns([1, 1, 6])
+        with f1:
+            if st.button("👍 Like", key=f"like-{n}-{ids}"):
+                add_feedback(ids, "like")
+                st.toast("Thanks! Learning from that.")
+        with f2:
+            if st.button("👎 Dislike", key=f"dislike-{n}-{ids}"):
+                add_feedback(ids, "dislike")
+                st.toast("Got it — fewer outfits like this.")
         cols = st.columns(len(outfit))
         for idx, it in enumerate(outfit):
             img_path = find_image_path(IMAGES_DIR, getattr(it, "filename", "") or "")
             with cols[idx]:
-                if img_path:
-                    st.image(img_path, caption=f"{it.type} (id={it.id})")
+                thumb = get_thumbnails().get(img_path) if img_path else None
+                if thumb:
+                    st.image(thumb, caption=f"{it.type} (id={it.id})")
                 else:
                     st.info(f"Showing color swatch (missing image: {getattr(it, 'filename', 'unknown')})")
-                    st.image(rgb_swatch(it.color), caption=f"{it.type} (id={it.id})")
+                    st.image(rgb_swatch(it.rgb if it.rgb is not None else it.color), caption=f"{it.type} (id={it.id})")
@@ -0,0 +1,74 @@
+"""
+Bounded LRU cache of recommendation results.
+
+Keys are (wardrobe version, normalized context, k). db.py bumps the wardrobe
+version on every write, so entries never need explicit invalidation: after a
+write they are simply never asked for again and age out of the LRU. Writes
+from other processes only bump it once db.check_external_writes() has seen
+them, so callers run that check before reading the version for a request.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+
+def normalize_context(context: Dict) -> tuple:
+    """Canonical, hashable form of a context dict (key order, case and float noise removed)."""
+    norm = []
+    for key in sorted(context):
+        value = context[key]
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        elif isinstance(value, float):
+            value = round(value, 1)
+        elif isinstance(value, str):
+            value = value.strip().lower()
+        norm.append((key, value))
+    return tuple(norm)
+
+
+class RecommendationCache:
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, version: int, context: Dict, compute: Callable[[], list], k: int = 10) -> list:
+        """
+        Cached result for (version, context, k), calling compute() on a miss.
+        Returns a shallow copy so callers may shuffle it freely.
+        """
+        key: Hashable = (version, normalize_context(context), k)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return [list(outfit) for outfit in self._data[key]]
+            self.misses += 1
+        value = tuple(tuple(outfit) for outfit in compute())
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return [list(outfit) for outfit in value]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,129 @@
+"""
+Vectorized pair scoring for the recommender.
+
+Instead of looping over every top x bottom pair in Python, item features are
+turned into NumPy arrays once, a scoring function fills a block of the
+(tops x bottoms) score matrix with broadcasting, and argpartition keeps only
+the best k pairs seen so far. Memory is bounded by the block size, not T*B.
+"""
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.utils import metrics
+from src.utils.colors import parse_rgb, pack_rgb, unpack_rgb, rgb_to_lab, GRAY
+
+# score_fn(top_features, bottom_features) -> scores. Top arrays are shaped
+# (T, 1, ...) and bottom arrays (1, B, ...), so plain broadcasting yields a
+# (T, B) matrix. Higher is better; -inf marks an invalid pair.
+ScoreFn = Callable[[Dict[str, np.ndarray], Dict[str, np.ndarray]], np.ndarray]
+
+
+def item_packed_rgb(item) -> int:
+    """The stored packed color, only parsing the string as a fallback (gray if unparseable)."""
+    p = getattr(item, "rgb", None)
+    if p is None:
+        rgb = parse_rgb(item.color)
+        p = pack_rgb(rgb) if rgb else GRAY
+    return p
+
+
+def item_rgb(items) -> np.ndarray:
+    """(N, 3) uint8 colors for a list of items."""
+    packed = np.array([item_packed_rgb(i) for i in items], dtype=np.int64)
+    return unpack_rgb(packed).reshape(-1, 3)
+
+
+def is_dark(rgb: np.ndarray) -> np.ndarray:
+    return rgb.mean(axis=-1) < 60
+
+
+# Small integer codes for categorical attributes; 0 = unknown (or "all" seasons)
+TYPES = ("unknown", "top", "bottom", "outerwear", "shoes")
+SEASONS = ("", "spring", "summer", "fall", "winter")
+_TYPE_CODE = {name: code for code, name in enumerate(TYPES)}
+_SEASON_CODE = {name: code for code, name in enumerate(SEASONS)}
+
+
+def season_code(season: str | None) -> int:
+    return _SEASON_CODE.get((season or "").strip().lower(), 0)
+
+
+def item_features(items) -> Dict[str, np.ndarray]:
+    rgb = item_rgb(items)
+    formality = [getattr(i, "formality", None) for i in items]
+    return {
+        "rgb": rgb,
+        "lab": rgb_to_lab(rgb).astype(np.float32),
+        "dark": is_dark(rgb),
+        "type": np.array([_TYPE_CODE.get(i.type, 0) for i in items], dtype=np.int8),
+        "season": np.array([season_code(getattr(i, "season", None)) for i in items], dtype=np.int8),
+        # NaN where unknown
+        "formality": np.array([np.nan if f is None else f for f in formality], dtype=np.float32),
+    }
+
+
+def basic_color_score(t: Dict[str, np.ndarray], b: Dict[str, np.ndarray]) -> np.ndarray:
+    """rules.basic_color_ok as a score: 0 for allowed pairs, -inf for dark-on-dark."""
+    return np.where(t["dark"] & b["dark"], -np.inf, 0.0)
+
+
+def contrast_score(t: Dict[str, np.ndarray], b: Dict[str, np.ndarray]) -> np.ndarray:
+    """Prefer contrasting pairs: CIELAB distance (Delta E 1976), dark-on-dark excluded."""
+    tl, bl = t["lab"].reshape(-1, 3), b["lab"].reshape(-1, 3)
+    # |t - b|^2 = |t|^2 + |b|^2 - 2 t.b, so the cross term is one BLAS matmul
+    d2 = (tl ** 2).sum(axis=1)[:, None] + (bl ** 2).sum(axis=1)[None, :] - 2 * (tl @ bl.T)
+    delta_e = np.sqrt(np.maximum(d2, 0))
+    return np.where(t["dark"] & b["dark"], -np.inf, delta_e)
+
+
+def select_top_k(scores: np.ndarray, ids: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Best k (score, id) pairs, highest score first; ties go to the lower id so
+    results are deterministic and match row-major enumeration order.
+    """
+    valid = scores > -np.inf
+    scores, ids = scores[valid], ids[valid]
+    if len(scores) > k:
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = scores > kth
+        ties = np.flatnonzero(scores == kth)
+        ties = ties[np.argsort(ids[ties], kind="stable")][: k - int(above.sum())]
+        keep = np.concatenate([np.flatnonzero(above), ties])
+        scores, ids = scores[keep], ids[keep]
+    order = np.lexsort((ids, -scores))
+    return scores[order], ids[order]
+
+
+@metrics.timed("recommender.top_k_pairs")
+def top_k_pairs(tops: Sequence, bottoms: Sequence, k: int = 10, score_fn: ScoreFn = basic_color_score,
+                block_elems: int = 1 << 22) -> List[Tuple[int, int, float]]:
+    """
+    Return up to k (top_index, bottom_index, score) triples with the highest
+    scores, best first. Pairs scoring -inf are never returned.
+    """
+    nt, nb = len(tops), len(bottoms)
+    if nt == 0 or nb == 0 or k <= 0:
+        return []
+    metrics.incr("recommender.pairs_scored", nt * nb)
+    tf, bf = item_features(tops), item_features(bottoms)
+    bf = {name: v[None, :] for name, v in bf.items()}
+    rows = max(1, block_elems // nb)
+
+    best_s = np.empty(0)
+    best_i = np.empty(0, dtype=np.int64)
+    for start in range(0, nt, rows):
+        block = {name: v[start:start + rows, None] for name, v in tf.items()}
+        scores = np.broadcast_to(score_fn(block, bf), (len(block["dark"]), nb)).ravel()
+        # Once k pairs are held, a later pair must beat the worst of them
+        # outright: on a tie the earlier (lower id) pair already wins.
+        threshold = best_s[-1] if len(best_s) == k else -np.inf
+        cand = np.flatnonzero(scores > threshold)
+        if cand.size == 0:
+            continue
+        best_s, best_i = select_top_k(
+            np.concatenate([best_s, scores[cand]]),
+            np.concatenate([best_i, cand + start * nb]),
+            k,
+        )
+    return [(int(i // nb), int(i % nb), float(s)) for s, i in zip(best_s, best_i)]
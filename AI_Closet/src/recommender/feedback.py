@@ -0,0 +1,172 @@
+"""
+Outfit scoring learned online from like/dislike feedback.
+
+A logistic model over pairwise features (color distance, lightness gap,
+dark-on-dark, season agreement, formality gap) plus a weight per type pair.
+Every feedback event is one SGD step on the pairs of that outfit, so the model
+follows the feedback table without ever retraining on the full history. On
+startup the history is replayed once, which yields the same weights the
+online updates produced.
+
+Scoring only needs the logit (the sigmoid is monotone), computed with
+broadcasting straight into one (A, B) array, so ranking 10^6 pairs is a few
+vector passes.
+"""
+import threading
+from typing import Callable, Dict, Sequence
+
+import numpy as np
+
+from src.db.db import DEFAULT_DB, get_items, list_feedback, subscribe, unsubscribe
+from src.recommender.engine import TYPES, item_features
+
+# Every feature is scaled to [0, 1]
+FEATURES = ("bias", "delta_e", "delta_l", "both_dark", "same_season", "season_clash", "formality_gap")
+_F = {name: i for i, name in enumerate(FEATURES)}
+
+# Starting point before any feedback: contrast good, dark-on-dark and clashes bad
+PRIOR = {"delta_e": 1.0, "delta_l": 0.5, "both_dark": -2.0, "same_season": 0.25,
+         "season_clash": -0.5, "formality_gap": -1.0}
+
+
+def _delta_e(a: Dict[str, np.ndarray], b: Dict[str, np.ndarray]) -> np.ndarray:
+    al, bl = a["lab"].reshape(-1, 3), b["lab"].reshape(-1, 3)
+    d2 = (al ** 2).sum(axis=1)[:, None] + (bl ** 2).sum(axis=1)[None, :] - 2 * (al @ bl.T)
+    return np.sqrt(np.maximum(d2, 0, out=d2), out=d2)
+
+
+def pair_features(a: Dict[str, np.ndarray], b: Dict[str, np.ndarray]) -> np.ndarray:
+    """(A, B, len(FEATURES)) feature tensor; a is shaped (A, 1, ...), b (1, B, ...)."""
+    de = _delta_e(a, b)
+    shape = de.shape
+    sa, sb = a["season"], b["season"]
+    known = (sa > 0) & (sb > 0)
+    gap = np.nan_to_num(np.abs(a["formality"] - b["formality"]), nan=0.0)
+    cols = [
+        np.ones(shape),
+        np.minimum(de, 100) / 100,
+        np.abs(a["lab"][..., 0] - b["lab"][..., 0]) / 100,
+        a["dark"] & b["dark"],
+        known & (sa == sb),
+        known & (sa != sb),
+        gap / 5,
+    ]
+    return np.stack([np.broadcast_to(c, shape).astype(np.float32) for c in cols], axis=-1)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class FeedbackScorer:
+    def __init__(self, make_item: Callable | None = None, lr: float = 0.1, l2: float = 1e-3,
+                 db_path: str | None = None):
+        if make_item is None:
+            from src.recommender.index import item_from_row as make_item
+        self.make_item = make_item
+        self.lr = lr
+        self.l2 = l2
+        self.db_path = db_path or DEFAULT_DB
+        self.weights = np.zeros(len(FEATURES), dtype=np.float32)
+        for name, w in PRIOR.items():
+            self.weights[_F[name]] = w
+        self.type_weights = np.zeros((len(TYPES), len(TYPES)), dtype=np.float32)
+        self.last_feedback_id = 0
+        self.updates = 0
+        self._lock = threading.Lock()
+
+    # ---- building / syncing ----
+    @classmethod
+    def from_db(cls, db_path: str | None = None, watch: bool = True, **kwargs) -> "FeedbackScorer":
+        """Replay the feedback history once; with watch=True, learn from new feedback as it arrives."""
+        scorer = cls(db_path=db_path, **kwargs)
+        scorer.catch_up()
+        if watch:
+            subscribe(scorer.on_db_change)
+        return scorer
+
+    def close(self):
+        unsubscribe(self.on_db_change)
+
+    def catch_up(self):
+        """Apply feedback rows newer than the last one seen."""
+        for feedback_id, ids, label in list_feedback(self.last_feedback_id, self.db_path):
+            self._learn_ids(feedback_id, ids, label)
+
+    def on_db_change(self, event: str, payload, db_path: str):
+        if db_path != self.db_path:
+            return
+        if event == "feedback":
+            self._learn_ids(*payload)
+        elif event == "bulk":  # e.g. feedback written by another process
+            self.catch_up()
+
+    def _learn_ids(self, feedback_id: int, ids: Sequence[int], label: str):
+        if feedback_id <= self.last_feedback_id:
+            return
+        items = [self.make_item(row) for row in get_items(ids, self.db_path)]
+        self.update(items, label == "like")
+        self.last_feedback_id = feedback_id
+
+    # ---- learning ----
+    def update(self, outfit: Sequence, liked: bool):
+        """One SGD step of logistic loss over every pair of items in the outfit."""
+        if len(outfit) < 2:
+            return
+        f = item_features(outfit)
+        i, j = np.triu_indices(len(outfit), k=1)
+        x = pair_features({k: v[:, None] for k, v in f.items()},
+                          {k: v[None, :] for k, v in f.items()})[i, j]      # (P, F)
+        ti, tj = f["type"][i], f["type"][j]
+        with self._lock:
+            logits = x @ self.weights + self.type_weights[ti, tj]
+            g = (_sigmoid(logits) - float(liked)) / len(i)                  # dLoss/dlogit, averaged
+            self.weights -= self.lr * (g @ x + self.l2 * self.weights)
+            np.subtract.at(self.type_weights, (ti, tj), self.lr * g)
+            np.subtract.at(self.type_weights, (tj, ti), self.lr * g * (ti != tj))
+            self.updates += 1
+
+    # ---- scoring ----
+    def pair_logits(self, a: Dict[str, np.ndarray], b: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Model logit for every (a, b) pair; same value as
+        pair_features(a, b) @ weights + type_weights[type_a, type_b], without
+        materializing the feature tensor.
+        """
+        w = self.weights
+        out = _delta_e(a, b)
+        np.minimum(out, 100, out=out)
+        out *= w[_F["delta_e"]] / 100
+        out += w[_F["bias"]]
+        out += (w[_F["delta_l"]] / 100) * np.abs(a["lab"][..., 0] - b["lab"][..., 0])
+        out += w[_F["both_dark"]] * (a["dark"] & b["dark"])
+        sa, sb = a["season"], b["season"]
+        if sa.any() and sb.any():
+            known = (sa > 0) & (sb > 0)
+            out += np.where(known, np.where(sa == sb, w[_F["same_season"]], w[_F["season_clash"]]), 0)
+        fa, fb = a["formality"], b["formality"]
+        if not (np.isnan(fa).all() or np.isnan(fb).all()):
+            gap = np.abs(fa - fb)
+            out += (w[_F["formality_gap"]] / 5) * np.nan_to_num(gap, nan=0.0, copy=False)
+        ta, tb = a["type"], b["type"]
+        if (ta == ta.flat[0]).all() and (tb == tb.flat[0]).all():
+            out += self.type_weights[ta.flat[0], tb.flat[0]]   # one type per side: a scalar
+        else:
+            out += self.type_weights[ta, tb]
+        return out
+
+    def score_fn(self, t: Dict[str, np.ndarray], b: Dict[str, np.ndarray]) -> np.ndarray:
+        """engine.ScoreFn: learned score, dark-on-dark still excluded (rules.basic_color_ok)."""
+        return np.where(t["dark"] & b["dark"], -np.inf, self.pair_logits(t, b))
+
+    def pair_score(self, a: Dict[str, np.ndarray], b: Dict[str, np.ndarray], slot_a: str, slot_b: str) -> np.ndarray:
+        """outfit_search.PairScoreFn counterpart of score_fn."""
+        scores = self.pair_logits(a, b)
+        if {slot_a, slot_b} == {"top", "bottom"}:
+            scores = np.where(a["dark"] & b["dark"], -np.inf, scores)
+        return scores
+
+    def pair_upper(self) -> float:
+        """Largest logit any pair can get (features lie in [0, 1]); for outfit_search pruning."""
+        w = self.weights
+        return float(w[0] + np.maximum(w[1:], 0).sum() + self.type_weights.max())
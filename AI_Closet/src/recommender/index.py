@@ -0,0 +1,224 @@
+"""
+In-memory wardrobe index for the recommender.
+
+Items are bucketed by (type, dark, quantized color). For every top bucket the
+list of compatible bottom buckets is precomputed, and kept up to date as
+buckets appear or empty out, so adding or deleting one item is O(#buckets)
+work rather than a rebuild. Within a bucket items are held newest first,
+matching list_items, and recommendations merge the buckets lazily, so their
+cost depends on k rather than on wardrobe size.
+"""
+import heapq
+import threading
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from src.db.db import DEFAULT_DB, all_items, subscribe, unsubscribe
+from src.recommender.engine import item_packed_rgb
+from src.recommender.sampler import PairBlocks, sample_outfit_blocks
+from src.utils import metrics
+
+QUANT_BITS = 2  # per channel -> 64 color cells per (type, dark)
+
+BucketKey = Tuple[str, bool, int]
+
+
+def basic_bucket_compatible(top: BucketKey, bottom: BucketKey) -> bool:
+    """Bucket-level basic_color_ok: no dark top with a dark bottom."""
+    return not (top[1] and bottom[1])
+
+
+def item_from_row(row):
+    """Default row -> rules.Item conversion (row shape of db.ITEM_SELECT)."""
+    from src.recommender.rules import Item
+    return Item(id=row[0], type=row[2] or "unknown", color=row[3] or "rgb(128,128,128)",
+                image_path=row[1], rgb=row[7], season=row[5], formality=row[6])
+
+
+class WardrobeIndex:
+    def __init__(self, make_item: Callable = item_from_row,
+                 bucket_compatible: Callable[[BucketKey, BucketKey], bool] = basic_bucket_compatible,
+                 db_path: str | None = None):
+        self.make_item = make_item
+        self.bucket_compatible = bucket_compatible
+        self.db_path = db_path or DEFAULT_DB
+        self.version = 0   # bumped on every change
+        self._blocks = (-1, PairBlocks([]), [])  # (version, sampler blocks, outerwear) cached by _sample_blocks
+        self.stale = False  # set by bulk DB writes; call reload()
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self):
+        # bucket -> {id: item}, ids ascending (iterate reversed for newest first)
+        self._buckets: Dict[BucketKey, Dict[int, object]] = {}
+        self._key_of: Dict[int, BucketKey] = {}
+        # top bucket -> compatible bottom buckets
+        self._compat: Dict[BucketKey, set] = {}
+        # type -> items in arbitrary order, for O(1) random access by the
+        # sampler; removal swaps the last item into the hole
+        self._by_type: Dict[str, list] = {}
+        self._slot: Dict[int, int] = {}
+
+    # ---- building / syncing ----
+    @classmethod
+    def from_db(cls, db_path: str | None = None, watch: bool = True, **kwargs) -> "WardrobeIndex":
+        """Load every item from the DB; with watch=True, follow later writes."""
+        index = cls(db_path=db_path, **kwargs)
+        index.reload()
+        if watch:
+            subscribe(index.on_db_change)
+        return index
+
+    def close(self):
+        unsubscribe(self.on_db_change)
+
+    def reload(self):
+        rows = all_items(self.db_path)
+        with self._lock:
+            self._clear()
+            for row in reversed(rows):  # oldest first keeps bucket dicts in id order
+                self.add(self.make_item(row))
+            self.stale = False
+            self.version += 1
+
+    def on_db_change(self, event: str, payload, db_path: str):
+        if db_path != self.db_path:
+            return
+        if event == "add":
+            self.add(self.make_item(payload))
+        elif event == "delete":
+            self.remove(payload)
+        else:
+            with self._lock:
+                self.stale = True
+                self.version += 1
+
+    def bucket_key(self, item) -> BucketKey:
+        p = item_packed_rgb(item)
+        r, g, b = (p >> 16) & 0xFF, (p >> 8) & 0xFF, p & 0xFF
+        shift = 8 - QUANT_BITS
+        cell = (r >> shift) << (2 * QUANT_BITS) | (g >> shift) << QUANT_BITS | b >> shift
+        dark = (r + g + b) / 3 < 60  # engine.is_dark for one item
+        return (item.type, dark, cell)
+
+    def add(self, item):
+        key = self.bucket_key(item)
+        with self._lock:
+            if item.id in self._key_of:
+                self.remove(item.id)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = {}
+                self._link(key)
+            if bucket and item.id < next(reversed(bucket)):
+                # Out-of-order id (rare): keep the bucket sorted
+                bucket[item.id] = item
+                self._buckets[key] = dict(sorted(bucket.items()))
+            else:
+                bucket[item.id] = item
+            self._key_of[item.id] = key
+            arr = self._by_type.setdefault(item.type, [])
+            self._slot[item.id] = len(arr)
+            arr.append(item)
+            self.version += 1
+
+    def remove(self, item_id: int) -> bool:
+        with self._lock:
+            key = self._key_of.pop(item_id, None)
+            if key is None:
+                return False
+            bucket = self._buckets[key]
+            del bucket[item_id]
+            if not bucket:
+                del self._buckets[key]
+                self._unlink(key)
+            arr = self._by_type[key[0]]
+            pos = self._slot.pop(item_id)
+            last = arr.pop()
+            if pos < len(arr):
+                arr[pos] = last
+                self._slot[last.id] = pos
+            self.version += 1
+            return True
+
+    def _link(self, key: BucketKey):
+        """Record compatibility between a new bucket and the existing ones."""
+        if key[0] == "top":
+            self._compat[key] = {b for b in self._buckets if b[0] == "bottom" and self.bucket_compatible(key, b)}
+        elif key[0] == "bottom":
+            for top, bottoms in self._compat.items():
+                if self.bucket_compatible(top, key):
+                    bottoms.add(key)
+
+    def _unlink(self, key: BucketKey):
+        if key[0] == "top":
+            self._compat.pop(key, None)
+        elif key[0] == "bottom":
+            for bottoms in self._compat.values():
+                bottoms.discard(key)
+
+    # ---- queries ----
+    def __len__(self) -> int:
+        return len(self._key_of)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._key_of
+
+    def _newest_first(self, keys) -> Iterator:
+        runs = [reversed(self._buckets[k].values()) for k in keys]
+        return heapq.merge(*runs, key=lambda i: -i.id)
+
+    def items(self, type_: str | None = None) -> List:
+        """All items (or one type), newest first."""
+        with self._lock:
+            keys = [k for k in self._buckets if type_ is None or k[0] == type_]
+            return list(self._newest_first(keys))
+
+    @metrics.timed("recommender.index_recommend")
+    def recommend(self, context: Dict, k: int = 10) -> List[List]:
+        """
+        Same result as rules.recommend(index.items(), context, k): the first k
+        compatible top/bottom pairs (newest first), plus the newest outerwear
+        when it is cool.
+        """
+        from src.recommender.rules import is_cool
+        with self._lock:
+            # Only tops with at least one compatible bottom, so each yields a pair
+            tops = self._newest_first([key for key in self._buckets if key[0] == "top" and self._compat.get(key)])
+            extra = []
+            if is_cool(context.get("temp_f", 70)):
+                extra = list(islice(self._newest_first([key for key in self._buckets if key[0] == "outerwear"]), 1))
+            recs: List[List] = []
+            for top in tops:
+                if len(recs) >= k:
+                    break
+                bottoms = self._newest_first(self._compat.get(self._key_of[top.id], ()))
+                recs.extend([top, b] + extra for b in islice(bottoms, k - len(recs)))
+            return recs
+
+    def _sample_blocks(self) -> Tuple[PairBlocks, List]:
+        """
+        One (tops, bottoms) block per compatible (top bucket, bottom bucket)
+        pair, plus the outerwear, all in key and id order, so the sample for a
+        seed depends only on the wardrobe and not on its add/remove history.
+        Rebuilt when the index changes.
+        """
+        version, blocks, outerwear = self._blocks
+        if version != self.version:
+            lists = {key: list(bucket.values()) for key, bucket in self._buckets.items()}  # shared by blocks
+            blocks = PairBlocks([(lists[top], lists[bottom])
+                                 for top in sorted(self._compat) for bottom in sorted(self._compat[top])])
+            outerwear = sorted(self._by_type.get("outerwear", []), key=lambda i: i.id)
+            self._blocks = (self.version, blocks, outerwear)
+        return blocks, outerwear
+
+    @metrics.timed("recommender.index_sample")
+    def sample(self, context: Dict, seed: int, n: int = 10) -> List[List]:
+        """
+        n distinct valid outfits drawn lazily for (context, seed); see
+        sampler.sample_outfit_blocks. Only compatible buckets are walked, so
+        a wardrobe with no valid pairs returns [] at once.
+        """
+        with self._lock:
+            blocks, outerwear = self._sample_blocks()
+            return list(islice(sample_outfit_blocks(blocks, context, seed, outerwear=outerwear), n))
@@ -0,0 +1,146 @@
+"""
+Top-k search over full outfits (top, bottom, shoes, outerwear, ... slots).
+
+An outfit's score is the sum of a pairwise compatibility score over every
+pair of its slots. Hard constraints from the context (season, occasion ->
+formality range) filter each slot's candidates up front. Instead of
+enumerating the product of all slots, a beam search fills one slot at a time,
+scoring a whole (beam x candidates) block with NumPy. Partial outfits whose
+optimistic bound (score so far + best possible value of every remaining pair)
+cannot beat the k-th best complete outfit are pruned. That k-th best comes
+from a cheap width-k pass run first.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.recommender.engine import item_features, season_code, select_top_k
+from src.utils import metrics
+
+
+@dataclass(frozen=True)
+class Slot:
+    name: str
+    types: Tuple[str, ...]   # item types that can fill this slot
+    required: bool = True    # optional slots are left out when no item fits
+
+
+# occasion -> allowed formality range (items without formality always pass)
+OCCASION_FORMALITY = {"casual": (0, 2), "class": (0, 3), "work": (2, 4), "formal": (3, 5)}
+
+# pair_score(a, b, slot_a, slot_b) -> (A, B) scores, -inf = not allowed.
+# Feature arrays of a are shaped (A, 1, ...) and of b (1, B, ...).
+PairScoreFn = Callable[[Dict[str, np.ndarray], Dict[str, np.ndarray], str, str], np.ndarray]
+
+
+def default_slots(context: Dict) -> List[Slot]:
+    from src.recommender.rules import is_cool
+    slots = [Slot("top", ("top",)), Slot("bottom", ("bottom",)), Slot("shoes", ("shoes",), required=False)]
+    if is_cool(context.get("temp_f", 70)):
+        slots.append(Slot("outerwear", ("outerwear",), required=False))
+    return slots
+
+
+def context_mask(feats: Dict[str, np.ndarray], context: Dict) -> np.ndarray:
+    """Hard constraints: season must match (or be unset/'all'), formality must suit the occasion."""
+    ok = np.ones(len(feats["formality"]), dtype=bool)
+    season = season_code(context.get("season"))
+    if season:
+        ok &= (feats["season"] == 0) | (feats["season"] == season)
+    rng = OCCASION_FORMALITY.get((context.get("occasion") or "").lower())
+    if rng:
+        f = feats["formality"]
+        ok &= np.isnan(f) | ((f >= rng[0]) & (f <= rng[1]))
+    return ok
+
+
+DEFAULT_PAIR_UPPER = 1.0  # default_pair_score never exceeds this
+
+
+def default_pair_score(a: Dict[str, np.ndarray], b: Dict[str, np.ndarray], slot_a: str, slot_b: str) -> np.ndarray:
+    """
+    Color contrast bonus in [0, 1] (Delta E, saturating at 60), minus 0.25 per
+    step of formality mismatch. A dark top with a dark bottom is not allowed
+    (rules.basic_color_ok).
+    """
+    al, bl = a["lab"].reshape(-1, 3), b["lab"].reshape(-1, 3)
+    d2 = (al ** 2).sum(axis=1)[:, None] + (bl ** 2).sum(axis=1)[None, :] - 2 * (al @ bl.T)
+    score = np.minimum(np.sqrt(np.maximum(d2, 0)), 60.0) / 60.0
+    gap = np.abs(a["formality"] - b["formality"])
+    score = score - 0.25 * np.nan_to_num(gap, nan=0.0)
+    if {slot_a, slot_b} == {"top", "bottom"}:
+        score = np.where(a["dark"] & b["dark"], -np.inf, score)
+    return score
+
+
+def _beam(order, feats, pair_score, pair_upper, width, lower_bound):
+    """One beam pass; returns (scores, choices) of complete outfits, best first."""
+    n_slots = len(order)
+    total_pairs = n_slots * (n_slots - 1) // 2
+    scores = np.zeros(1)
+    choices = np.zeros((1, 0), dtype=np.int64)
+    for p, slot in enumerate(order):
+        fs = feats[slot.name]
+        n_cand = len(fs["dark"])
+        expand = np.repeat(scores[:, None], n_cand, axis=1)
+        for j in range(p):
+            prev = order[j]
+            uniq, inv = np.unique(choices[:, j], return_inverse=True)
+            fa = {k: v[uniq][:, None] for k, v in feats[prev.name].items()}
+            fb = {k: v[None, :] for k, v in fs.items()}
+            expand = expand + np.broadcast_to(pair_score(fa, fb, prev.name, slot.name), (len(uniq), n_cand))[inv]
+        # Pairs not yet scored can add at most pair_upper each
+        done_pairs = (p + 1) * p // 2
+        bound = expand + (total_pairs - done_pairs) * pair_upper
+        flat = expand.ravel()
+        flat = np.where(bound.ravel() >= lower_bound, flat, -np.inf)
+        keep_s, keep_i = select_top_k(flat, np.arange(flat.size), width)
+        if keep_s.size == 0:
+            return keep_s, np.zeros((0, n_slots), dtype=np.int64)
+        rows, cols = np.divmod(keep_i, n_cand)
+        scores = keep_s
+        choices = np.concatenate([choices[rows], cols[:, None]], axis=1)
+    return scores, choices
+
+
+@metrics.timed("recommender.search_outfits")
+def search_outfits(items: Sequence, context: Dict, k: int = 10, slots: Sequence[Slot] | None = None,
+                   pair_score: PairScoreFn = default_pair_score, pair_upper: float = DEFAULT_PAIR_UPPER,
+                   beam_width: int = 256) -> List[Tuple[float, List]]:
+    """
+    Best k outfits as (score, [item per slot]) in the order of `slots`.
+
+    Beam search is exact when beam_width covers every surviving partial
+    outfit, and approximate (but never invalid) beyond that.
+    """
+    slots = list(slots) if slots is not None else default_slots(context)
+    items = list(items)
+    feats_all = item_features(items)
+    allowed = context_mask(feats_all, context)
+    types = np.array([i.type for i in items], dtype=object)
+
+    cands: Dict[str, np.ndarray] = {}
+    feats: Dict[str, Dict[str, np.ndarray]] = {}
+    active = []
+    for slot in slots:
+        idx = np.flatnonzero(allowed & np.isin(types, list(slot.types)))
+        if idx.size == 0:
+            if slot.required:
+                return []
+            continue
+        cands[slot.name] = idx
+        feats[slot.name] = {name: v[idx] for name, v in feats_all.items()}
+        active.append(slot)
+
+    # Fewest candidates first: narrow slots prune the most
+    order = sorted(active, key=lambda s: len(cands[s.name]))
+    seed_scores, _ = _beam(order, feats, pair_score, pair_upper, k, -np.inf)
+    lower_bound = seed_scores[-1] if len(seed_scores) == k else -np.inf
+    scores, choices = _beam(order, feats, pair_score, pair_upper, max(beam_width, k), lower_bound)
+
+    out = []
+    for score, row in zip(scores[:k], choices[:k]):
+        picked = {slot.name: items[cands[slot.name][c]] for slot, c in zip(order, row)}
+        out.append((float(score), [picked[s.name] for s in active]))
+    return out
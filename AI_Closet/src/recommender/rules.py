@@ -1,13 +1,19 @@
-
 from dataclasses import dataclass
 from typing import List, Dict
 
+from src.recommender.engine import ScoreFn, basic_color_score, top_k_pairs
+from src.utils import metrics
+
 @dataclass
 class Item:
+    id: int
     type: str       # e.g., "top", "bottom"
     color: str
-    image_path: str
-    tags: str
+    image_path: str = ""
+    tags: str = ""
+    rgb: int | None = None  # packed 0xRRGGBB (items.color_rgb); parsed from color if missing
+    season: str | None = None
+    formality: int | None = None  # 0 (very casual) .. 5 (very formal)
 
 def is_cool(temp_f: float) -> bool:
     return temp_f <= 60
@@ -19,18 +25,13 @@ def basic_color_ok(top_color: str, bottom_color: str) -> bool:
         return sum(nums)/3 < 60
     return not (is_dark(top_color) and is_dark(bottom_color))
 
-def recommend(items: List[Item], context: Dict) -> List[List[Item]]:
-    # Minimal demo: choose one top + one bottom; add outerwear if cool
+@metrics.timed("recommender.recommend")
+def recommend(items: List[Item], context: Dict, k: int = 10, score_fn: ScoreFn = basic_color_score) -> List[List[Item]]:
+    # Minimal demo: choose one top + one bottom; add outerwear if cool.
+    # Pairs are scored in bulk by the engine; with the default score every
+    # allowed pair ties, so this returns the first k in top/bottom order.
     tops = [i for i in items if i.type == "top"]
     bottoms = [i for i in items if i.type == "bottom"]
     outer = [i for i in items if i.type == "outerwear"]
-    recs = []
-    for t in tops:
-        for b in bottoms:
-            if not basic_color_ok(t.color, b.color): 
-                continue
-            outfit = [t, b]
-            if is_cool(context.get("temp_f", 70)) and outer:
-                outfit.append(outer[0])
-            recs.append(outfit)
-    return recs[:10]
+    extra = [outer[0]] if is_cool(context.get("temp_f", 70)) and outer else []
+    return [[tops[t], bottoms[b]] + extra for t, b, _ in top_k_pairs(tops, bottoms, k, score_fn)]
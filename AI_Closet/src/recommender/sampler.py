@@ -0,0 +1,133 @@
+"""
+Seeded, lazy sampling of distinct valid outfits.
+
+The top x bottom pair space is walked in a pseudo-random order given by a
+keyed Feistel permutation of [0, T*B): each index is visited at most once,
+so outfits never repeat. Nothing is materialized, and constraints are checked
+only on the pairs actually drawn. Getting n outfits costs about
+n / (fraction of valid pairs) steps, however big the wardrobe is.
+
+When the valid pairs are known to form blocks (every top of a block goes
+with every bottom of it, e.g. compatible color buckets of WardrobeIndex),
+sample_outfit_blocks walks only the union of the blocks, so every step
+yields an outfit and a wardrobe with no valid pairs costs nothing.
+"""
+import hashlib
+import random
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from src.recommender.cache import normalize_context
+from src.recommender.engine import item_packed_rgb
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix64(x: int) -> int:
+    """splitmix64 finalizer: a cheap, well-distributed 64-bit hash."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class FeistelPermutation:
+    """
+    A seeded bijection on range(n), evaluated one index at a time in O(1)
+    expected time (a Feistel network over the next even bit width, plus
+    cycle-walking for values >= n).
+    """
+
+    def __init__(self, n: int, seed: int, rounds: int = 4):
+        self.n = n
+        bits = max(2, (n - 1).bit_length())
+        bits += bits % 2
+        self.half = bits // 2
+        self.mask = (1 << self.half) - 1
+        self.keys = [_mix64(seed * 31 + r) for r in range(rounds)]
+
+    def _encrypt(self, x: int) -> int:
+        left, right = x >> self.half, x & self.mask
+        for key in self.keys:
+            left, right = right, left ^ (_mix64(right ^ key) & self.mask)
+        return (left << self.half) | right
+
+    def __call__(self, i: int) -> int:
+        x = self._encrypt(i)
+        while x >= self.n:  # domain is < 4n, so this loops < 4 times on average
+            x = self._encrypt(x)
+        return x
+
+
+def stable_seed(context: Dict, seed: int) -> int:
+    """Seed derived from (context, seed) that is stable across processes (unlike hash())."""
+    digest = hashlib.blake2b(repr((normalize_context(context), seed)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def not_both_dark(top, bottom) -> bool:
+    """Pairwise version of rules.basic_color_ok on packed colors."""
+    def dark(item):
+        p = item_packed_rgb(item)
+        return ((p >> 16) & 0xFF) + ((p >> 8) & 0xFF) + (p & 0xFF) < 180
+    return not (dark(top) and dark(bottom))
+
+
+def sample_outfits(tops: Sequence, bottoms: Sequence, context: Dict, seed: int,
+                   outerwear: Sequence = (), is_valid: Callable = not_both_dark) -> Iterator[List]:
+    """
+    Lazily yield distinct valid [top, bottom(, outerwear)] outfits in an order
+    fixed by (context, seed). When it is cool, each outfit gets an outerwear
+    piece drawn from the same seeded stream.
+    """
+    return _walk(PairBlocks([(tops, bottoms)]), context, seed, outerwear, is_valid)
+
+
+class PairBlocks:
+    """
+    The pair space of several (tops, bottoms) blocks laid end to end; build
+    it once and reuse it while the blocks don't change.
+    """
+
+    def __init__(self, blocks: Sequence[Tuple[Sequence, Sequence]]):
+        self.blocks = [(tops, bottoms) for tops, bottoms in blocks if tops and bottoms]
+        self.starts = list(accumulate((len(t) * len(b) for t, b in self.blocks), initial=0))
+
+    def __len__(self) -> int:
+        return self.starts[-1]
+
+    def pair(self, x: int) -> Tuple:
+        """The x-th (top, bottom) pair."""
+        j = bisect_right(self.starts, x) - 1 if len(self.blocks) > 1 else 0
+        tops, bottoms = self.blocks[j]
+        t, b = divmod(x - self.starts[j], len(bottoms))
+        return tops[t], bottoms[b]
+
+
+def sample_outfit_blocks(blocks: PairBlocks, context: Dict, seed: int, outerwear: Sequence = ()) -> Iterator[List]:
+    """
+    sample_outfits over the pairs of several (tops, bottoms) blocks, each of
+    which holds only valid pairs; no pair is checked or skipped.
+    """
+    return _walk(blocks, context, seed, outerwear, None)
+
+
+def _walk(blocks: PairBlocks, context: Dict, seed: int, outerwear: Sequence,
+          is_valid: Callable | None) -> Iterator[List]:
+    from src.recommender.rules import is_cool
+    n = len(blocks)
+    if n == 0:
+        return
+    key = stable_seed(context, seed)
+    perm = FeistelPermutation(n, key)
+    rng = random.Random(key)
+    cool = bool(outerwear) and is_cool(context.get("temp_f", 70))
+    for i in range(n):
+        top, bottom = blocks.pair(perm(i))
+        if is_valid is not None and not is_valid(top, bottom):
+            continue
+        outfit = [top, bottom]
+        if cool:
+            outfit.append(outerwear[rng.randrange(len(outerwear))])
+        yield outfit
@@ -1,6 +1,8 @@
 import os
 import ast
+import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 
 # Project root (.../AI_Closet)
@@ -9,27 +11,13 @@ DATA_DIR = os.path.join(ROOT, "data")
 IMAGES_DIR = os.path.join(DATA_DIR, "images")
 
 # Use your existing color extractor
-from src.vision.tagger import extract_dominant_color
-
-# ---- Map ImageNet-ish labels to coarse wardrobe types ----
-LABEL_MAP = {
-    "top": [
-        "shirt", "t-shirt", "tee", "sweatshirt", "sweater", "cardigan",
-        "hoodie", "jersey", "blouse", "pullover", "pajama", "flannel",
-    ],
-    "bottom": [
-        "jean", "jeans", "trousers", "pants", "slacks", "chinos",
-        "shorts", "skirt", "miniskirt", "sarong", "overskirt",
-    ],
-    "shoes": [
-        "sneaker", "running shoe", "boot", "loafer", "Loafer",
-        "sandal", "clog", "slipper", "shoe",
-    ],
-    "outerwear": [
-        "coat", "trench coat", "fur coat", "jacket", "parka",
-        "windbreaker", "raincoat", "overcoat", "cloak", "stole",
-    ],
-}
+from src.vision.tagger import extract_dominant_colors
+from src.db.tag_cache import TagCache
+
+# ---- Map ImageNet-ish labels to coarse wardrobe types (src/utils/taxonomy.py) ----
+from src.utils.taxonomy import TYPE_KEYWORDS, classify_labels, classify_series
+
+LABEL_MAP = TYPE_KEYWORDS  # old name, kept for existing imports
 
 def safe_parse_labels(val) -> list[str]:
     """labels is a string like "['running shoe','clog',...]" -> list[str]."""
@@ -47,15 +35,55 @@ def safe_parse_labels(val) -> list[str]:
     return []
 
 def to_coarse_type(labels: list[str]) -> str:
-    """Return one of {top,bottom,shoes,outerwear,unknown} by scanning label text."""
-    joined = " ".join(labels).lower()
-    for coarse, keys in LABEL_MAP.items():
-        for k in keys:
-            if k.lower() in joined:
-                return coarse
-    return "unknown"
-
-def main(in_csv: str, out_csv: str, images_dir: str, compute_color: bool):
+    """Return one of {top,bottom,shoes,outerwear,unknown}; the most confident matching label wins."""
+    return classify_labels(labels)
+
+def _colors_for_chunk(paths: list[str]) -> list[str | None]:
+    """Worker: dominant colors for one chunk of paths (None for images that fail)."""
+    try:
+        return extract_dominant_colors(paths)
+    except Exception:
+        # Isolate whatever broke the batch: retry image by image
+        out = []
+        for p in paths:
+            try:
+                out.append(extract_dominant_colors([p])[0])
+            except Exception:
+                out.append(None)
+        return out
+
+def compute_colors(paths: list[str], workers: int = 1, chunk_size: int = 64) -> list[str | None]:
+    """
+    Dominant color for every path, in input order.
+
+    Paths are split into chunks; with workers > 1 the chunks are processed by a
+    process pool. Progress is reported on stderr.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    results: list[str | None] = []
+
+    def report():
+        sys.stderr.write(f"\r   Colors: {len(results)}/{len(paths)}")
+        sys.stderr.flush()
+
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() yields in submission order, so rows stay aligned
+            for colors in pool.map(_colors_for_chunk, chunks):
+                results.extend(colors)
+                report()
+    else:
+        for chunk in chunks:
+            results.extend(_colors_for_chunk(chunk))
+            report()
+    if paths:
+        sys.stderr.write("\n")
+    return results
+
+def main(in_csv: str, out_csv: str, images_dir: str, compute_color: bool, workers: int = 1, chunk_size: int = 64,
+         use_cache: bool = True):
     if not os.path.exists(in_csv):
         raise FileNotFoundError(f"Could not find input CSV: {in_csv}")
 
@@ -65,37 +93,45 @@ def main(in_csv: str, out_csv: str, images_dir: str, compute_color: bool):
     if "image" not in df.columns or "labels" not in df.columns:
         raise ValueError("CSV must contain 'image' and 'labels' columns.")
 
-    out_rows = []
-    missing_images = 0
-
-    for _, row in df.iterrows():
-        image_path = str(row["image"])
-        labels = safe_parse_labels(row["labels"])
-        coarse = to_coarse_type(labels)
+    fnames = [os.path.basename(str(p)) for p in df["image"]]  # keep basename only
+    coarse = classify_series(df["labels"], labels=True).tolist()  # list cells are matched as written
 
-        fname = os.path.basename(image_path)  # keep basename only
-        local_path = os.path.join(images_dir, fname)
-
-        dom_color = None
-        if compute_color and os.path.exists(local_path):
-            try:
-                dom_color = extract_dominant_color(local_path)
-            except Exception:
-                dom_color = None
-        else:
-            if compute_color:
-                missing_images += 1
-
-        out_rows.append({
-            "filename": fname,
-            "type": coarse,
-            "dominant_color": dom_color,
-            "pattern": None,
-            "season": None,
-            "formality": None,
-        })
-
-    out_df = pd.DataFrame(out_rows, columns=[
+    dom_colors: list[str | None] = [None] * len(fnames)
+    missing_images = 0
+    failed_images = 0
+    cache_hits = 0
+    if compute_color:
+        local_paths = [os.path.join(images_dir, f) for f in fnames]
+        present = [i for i, p in enumerate(local_paths) if os.path.exists(p)]
+        missing_images = len(fnames) - len(present)
+
+        cache = TagCache() if use_cache else None
+        cached = cache.lookup([local_paths[i] for i in present]) if cache else {}
+        todo = [i for i in present if (cached.get(local_paths[i]) or {}).get("dominant_color") is None]
+        cache_hits = len(present) - len(todo)
+        for i in present:
+            dom_colors[i] = (cached.get(local_paths[i]) or {}).get("dominant_color")
+
+        colors = compute_colors([local_paths[i] for i in todo], workers=workers, chunk_size=chunk_size)
+        for i, color in zip(todo, colors):
+            dom_colors[i] = color
+        failed_images = sum(c is None for c in colors)
+
+        if cache:
+            cache.store({
+                local_paths[i]: {"dominant_color": dom_colors[i], "type": coarse[i]}
+                for i in todo if dom_colors[i] is not None
+            })
+            cache.close()
+
+    out_df = pd.DataFrame({
+        "filename": fnames,
+        "type": coarse,
+        "dominant_color": dom_colors,
+        "pattern": None,
+        "season": None,
+        "formality": None,
+    }, columns=[
         "filename","type","dominant_color","pattern","season","formality"
     ])
     out_df.to_csv(out_csv, index=False)
@@ -104,6 +140,9 @@ def main(in_csv: str, out_csv: str, images_dir: str, compute_color: bool):
     print(f"   Rows: {len(out_df)}")
     if compute_color:
         print(f"   Images missing locally (color skipped): {missing_images}")
+        print(f"   Images that failed color extraction: {failed_images}")
+        if use_cache:
+            print(f"   Colors served from tag cache: {cache_hits}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Post-process Colab tags.csv for AI Closet.")
@@ -115,11 +154,22 @@ if __name__ == "__main__":
                         help="Local images dir (default: data/images)")
     parser.add_argument("--no-color", dest="no_color", action="store_true",
                         help="Skip dominant color extraction even if files exist.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes used for color extraction (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=64,
+                        help="Images per color-extraction chunk (default: 64)")
+    parser.add_argument("--no-cache", dest="no_cache", action="store_true",
+                        help="Ignore the persistent tag cache and recompute every color.")
     args = parser.parse_args()
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
 
     main(
         in_csv=args.in_csv,
         out_csv=args.out_csv,
         images_dir=args.images_dir,
-        compute_color=not args.no_color
+        compute_color=not args.no_color,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        use_cache=not args.no_cache,
     )
@@ -0,0 +1,69 @@
+import re
+import numpy as np
+
+# Colors arrive as 'rgb(R,G,B)' strings from the tagger/CSV. They are parsed
+# once at ingest and stored as a packed 0xRRGGBB integer plus CIELAB (D65)
+# coordinates; hot paths work on those numbers only.
+RGB_RE = re.compile(r"^\s*rgb\(\s*(\d{1,3})\s*,\s*(\d{1,3})\s*,\s*(\d{1,3})\s*\)\s*$", re.IGNORECASE)
+
+GRAY = 0x808080  # fallback used by the UI for unknown colors
+
+# sRGB -> XYZ (D65), and the D65 reference white
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+
+def parse_rgb(value) -> tuple[int, int, int] | None:
+    """'rgb(R,G,B)' -> (R, G, B), or None if it doesn't parse or is out of range."""
+    if not isinstance(value, str):
+        return None
+    m = RGB_RE.match(value)
+    if not m:
+        return None
+    rgb = tuple(int(x) for x in m.groups())
+    return rgb if max(rgb) <= 255 else None
+
+
+def pack_rgb(rgb) -> int:
+    r, g, b = rgb
+    return (int(r) << 16) | (int(g) << 8) | int(b)
+
+
+def unpack_rgb(packed) -> np.ndarray:
+    """Packed int(s) -> uint8 array of shape (..., 3)."""
+    p = np.asarray(packed, dtype=np.int64)
+    return np.stack([(p >> 16) & 0xFF, (p >> 8) & 0xFF, p & 0xFF], axis=-1).astype(np.uint8)
+
+
+def rgb_to_lab(rgb) -> np.ndarray:
+    """sRGB in 0-255, shape (..., 3) -> CIELAB (L*, a*, b*), shape (..., 3)."""
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    lin = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    xyz = lin @ _RGB_TO_XYZ.T / _WHITE
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    L = 116 * f[..., 1] - 16
+    a = 500 * (f[..., 0] - f[..., 1])
+    b = 200 * (f[..., 1] - f[..., 2])
+    return np.stack([L, a, b], axis=-1)
+
+
+def color_columns(values) -> list[tuple]:
+    """
+    Derived DB columns (color_rgb, color_l, color_a, color_b) for each color
+    string; all None when a string doesn't parse. Each distinct string is
+    parsed once.
+    """
+    values = list(values)
+    uniq = {v: parse_rgb(v) for v in set(values) if isinstance(v, str)}
+    parsed = [(v, rgb) for v, rgb in uniq.items() if rgb is not None]
+    derived: dict = {}
+    if parsed:
+        lab = rgb_to_lab(np.array([rgb for _, rgb in parsed]))
+        for (v, rgb), (L, a, b) in zip(parsed, lab.tolist()):
+            derived[v] = (pack_rgb(rgb), L, a, b)
+    empty = (None, None, None, None)
+    return [derived.get(v, empty) if isinstance(v, str) else empty for v in values]
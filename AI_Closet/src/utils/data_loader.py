@@ -1,25 +1,38 @@
 import os
+import time
+import queue
+import sqlite3
+import threading
+from collections import Counter
+from typing import Iterator
 import pandas as pd
 
-from src.db.db import add_item, init_db
-from src.utils.validate_data import validate_dataframe
+from src.db.db import add_items, init_db, read_conn, write_conn, notify
+from src.utils import metrics
+from src.utils.validate_data import validate_dataframe, first_present
 
 # Base directory: go up from this file to project root, then into data/
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 
 
+def _resolve_csv(csv_path: str | None) -> str:
+    if csv_path is None:
+        csv_path = os.path.join(DATA_DIR, "tags.csv")
+
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"Could not find CSV at: {csv_path}")
+    return csv_path
+
+
+@metrics.timed("loader.load_tags_csv")
 def load_tags_csv(csv_path: str | None = None) -> pd.DataFrame:
     """
     Load the tags CSV exported from Colab.
 
     If csv_path is None, defaults to data/tags.csv.
     """
-    if csv_path is None:
-        csv_path = os.path.join(DATA_DIR, "tags.csv")
-
-    if not os.path.exists(csv_path):
-        raise FileNotFoundError(f"Could not find CSV at: {csv_path}")
+    csv_path = _resolve_csv(csv_path)
 
     df = pd.read_csv(csv_path)
 
@@ -28,68 +41,208 @@ def load_tags_csv(csv_path: str | None = None) -> pd.DataFrame:
     return df
 
 
-def sync_items_from_df(df: pd.DataFrame) -> int:
+def iter_tags_csv(csv_path: str | None = None, chunksize: int = 50_000, skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """
+    Stream the tags CSV in fixed-size chunks.
+
+    Every column is read as text (explicit dtype, so no per-chunk type
+    inference), column names are normalized like load_tags_csv, and each
+    chunk is indexed by its absolute data-row number. skip_rows data rows
+    after the header are skipped without being parsed into frames.
+    """
+    csv_path = _resolve_csv(csv_path)
+    reader = pd.read_csv(
+        csv_path,
+        dtype=str,
+        chunksize=chunksize,
+        # A callable rather than range(): pandas would materialize the range as a set of skip_rows ints
+        skiprows=(lambda i: 0 < i <= skip_rows) if skip_rows else None,
+    )
+    start = skip_rows
+    with reader:
+        for chunk in reader:
+            chunk.columns = [c.strip().lower() for c in chunk.columns]
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
+
+
+def _prefetch(chunks: Iterator[pd.DataFrame], depth: int = 1) -> Iterator[pd.DataFrame]:
+    """
+    Parse the next chunk on a background thread while the current one is validated/inserted.
+
+    If the consumer stops early (an exception, or the generator is closed),
+    the producer is told to stop, closes chunks and is joined before this
+    returns, so no thread stays blocked on a full queue holding the file open.
+    """
+    q: queue.Queue = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+            put(done)
+        except BaseException as e:  # re-raised in the consumer
+            put(e)
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = q.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+
+
+@metrics.timed("loader.sync_items_from_df")
+def sync_items_from_df(df: pd.DataFrame, upsert: bool = False, db_path: str | None = None,
+                       conn: sqlite3.Connection | None = None) -> int:
     """
     Take a DataFrame of tagged clothing items and insert them into the DB.
 
+    All rows go through one bulk transaction (see db.add_items). With
+    upsert=True, items are matched on filename and updated instead of being
+    inserted again. Passing conn makes the rows part of the caller's
+    transaction instead.
+
     Returns:
         int: number of rows successfully inserted.
     """
-    inserted = 0
+    # Try multiple possible filename column names
+    filename = first_present(df, ["filename", "image_name", "file"])[0]
+    # Skip rows with no filename
+    keep = filename.map(lambda f: isinstance(f, str)).astype(bool)
+    if not keep.any():
+        return 0
+    df = df[keep]
 
-    for _, row in df.iterrows():
-        # Try multiple possible filename column names
-        filename = (
-            row.get("filename")
-            or row.get("image_name")
-            or row.get("file")
-        )
+    # Type/category of clothing
+    type_ = first_present(df, ["type", "predicted_type"])[0]
+    # Dominant color
+    dominant_color = first_present(df, ["dominant_color", "color"])[0]
+    # Optional fields
+    pattern = first_present(df, ["pattern"])[0]
+    season = first_present(df, ["season"])[0]
 
-        if not isinstance(filename, str) or not filename:
-            # Skip rows with no filename
-            continue
+    # Convert formality to int if present (truncating; the validator reports
+    # values outside 0–5). Only numbers too big for an SQLite INTEGER (1e20,
+    # inf) are stored as NULL instead of wrapping around.
+    formality = pd.Series([None] * len(df), index=df.index, dtype=object)
+    if "formality" in df.columns:
+        num = pd.to_numeric(df["formality"], errors="coerce")
+        ok = num.abs() < 2 ** 63
+        formality[ok] = num[ok].astype(int).astype(object)
 
-        # Type/category of clothing
-        type_ = row.get("type") or row.get("predicted_type") or None
+    rows = zip(
+        filename[keep].tolist(),
+        type_.tolist(),
+        dominant_color.tolist(),
+        pattern.tolist(),
+        season.tolist(),
+        formality.tolist(),
+        [None] * len(df),  # notes
+    )
+    return add_items(rows, upsert=upsert, db_path=db_path, conn=conn)
 
-        # Dominant color
-        dominant_color = row.get("dominant_color") or row.get("color") or None
 
-        # Optional fields
-        pattern = row.get("pattern") if "pattern" in row else None
-        season = row.get("season") if "season" in row else None
+def stream_and_sync(csv_path: str | None = None, chunksize: int = 50_000, upsert: bool = False,
+                    resume: bool = True, db_path: str | None = None, max_issues: int = 20) -> int:
+    """
+    Chunked version of load_and_sync for CSVs too big to hold in memory.
 
-        # Convert formality to int if present
-        formality = None
-        if "formality" in row and pd.notna(row["formality"]):
-            try:
-                formality = int(row["formality"])
-            except (ValueError, TypeError):
-                formality = None
-
-        # Insert into DB
-        add_item(
-            filename=filename,
-            type_=type_,
-            dominant_color=dominant_color,
-            pattern=pattern,
-            season=season,
-            formality=formality,
-            notes=None,
-        )
-        inserted += 1
-
-    return inserted
-
-
-def load_and_sync(csv_path: str | None = None) -> int:
+    Reading, validation and insertion run per chunk (the next chunk is parsed
+    while the current one is written), so memory stays flat. Each chunk is
+    committed together with a checkpoint in ingest_progress; if a run is
+    interrupted, the next run on the same unchanged file resumes after the
+    last committed chunk. Prints rows/sec as it goes.
+
+    Returns the number of rows written in this run.
+    """
+    csv_path = _resolve_csv(csv_path)
+    source = os.path.abspath(csv_path)
+    st = os.stat(csv_path)
+    fingerprint = f"{st.st_size}:{st.st_mtime_ns}"
+
+    rows_done = 0
+    if resume:
+        row = read_conn(db_path).execute(
+            "SELECT fingerprint, rows_done FROM ingest_progress WHERE source = ?", (source,)
+        ).fetchone()
+        if row and row[0] == fingerprint:
+            rows_done = row[1]
+            print(f"Resuming {csv_path} after row {rows_done}")
+
+    written = 0
+    read = 0
+    issue_counts: Counter = Counter()
+    examples: list[str] = []
+    t0 = time.perf_counter()
+    for chunk in _prefetch(iter_tags_csv(csv_path, chunksize, skip_rows=rows_done)):
+        report = validate_dataframe(chunk, max_issues=max(0, max_issues - len(examples)))
+        for issue in report.issues:
+            issue_counts[issue.code] += len(issue)
+        examples.extend(report)
+
+        with write_conn(db_path) as conn:  # chunk rows and checkpoint commit together
+            written += sync_items_from_df(chunk, upsert=upsert, conn=conn)
+            rows_done += len(chunk)
+            conn.execute(
+                "INSERT OR REPLACE INTO ingest_progress(source, fingerprint, rows_done, updated_at) "
+                "VALUES(?,?,?,CURRENT_TIMESTAMP)",
+                (source, fingerprint, rows_done),
+            )
+        notify("bulk", db_path=db_path)
+        read += len(chunk)
+        elapsed = time.perf_counter() - t0
+        print(f"  {rows_done} rows committed ({read / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    with write_conn(db_path) as conn:  # finished: next run starts from the top again
+        conn.execute("DELETE FROM ingest_progress WHERE source = ?", (source,))
+
+    if issue_counts:
+        print("⚠ Data validation found issues:")
+        for msg in examples:
+            print("  -", msg)
+        for code, n in issue_counts.items():
+            print(f"  {code}: {n} rows")
+    return written
+
+
+def load_and_sync(csv_path: str | None = None, upsert: bool = False, chunksize: int | None = None) -> int:
     """
     Convenience function:
     - Loads the CSV
     - Validates it
     - Inserts rows into DB
     - Returns number of inserted items
+
+    With chunksize set, streams the file instead (see stream_and_sync).
     """
+    if chunksize:
+        return stream_and_sync(csv_path, chunksize=chunksize, upsert=upsert)
+
     df = load_tags_csv(csv_path)
 
     # Validate first
@@ -98,9 +251,12 @@ def load_and_sync(csv_path: str | None = None) -> int:
         print("⚠ Data validation found issues:")
         for msg in issues:
             print("  -", msg)
+        shown = min(len(issues), issues.max_issues or len(issues))
+        if shown < len(issues):
+            print(f"  ... and {len(issues) - shown} more")
         print("Continuing anyway and inserting what we can...\n")
 
-    count = sync_items_from_df(df)
+    count = sync_items_from_df(df, upsert=upsert)
     return count
 
 
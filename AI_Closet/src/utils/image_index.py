@@ -0,0 +1,95 @@
+"""
+Filename -> image path index for an images directory.
+
+Built in one os.scandir pass and rescanned only when the directory's mtime
+changes (checked at most every `check_interval` seconds), so resolving the
+image of an item is a dict lookup instead of several exists()/glob() calls
+per item per render. Matches find_image_path's rules: the exact filename
+first, else the same basename with any allowed extension.
+"""
+import os
+import threading
+import time
+
+ALLOWED_EXTS = (".jpg", ".jpeg", ".png")  # preference order for basename matches
+
+
+class ImageIndex:
+    def __init__(self, images_dir: str, check_interval: float = 1.0):
+        self.images_dir = images_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._by_name: dict[str, str] = {}
+        self._by_base: dict[str, str] = {}
+        self._mtime_ns = None
+        self._scanned_at = 0.0
+        self._checked_at = 0.0
+        self.scans = 0
+
+    def _scan(self, mtime_ns: int):
+        started = time.time()
+        by_name, by_base = {}, {}
+        rank = {ext: i for i, ext in enumerate(ALLOWED_EXTS)}
+        best: dict[str, int] = {}
+        with os.scandir(self.images_dir) as entries:
+            for entry in entries:
+                base, ext = os.path.splitext(entry.name)
+                r = rank.get(ext.lower())
+                if r is None or not entry.is_file():
+                    continue
+                by_name[entry.name] = entry.path
+                if r < best.get(base, len(rank)):
+                    best[base] = r
+                    by_base[base] = entry.path
+        self._by_name, self._by_base = by_name, by_base
+        self._mtime_ns, self._scanned_at = mtime_ns, started
+        self.scans += 1
+
+    def refresh(self, force: bool = False):
+        """Rescan if the directory changed since the last scan."""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            try:
+                mtime_ns = os.stat(self.images_dir).st_mtime_ns
+            except FileNotFoundError:
+                self._by_name, self._by_base, self._mtime_ns = {}, {}, None
+                return
+            # A change in the same mtime tick as the last scan may have been
+            # missed by it, so a directory touched that recently stays "dirty"
+            racy = mtime_ns / 1e9 >= self._scanned_at - 2
+            if force or mtime_ns != self._mtime_ns or racy:
+                self._scan(mtime_ns)
+
+    def add(self, path: str):
+        """Record a file we just wrote, without waiting for a rescan."""
+        name = os.path.basename(path)
+        base, ext = os.path.splitext(name)
+        if ext.lower() not in ALLOWED_EXTS:
+            return
+        with self._lock:
+            self._by_name[name] = path
+            current = self._by_base.get(base)
+            if current is None or ALLOWED_EXTS.index(ext.lower()) < ALLOWED_EXTS.index(
+                    os.path.splitext(current)[1].lower()):
+                self._by_base[base] = path
+
+    def resolve(self, filename: str) -> str | None:
+        """Path of filename in the directory, or of a file with its basename and another allowed extension."""
+        if not filename:
+            return None
+        if os.path.dirname(filename):
+            # Not a plain name (e.g. "sub/x.jpg"): outside what the index covers
+            path = os.path.join(self.images_dir, filename)
+            return path if os.path.isfile(path) else None
+        self.refresh()
+        path = self._by_name.get(filename)
+        if path is None:
+            path = self._by_base.get(os.path.splitext(filename)[0])
+        return path
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._by_name)
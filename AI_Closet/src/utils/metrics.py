@@ -0,0 +1,199 @@
+"""
+In-process latency histograms and counters for the hot paths.
+
+Collection is off by default; set METRICS=1 or call enable(). While off, a
+@timed function costs one extra call and a flag check, and span() hands back
+a shared no-op context manager, so the hooks stay wired in everywhere.
+Histograms use fixed Prometheus-style buckets (cumulative "le" upper bounds
+in seconds) and are exported with snapshot() / to_json() / to_prometheus().
+profiled() captures a cProfile of one block, e.g. a single request.
+"""
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5, 5.0, 10.0, float("inf"))
+
+_enabled = os.environ.get("METRICS", "").lower() in ("1", "true", "yes")
+_lock = threading.Lock()
+_NULL = nullcontext()
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)  # per bucket, not cumulative
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (the max for the last bucket)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, c in zip(BUCKETS, self.counts):
+            seen += c
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+_histograms: dict[str, Histogram] = {}
+_counters: dict[str, float] = {}
+
+
+def enable(on: bool = True):
+    global _enabled
+    _enabled = on
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+# ---- Recording ----
+def observe(name: str, seconds: float):
+    if not _enabled:
+        return
+    with _lock:
+        h = _histograms.get(name)
+        if h is None:
+            h = _histograms[name] = Histogram()
+        h.observe(seconds)
+
+
+def incr(name: str, n: float = 1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+class _Span:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+def span(name: str):
+    """Context manager timing its block into histogram `name` (no-op while disabled)."""
+    return _Span(name) if _enabled else _NULL
+
+
+def timed(name: str | None = None):
+    """Decorator timing every call into histogram `name` (default: module.qualname)."""
+    def wrap(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(label, time.perf_counter() - t0)
+        return wrapper
+    return wrap
+
+
+# ---- Export ----
+def snapshot() -> dict:
+    """{"histograms": {name: {count, sum, max, p50, p95, p99, buckets}}, "counters": {name: value}}."""
+    with _lock:
+        hists = {name: (list(h.counts), h.count, h.sum, h.max, h.quantile(0.5), h.quantile(0.95),
+                        h.quantile(0.99)) for name, h in _histograms.items()}
+        counters = dict(_counters)
+    out = {}
+    for name, (counts, count, total, mx, p50, p95, p99) in sorted(hists.items()):
+        cumulative, buckets = 0, {}
+        for bound, c in zip(BUCKETS, counts):
+            cumulative += c
+            buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+        out[name] = {"count": count, "sum": total, "max": mx, "p50": p50, "p95": p95, "p99": p99,
+                     "buckets": buckets}
+    return {"histograms": out, "counters": dict(sorted(counters.items()))}
+
+
+def to_json(indent: int | None = 2) -> str:
+    return json.dumps(snapshot(), indent=indent)
+
+
+def format_value(value: float) -> str:
+    """Exact text of a counter: integers without a decimal point, other floats by repr (never rounded)."""
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def to_prometheus(prefix: str = "ai_closet") -> str:
+    """Prometheus text exposition: one histogram family labelled by op, one counter family labelled by name."""
+    snap = snapshot()
+    lines = [f"# HELP {prefix}_latency_seconds Latency of instrumented operations.",
+             f"# TYPE {prefix}_latency_seconds histogram"]
+    for op, h in snap["histograms"].items():
+        for le, c in h["buckets"].items():
+            lines.append(f'{prefix}_latency_seconds_bucket{{op="{op}",le="{le}"}} {c}')
+        lines.append(f'{prefix}_latency_seconds_sum{{op="{op}"}} {h["sum"]!r}')
+        lines.append(f'{prefix}_latency_seconds_count{{op="{op}"}} {h["count"]}')
+    lines += [f"# HELP {prefix}_events_total Counts of instrumented events.",
+              f"# TYPE {prefix}_events_total counter"]
+    for name, value in snap["counters"].items():
+        lines.append(f'{prefix}_events_total{{name="{name}"}} {format_value(value)}')
+    return "\n".join(lines) + "\n"
+
+
+# ---- Profiling ----
+class Profile:
+    """Result of profiled(): pstats text (filled in when the block exits)."""
+    text: str = ""
+    stats: pstats.Stats | None = None
+
+
+@contextmanager
+def profiled(sort: str = "cumulative", limit: int = 30):
+    """cProfile the block; the yielded Profile holds the top `limit` entries by `sort` afterwards."""
+    result = Profile()
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield result
+    finally:
+        prof.disable()
+        buf = io.StringIO()
+        result.stats = pstats.Stats(prof, stream=buf).sort_stats(sort)
+        result.stats.print_stats(limit)
+        result.text = buf.getvalue()
@@ -0,0 +1,139 @@
+"""
+One keyword taxonomy for coarse clothing types, shared by filename hints
+(tagger.classify_type_from_name) and classifier labels
+(colab_postprocess.to_coarse_type).
+
+All keywords are compiled into alternation regexes, with an optional plural
+"s"/"es" and a keyword never running on into more letters ("stolen" is not a
+stole). At one position the longest keyword wins, so compounds listed here
+("sweatpants", "short sleeve", "laptop") take precedence over the keywords
+inside them; when several positions match, the leftmost wins (for a label
+list that is the most confident label).
+
+Classifier labels are separate words, so there a keyword must also start a
+word ("top" not inside "desktop computer"). Filenames glue words together
+("bluejeans.jpeg", "blackshoes.jpeg"), so there a keyword may follow any
+letters; camelCase humps still split words ("ShirtBlue").
+"""
+import re
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+TYPE_KEYWORDS = {
+    "top": ("shirt", "t-shirt", "tee", "top", "sweatshirt", "overshirt", "sweater", "cardigan", "hoodie",
+            "jersey", "blouse", "pullover", "pajama", "flannel", "tank top", "long sleeve", "short sleeve"),
+    "bottom": ("jean", "trouser", "pants", "sweatpants", "slacks", "chinos", "short", "skirt", "miniskirt",
+               "sarong", "overskirt"),
+    "outerwear": ("coat", "trench coat", "fur coat", "jacket", "parka", "windbreaker", "raincoat", "overcoat",
+                  "cloak", "stole"),
+    "shoes": ("shoe", "running shoe", "sneaker", "boot", "loafer", "sandal", "clog", "slipper"),
+}
+UNKNOWN = "unknown"
+# Words that end in a keyword but aren't clothing; only needed for filenames,
+# where a keyword may follow other letters
+NOT_CLOTHING = ("laptop", "desktop", "tabletop")
+
+KEYWORD_TYPE = {k: t for t, keys in TYPE_KEYWORDS.items() for k in keys}
+assert len(KEYWORD_TYPE) == sum(map(len, TYPE_KEYWORDS.values())), "a keyword is listed under two types"
+
+# A space inside a keyword also matches "_", "-" or nothing ("tank_top", "tanktop")
+_SEPARATORS = (" ", "_", "-", "")
+
+
+def _spellings(keyword: str) -> list[str]:
+    """Every way a keyword can appear in matched text ("tank top", "tank_top", "tank-top", "tanktop")."""
+    out = [""]
+    for part in keyword.split(" "):
+        out = [prev + sep + part for prev in out for sep in (_SEPARATORS if prev else ("",))]
+    return out
+
+
+_TYPE_OF = {**{variant: t for k, t in KEYWORD_TYPE.items() for variant in _spellings(k)},
+            **dict.fromkeys(NOT_CLOTHING, UNKNOWN), "": UNKNOWN}
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """Alternation of words factored by common prefixes ("s(?:h(?:irt|oe|ort)|...)"), so the
+    regex engine tries each leading character once instead of every keyword in turn."""
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end of a keyword
+
+    def build(node: dict) -> str:
+        alts = [("[ _-]?" if ch == " " else re.escape(ch)) + build(child)
+                for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        end = "" in node
+        body = alts[0] if len(alts) == 1 and not end else "(?:" + "|".join(alts) + ")"
+        return body + "?" if end else body
+
+    return build(trie)
+
+
+# Greedy matching of the trie takes the longest keyword at a position
+_END = r")(?:e?s)?(?![a-z])"
+LABEL_PATTERN = re.compile(r"(?<![a-z])(" + _trie_regex(KEYWORD_TYPE) + _END)
+NAME_PATTERN = re.compile(r"(" + _trie_regex([*KEYWORD_TYPE, *NOT_CLOTHING]) + _END)
+# One match per line: the first keyword of the line, or "" if it has none
+_LINE_PATTERNS = {labels: re.compile(r"^(?:.*?" + p.pattern + r")?", re.M)
+                  for labels, p in ((True, LABEL_PATTERN), (False, NAME_PATTERN))}
+_CAMEL = re.compile(r"(?<=[a-z])(?=[A-Z])")
+_CAMEL_HUMP = re.compile(r"[a-z][A-Z]")
+
+
+def _normalize(text: str) -> str:
+    lower = text.lower()
+    return lower if lower == text else _CAMEL.sub(" ", text).lower()
+
+
+def classify(text: str) -> str:
+    """Coarse type named in a filename or other free text (case-insensitive), else "unknown"."""
+    m = NAME_PATTERN.search(_normalize(text))
+    return _TYPE_OF[m.group(1)] if m else UNKNOWN
+
+
+def classify_labels(labels: Iterable[str]) -> str:
+    """Coarse type of a label list, most confident label first; labels match as whole words."""
+    m = LABEL_PATTERN.search(_normalize(" | ".join(labels)))
+    return _TYPE_OF[m.group(1)] if m else UNKNOWN
+
+
+def _as_text(value) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return " | ".join(map(str, value))
+    return ""  # NaN / None
+
+
+def classify_series(values: pd.Series, labels: bool = False) -> pd.Series:
+    """
+    Vectorized classify over filenames, or with labels=True classify_labels
+    over label lists or stringified label lists (e.g. the "['jean', 'denim']"
+    cells of the Colab CSV; the brackets and quotes are boundaries like any
+    other non-letter). The distinct values are joined into one
+    newline-separated text and matched by a single findall over it, so the
+    per-value work left in Python is the join itself.
+    """
+    if pd.api.types.infer_dtype(values, skipna=True) == "string":
+        text = values.fillna("")
+    else:
+        text = values.map(_as_text)
+    codes, uniques = pd.factorize(text)
+    uniques = np.asarray(uniques, dtype=object).tolist()  # plain str list: fast to join
+    if not uniques:
+        return pd.Series([], index=values.index, dtype=object)
+    joined = "\n".join(uniques)
+    lower = joined.lower()
+    if lower.count("\n") != len(uniques) - 1 or (lower != joined and _CAMEL_HUMP.search(joined)):
+        # Rare: newlines inside a value, or camelCase humps to split
+        lower = "\n".join(_normalize(v).replace("\n", " ") for v in uniques)
+    keywords = _LINE_PATTERNS[labels].findall(lower)
+    types = np.array(list(map(_TYPE_OF.__getitem__, keywords)), dtype=object)
+    return pd.Series(types[codes], index=values.index, dtype=object)
@@ -1,52 +1,166 @@
+import re
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
 import pandas as pd
 
+from src.utils import metrics
+
+# Expect something like rgb(123,45,67)
+RGB_PATTERN = r"^rgb\(\s*\d{1,3}\s*,\s*\d{1,3}\s*,\s*\d{1,3}\s*\)$"
+
+_MESSAGES = {
+    "missing_filename": "Row {row}: missing or invalid filename",
+    "bad_color": "Row {row}: color '{value}' is not in rgb(R,G,B) format",
+    "formality_range": "Row {row}: formality {value} out of expected range 0–5",
+    "formality_not_int": "Row {row}: formality '{value}' is not an integer",
+}
+
+
+@dataclass
+class Issue:
+    """One kind of problem in one column, with every row label it affects."""
+    code: str
+    column: str
+    rows: np.ndarray
+    values: np.ndarray | None = None
 
-def validate_dataframe(df: pd.DataFrame) -> list[str]:
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def messages(self) -> Iterator[str]:
+        template = _MESSAGES[self.code]
+        values = self.values if self.values is not None else [None] * len(self.rows)
+        for row, value in zip(self.rows, values):
+            yield template.format(row=row, value=value)
+
+
+class ValidationReport:
     """
-    Run basic validation checks on the tags DataFrame.
+    Result of validate_dataframe.
 
-    Returns:
-        A list of human-readable issue strings. If empty, data looks OK.
+    Holds a compact list of Issue records. Iterating yields human-readable
+    strings, built lazily and capped at max_issues; len() is the total number
+    of problems found.
     """
-    issues: list[str] = []
 
-    # Required-ish columns (we're flexible with names in the loader)
-    # Here we just check that something like filename exists later.
-    cols = [c.lower() for c in df.columns]
+    def __init__(self, issues: list[Issue], max_issues: int | None = None):
+        self.issues = issues
+        self.max_issues = max_issues
 
-    # Check row-by-row
-    for idx, row in df.iterrows():
-        # ---- filename checks ----
-        filename = (
-            row.get("filename")
-            or row.get("image_name")
-            or row.get("file")
+    def __len__(self) -> int:
+        return sum(len(i) for i in self.issues)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator[str]:
+        return self.messages(self.max_issues)
+
+    def messages(self, limit: int | None = None) -> Iterator[str]:
+        emitted = 0
+        for issue in self.issues:
+            for msg in issue.messages():
+                if limit is not None and emitted >= limit:
+                    return
+                emitted += 1
+                yield msg
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per issue kind: code, column, count."""
+        return pd.DataFrame(
+            [(i.code, i.column, len(i)) for i in self.issues],
+            columns=["code", "column", "count"],
         )
 
-        if not isinstance(filename, str) or not filename.strip():
-            issues.append(f"Row {idx}: missing or invalid filename")
-
-        # ---- dominant_color checks ----
-        if "dominant_color" in row or "color" in row:
-            color = row.get("dominant_color") or row.get("color")
-            if isinstance(color, str):
-                # Expect something like rgb(123,45,67)
-                if not color.startswith("rgb(") or not color.endswith(")"):
-                    issues.append(
-                        f"Row {idx}: color '{color}' is not in rgb(R,G,B) format"
-                    )
-
-        # ---- formality checks ----
-        if "formality" in row and pd.notna(row["formality"]):
-            try:
-                formality_value = int(row["formality"])
-                if formality_value < 0 or formality_value > 5:
-                    issues.append(
-                        f"Row {idx}: formality {formality_value} out of expected range 0–5"
-                    )
-            except (TypeError, ValueError):
-                issues.append(
-                    f"Row {idx}: formality '{row['formality']}' is not an integer"
-                )
-
-    return issues
+
+def _per_unique(col: pd.Series, check, na_value: bool = False) -> pd.Series:
+    """
+    Evaluate a scalar predicate once per distinct value instead of once per row.
+    Tag dumps repeat the same filenames/colors/labels a lot, so this is cheap.
+    """
+    codes, uniques = pd.factorize(col.astype(object))
+    per_value = np.fromiter((bool(check(v)) for v in uniques), dtype=bool, count=len(uniques))
+    result = np.full(len(col), na_value) if len(per_value) == 0 else np.where(codes < 0, na_value, per_value[codes])
+    return pd.Series(result, index=col.index)
+
+
+def _is_str(v) -> bool:
+    return isinstance(v, str)
+
+
+def _non_blank(v) -> bool:
+    return not (isinstance(v, str) and not v.strip())
+
+
+def first_present(df: pd.DataFrame, names: list[str]) -> tuple[pd.Series, pd.Series]:
+    """
+    Column-wise `row.get(a) or row.get(b) or ...`: for each row, the first of
+    the given columns holding a non-empty value (else None), and the name of
+    the column it came from.
+    """
+    values = pd.Series([None] * len(df), index=df.index, dtype=object)
+    source = pd.Series([None] * len(df), index=df.index, dtype=object)
+    for name in reversed(names):
+        if name not in df.columns:
+            continue
+        col = df[name].astype(object)
+        present = _per_unique(col, _non_blank)
+        values = col.where(present, values)
+        source = source.where(~present, name)
+    return values, source
+
+
+def _issue(code: str, column: str, mask: pd.Series, values: pd.Series | None = None) -> Issue | None:
+    if not mask.any():
+        return None
+    return Issue(
+        code=code,
+        column=column,
+        rows=mask.index[mask.to_numpy()].to_numpy(),
+        values=None if values is None else values[mask].to_numpy(),
+    )
+
+
+@metrics.timed("loader.validate_dataframe")
+def validate_dataframe(df: pd.DataFrame, max_issues: int | None = 1000) -> ValidationReport:
+    """
+    Run basic validation checks on the tags DataFrame, one column at a time.
+
+    Returns:
+        A ValidationReport. It is falsy when the data looks OK; iterating it
+        yields at most max_issues human-readable issue strings.
+    """
+    found: list[Issue | None] = []
+
+    # ---- filename checks ----
+    # Flexible names, same as the loader
+    filename, _ = first_present(df, ["filename", "image_name", "file"])
+    bad = ~_per_unique(filename, _is_str)
+    found.append(_issue("missing_filename", "filename", bad))
+
+    # ---- dominant_color checks ----
+    color, source = first_present(df, ["dominant_color", "color"])
+    rgb = re.compile(RGB_PATTERN)
+    bad = _per_unique(color, lambda c: isinstance(c, str) and not rgb.match(c))
+    column = source[bad].iloc[0] if bad.any() else "dominant_color"
+    found.append(_issue("bad_color", column, bad, color))
+
+    # ---- formality checks ----
+    if "formality" in df.columns:
+        raw = df["formality"]
+        num = pd.to_numeric(raw, errors="coerce")
+        # Mirror int(): numbers truncate, strings must spell an integer
+        str_mask = _per_unique(raw, _is_str)
+        not_int = raw.notna() & (num.isna() | (str_mask & (num % 1 != 0)))
+        found.append(_issue("formality_not_int", "formality", not_int, raw))
+        value = np.trunc(num)
+        out_of_range = raw.notna() & ~not_int & ((value < 0) | (value > 5))
+        # Show integers as integers; 1e20 or inf would overflow the cast, so they stay floats
+        shown = value.astype(object)
+        castable = out_of_range & (value.abs() < 2 ** 63)
+        shown[castable] = value[castable].astype(np.int64).tolist()
+        found.append(_issue("formality_range", "formality", out_of_range, shown))
+
+    return ValidationReport([i for i in found if i is not None], max_issues=max_issues)
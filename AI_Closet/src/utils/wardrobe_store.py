@@ -0,0 +1,144 @@
+"""
+Columnar, id-indexed wardrobe for the CSV-backed web app (src/web/app.py).
+
+The CSV is parsed once into a struct of NumPy arrays, one per column, and
+saved next to it as an .npz snapshot. Later starts load that snapshot in one
+bulk read for as long as it is newer than the CSV. An id -> row dict makes
+looking up an item O(1) instead of a boolean-mask scan of the DataFrame.
+Names, coarse types and packed colors are derived here once, vectorized,
+rather than per item on every render.
+"""
+import os
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from PIL import ImageColor
+
+from src.recommender.rules import Item
+from src.utils.colors import GRAY, pack_rgb, parse_rgb
+from src.utils.taxonomy import TYPE_KEYWORDS, classify_series
+from src.utils.validate_data import first_present
+
+COLUMNS = ("id", "name", "category", "type", "color", "rgb", "image_path")
+SNAPSHOT_VERSION = 1  # bump when COLUMNS or their derivation change
+
+
+def _packed_color(value) -> int:
+    """'rgb(R,G,B)' or a CSS color name ('navy', '#223344') -> packed RGB; gray otherwise."""
+    rgb = parse_rgb(value)
+    if rgb is None and isinstance(value, str) and value.strip():
+        try:
+            rgb = ImageColor.getrgb(value.strip().lower())[:3]
+        except ValueError:
+            pass
+    return pack_rgb(rgb) if rgb else GRAY
+
+
+class WardrobeStore:
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+        # Repeated ids: the last row wins, like a dict built from the rows
+        self._row = dict(zip(columns["id"].tolist(), range(len(columns["id"]))))
+        self._items: List[Item] | None = None
+
+    # ---- Building ----
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "WardrobeStore":
+        """Accepts cleaned_tags.csv columns (item_id, category, color, image_path) and the tags.csv ones."""
+        n = len(df)
+        ids = pd.to_numeric(first_present(df, ["id", "item_id"])[0], errors="coerce")
+        ids = ids.fillna(pd.Series(np.arange(1, n + 1), index=df.index)).astype(np.int64)
+        image_path = first_present(df, ["image_path", "filename", "image"])[0].fillna("").astype(str)
+        category = first_present(df, ["category", "type", "predicted_type"])[0].fillna("unknown").astype(str)
+        color = first_present(df, ["color", "dominant_color"])[0].fillna("").astype(str)
+
+        name = first_present(df, ["item_name", "name"])[0]
+        missing = name.isna()
+        if missing.any():  # name after the image file, else the id
+            stems = image_path[missing].map(lambda p: os.path.splitext(os.path.basename(p))[0])
+            name[missing] = stems.where(stems != "", "item " + ids[missing].astype(str))
+        name = name.astype(str)
+
+        coarse = category.str.lower()
+        coarse = coarse.where(coarse.isin(list(TYPE_KEYWORDS)), classify_series(category))
+        codes, uniques = pd.factorize(color)
+        rgb = np.array([_packed_color(c) for c in uniques], dtype=np.int64)[codes]
+
+        return cls({
+            "id": ids.to_numpy(),
+            "name": name.to_numpy(dtype=str),
+            "category": category.to_numpy(dtype=str),
+            "type": coarse.to_numpy(dtype=str),
+            "color": color.to_numpy(dtype=str),
+            "rgb": rgb,
+            "image_path": image_path.to_numpy(dtype=str),
+        })
+
+    # ---- Snapshot ----
+    def save(self, path: str):
+        # Fixed-width unicode arrays, so loading never needs pickle
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, version=np.array(SNAPSHOT_VERSION), **self.columns)
+        os.replace(tmp, path)
+
+    @classmethod
+    def from_snapshot(cls, path: str) -> "WardrobeStore | None":
+        """The saved store, or None if the file is missing, unreadable or of an older format."""
+        try:
+            with np.load(path) as z:
+                if int(z["version"]) != SNAPSHOT_VERSION:
+                    return None
+                return cls({name: z[name] for name in COLUMNS})
+        except (OSError, KeyError, ValueError):
+            return None
+
+    @classmethod
+    def load(cls, csv_path: str, snapshot_path: str | None = None) -> "WardrobeStore":
+        """From the snapshot if it is at least as new as the CSV, else parse the CSV and rewrite the snapshot."""
+        snapshot_path = snapshot_path or os.path.splitext(csv_path)[0] + ".npz"
+        try:
+            fresh = os.path.getmtime(snapshot_path) >= os.path.getmtime(csv_path)
+        except OSError:
+            fresh = False
+        store = cls.from_snapshot(snapshot_path) if fresh else None
+        if store is None:
+            store = cls.from_frame(pd.read_csv(csv_path))
+            try:
+                store.save(snapshot_path)
+            except OSError:
+                pass  # read-only data dir: keep working from the CSV
+        return store
+
+    # ---- Lookups ----
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def __contains__(self, item_id) -> bool:
+        return item_id in self._row
+
+    @property
+    def ids(self) -> List[int]:
+        return self.columns["id"].tolist()
+
+    def row(self, item_id: int) -> int | None:
+        return self._row.get(item_id)
+
+    def get(self, item_id: int) -> dict | None:
+        """{column: value} of one item, or None."""
+        r = self._row.get(item_id)
+        if r is None:
+            return None
+        return {name: col[r].item() for name, col in self.columns.items()}
+
+    def items(self) -> List[Item]:
+        """Every row as a recommender Item (built once, then reused)."""
+        if self._items is None:
+            c = self.columns
+            self._items = [
+                Item(id=i, type=t, color=color, image_path=path, rgb=rgb)
+                for i, t, color, path, rgb in zip(c["id"].tolist(), c["type"].tolist(), c["color"].tolist(),
+                                                  c["image_path"].tolist(), c["rgb"].tolist())
+            ]
+        return self._items
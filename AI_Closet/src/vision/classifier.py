@@ -0,0 +1,144 @@
+"""
+Offline, batched CPU version of image_tagger.ipynb.
+
+Images are decoded and resized by DataLoader workers while the main process
+runs batched forward passes under torch.inference_mode. The output CSV has
+the notebook's columns (image, top_classes, top_scores, labels), so it feeds
+straight into src/utils/colab_postprocess.py.
+
+Usage:
+    python -m src.vision.classifier --images data/images --weights resnet50.pth
+"""
+import os
+import argparse
+from typing import Iterator, List, Sequence
+
+import torch
+from PIL import Image
+from torch.utils.data import DataLoader, Dataset
+from torchvision import models, transforms
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DATA_DIR = os.path.join(ROOT, "data")
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+# Preprocessing of the notebook, plus the ImageNet normalization torchvision's
+# pretrained weights were trained with
+TRANSFORM = transforms.Compose([
+    transforms.Resize(256),
+    transforms.CenterCrop(224),
+    transforms.ToTensor(),
+    transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+])
+
+
+class ImagePaths(Dataset):
+    """(tensor, index) per image; None for files that can't be decoded."""
+
+    def __init__(self, paths: Sequence[str], transform=TRANSFORM):
+        self.paths = list(paths)
+        self.transform = transform
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, i):
+        try:
+            with Image.open(self.paths[i]) as img:
+                img.draft("RGB", (256, 256))  # JPEG: decode at reduced scale when possible
+                return self.transform(img.convert("RGB")), i
+        except Exception:
+            return None
+
+
+def _collate(batch):
+    batch = [b for b in batch if b is not None]
+    if not batch:
+        return None, []
+    tensors, idx = zip(*batch)
+    return torch.stack(tensors), list(idx)
+
+
+def class_names(arch: str = "resnet50") -> List[str]:
+    """ImageNet category names shipped with torchvision (no download)."""
+    return list(models.get_model_weights(arch).DEFAULT.meta["categories"])
+
+
+def load_model(weights_path: str | None = None, arch: str = "resnet50", quantize: bool = False) -> torch.nn.Module:
+    """
+    torchvision classifier in eval mode. weights_path: a local state_dict
+    (random weights if None). quantize: dynamic int8 for the Linear layers
+    (for ResNets that is the final fc; convolutions stay float).
+    """
+    model = models.get_model(arch, weights=None)
+    if weights_path:
+        model.load_state_dict(torch.load(weights_path, map_location="cpu"))
+    model.eval()
+    if quantize:
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model.to(memory_format=torch.channels_last)
+
+
+def classify_images(paths: Sequence[str], model: torch.nn.Module, names: Sequence[str] | None = None,
+                    batch_size: int = 32, num_workers: int = 2, threads: int | None = None,
+                    topk: int = 5) -> Iterator[dict]:
+    """
+    Yield one notebook-style row per readable image, in input order:
+    {"image", "top_classes", "top_scores", "labels"}.
+    """
+    if threads:
+        torch.set_num_threads(threads)
+    loader = DataLoader(ImagePaths(paths), batch_size=batch_size, num_workers=num_workers,
+                        collate_fn=_collate, persistent_workers=False)
+    with torch.inference_mode():
+        for batch, idx in loader:
+            if batch is None:
+                continue
+            logits = model(batch.to(memory_format=torch.channels_last))
+            top_p, top_c = torch.topk(torch.softmax(logits, dim=1), topk)
+            for i, classes, scores in zip(idx, top_c.tolist(), top_p.tolist()):
+                yield {
+                    "image": paths[i],
+                    "top_classes": classes,
+                    "top_scores": scores,
+                    "labels": [names[c] for c in classes] if names else [str(c) for c in classes],
+                }
+
+
+def list_images(images_dir: str) -> List[str]:
+    return sorted(
+        os.path.join(images_dir, f) for f in os.listdir(images_dir)
+        if f.lower().endswith(IMAGE_EXTS)
+    )
+
+
+def tag_folder(images_dir: str, out_csv: str, weights_path: str | None = None, arch: str = "resnet50",
+               batch_size: int = 32, num_workers: int = 2, threads: int | None = None,
+               quantize: bool = False) -> int:
+    """Classify every image in images_dir and write a colab_postprocess-ready CSV; returns rows written."""
+    import pandas as pd
+
+    paths = list_images(images_dir)
+    model = load_model(weights_path, arch, quantize)
+    rows = list(classify_images(paths, model, class_names(arch), batch_size, num_workers, threads))
+    os.makedirs(os.path.dirname(os.path.abspath(out_csv)), exist_ok=True)
+    pd.DataFrame(rows, columns=["image", "top_classes", "top_scores", "labels"]).to_csv(out_csv, index=False)
+    print(f"✅ Tagged {len(rows)}/{len(paths)} images -> {out_csv}")
+    return len(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tag images offline on CPU (batched image_tagger.ipynb).")
+    parser.add_argument("--images", default=os.path.join(DATA_DIR, "images"), help="Images dir (default: data/images)")
+    parser.add_argument("--out", default=os.path.join(DATA_DIR, "tags_colab.csv"),
+                        help="Output CSV, input of colab_postprocess (default: data/tags_colab.csv)")
+    parser.add_argument("--weights", default=None, help="Local state_dict .pth (random weights if omitted)")
+    parser.add_argument("--arch", default="resnet50")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=2, help="DataLoader decode workers")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    parser.add_argument("--quantize", action="store_true", help="Dynamic int8 quantization of Linear layers")
+    args = parser.parse_args()
+    tag_folder(args.images, args.out, args.weights, args.arch, args.batch_size, args.workers, args.threads,
+               args.quantize)
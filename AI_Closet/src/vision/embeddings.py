@@ -0,0 +1,387 @@
+"""
+Visual embeddings on disk and "items similar to this one" search.
+
+Embeddings (e.g. ResNet50's 2048-d penultimate layer) are L2-normalized and
+kept in a float16 matrix memory-mapped from disk, so cosine similarity is a
+dot product. Only the pages a query touches are read. The item id -> row
+mapping lives in SQLite (item_embeddings in schema.sql).
+
+Search is exact, a blockwise float32 BLAS scan of the matrix, unless an
+IVFIndex is attached. The IVF index keeps coarse centroids (and optionally
+product-quantized codes) in RAM. It scores only the probed lists, using the
+PQ codes when present, then reranks a short list against the exact vectors.
+"""
+import os
+import threading
+from typing import Callable, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from src.db.db import DEFAULT_DB, read_conn, write_conn, subscribe, unsubscribe
+
+DEFAULT_EMBEDDINGS = os.path.join(os.path.dirname(DEFAULT_DB), "embeddings.f16")
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Best k (score, row) pairs, highest first."""
+    if len(scores) > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        scores, rows = scores[keep], rows[keep]
+    order = np.argsort(-scores, kind="stable")
+    return scores[order], rows[order]
+
+
+def _kmeans(x: np.ndarray, k: int, iters: int = 10, seed: int = 0, spherical: bool = False) -> np.ndarray:
+    """Lloyd's k-means (or spherical k-means on normalized data) with NumPy matmuls."""
+    rng = np.random.default_rng(seed)
+    centers = x[rng.choice(len(x), size=k, replace=len(x) < k)].copy()
+    for _ in range(iters):
+        if spherical:
+            labels = np.argmax(x @ centers.T, axis=1)
+        else:
+            d = (centers ** 2).sum(axis=1)[None, :] - 2 * (x @ centers.T)
+            labels = np.argmin(d, axis=1)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, x)
+        counts = np.bincount(labels, minlength=k)[:, None]
+        empty = counts[:, 0] == 0
+        centers = np.where(empty[:, None], centers, sums / np.maximum(counts, 1))
+        if spherical:
+            centers = _normalize(centers)
+    return centers.astype(np.float32)
+
+
+class IVFIndex:
+    """
+    Inverted-file index over an EmbeddingStore's rows, with optional product
+    quantization (pq_m sub-vectors of 8-bit codes) for in-RAM candidate scoring.
+    """
+
+    def __init__(self, nlist: int = 1024, nprobe: int = 8, pq_m: int | None = None, rerank: int = 256):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.pq_m = pq_m
+        self.rerank = rerank
+        self.centroids: np.ndarray | None = None   # (nlist, dim)
+        self.codebooks: np.ndarray | None = None   # (pq_m, 256, dim / pq_m)
+        self.assign = np.empty(0, dtype=np.int32)  # list id per indexed row
+        self.codes = np.empty((0, pq_m or 0), dtype=np.uint8)
+        self._order: np.ndarray | None = None       # rows sorted by list
+        self._offsets: np.ndarray | None = None
+
+    # ---- training / adding ----
+    def train(self, sample: np.ndarray, seed: int = 0):
+        sample = _normalize(sample)
+        self.nlist = min(self.nlist, len(sample))
+        self.centroids = _kmeans(sample, self.nlist, seed=seed, spherical=True)
+        if self.pq_m:
+            subs = np.split(sample, self.pq_m, axis=1)
+            self.codebooks = np.stack([_kmeans(s, 256, iters=8, seed=seed + j) for j, s in enumerate(subs)])
+
+    def _encode(self, x: np.ndarray) -> np.ndarray:
+        codes = np.empty((len(x), self.pq_m), dtype=np.uint8)
+        for j, (sub, book) in enumerate(zip(np.split(x, self.pq_m, axis=1), self.codebooks)):
+            d = (book ** 2).sum(axis=1)[None, :] - 2 * (sub @ book.T)
+            codes[:, j] = np.argmin(d, axis=1)
+        return codes
+
+    def add(self, vectors: np.ndarray):
+        """Index the next len(vectors) rows (row numbers continue from len(self))."""
+        x = np.asarray(vectors, dtype=np.float32)
+        self.assign = np.concatenate([self.assign, np.argmax(x @ self.centroids.T, axis=1).astype(np.int32)])
+        if self.pq_m:
+            self.codes = np.concatenate([self.codes, self._encode(x)])
+        self._order = None
+
+    def update(self, rows: np.ndarray, vectors: np.ndarray):
+        """Re-index rows whose vectors were overwritten."""
+        x = np.asarray(vectors, dtype=np.float32)
+        self.assign[rows] = np.argmax(x @ self.centroids.T, axis=1)
+        if self.pq_m:
+            self.codes[rows] = self._encode(x)
+        self._order = None
+
+    def __len__(self) -> int:
+        return len(self.assign)
+
+    def _lists(self):
+        if self._order is None:
+            self._order = np.argsort(self.assign, kind="stable")
+            self._offsets = np.searchsorted(self.assign[self._order], np.arange(self.nlist + 1))
+        return self._order, self._offsets
+
+    # ---- search ----
+    def candidates(self, q: np.ndarray) -> np.ndarray:
+        order, offsets = self._lists()
+        probe = np.argpartition(-(self.centroids @ q), min(self.nprobe, self.nlist) - 1)[: self.nprobe]
+        return np.concatenate([order[offsets[c]:offsets[c + 1]] for c in probe])
+
+    def search(self, matrix: np.ndarray, q: np.ndarray, k: int, valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        rows = self.candidates(q)
+        rows = rows[valid[rows]]
+        if self.pq_m and len(rows) > self.rerank:
+            # Approximate scores from the codes (no disk reads), exact rerank of the best few
+            tables = np.einsum("mkd,md->mk", self.codebooks, q.reshape(self.pq_m, -1))
+            approx = tables[np.arange(self.pq_m), self.codes[rows]].sum(axis=1)
+            rows = rows[np.argpartition(-approx, self.rerank - 1)[: self.rerank]]
+        rows = np.sort(rows)  # sequential-ish reads from the memmap
+        scores = matrix[rows].astype(np.float32) @ q
+        return _top_k(scores, rows, k)
+
+    # ---- persistence ----
+    def save(self, path: str):
+        np.savez(path, nlist=self.nlist, nprobe=self.nprobe, pq_m=self.pq_m or 0, rerank=self.rerank,
+                 centroids=self.centroids, assign=self.assign, codes=self.codes,
+                 codebooks=self.codebooks if self.pq_m else np.empty(0))
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        with np.load(path) as z:
+            index = cls(int(z["nlist"]), int(z["nprobe"]), int(z["pq_m"]) or None, int(z["rerank"]))
+            index.centroids, index.assign, index.codes = z["centroids"], z["assign"], z["codes"]
+            if index.pq_m:
+                index.codebooks = z["codebooks"]
+        return index
+
+
+class EmbeddingStore:
+    """
+    float16 (capacity, dim) memmap at `path`, grown by doubling. Rows are
+    never moved; re-adding an item overwrites its row, deleting it frees the
+    mapping (the row is skipped by searches).
+    """
+
+    def __init__(self, dim: int = 2048, path: str | None = None, db_path: str | None = None):
+        self.dim = dim
+        self.path = path or DEFAULT_EMBEDDINGS
+        self.db_path = os.path.abspath(db_path or DEFAULT_DB)
+        self.index: IVFIndex | None = None
+        self._lock = threading.RLock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        rows = read_conn(self.db_path).execute("SELECT item_id, row FROM item_embeddings").fetchall()
+        self._row_of = {item_id: row for item_id, row in rows}
+        n = max(self._row_of.values(), default=-1) + 1
+        self.row_ids = np.full(n, -1, dtype=np.int64)  # row -> item id (-1 = free)
+        for item_id, row in rows:
+            self.row_ids[row] = item_id
+        self._open(max(n, 1024))
+
+    def _open(self, min_rows: int):
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size % (self.dim * 2):
+            raise ValueError(f"{self.path} does not hold float16 rows of dim {self.dim}")
+        capacity = size // (self.dim * 2)
+        if capacity < min_rows:
+            capacity = max(min_rows, 2 * capacity)
+            with open(self.path, "ab") as f:
+                f.truncate(capacity * self.dim * 2)
+        self.matrix = np.memmap(self.path, dtype=np.float16, mode="r+", shape=(capacity, self.dim))
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._row_of
+
+    # ---- writes ----
+    def add(self, item_ids: Sequence[int], vectors: np.ndarray):
+        """
+        Store (normalized) embeddings for items, overwriting existing ones.
+
+        Rows for new items are allocated from item_embeddings inside the write
+        transaction, so stores in several processes sharing the file never
+        hand out the same row (a clash fails the INSERT instead of remapping).
+        """
+        vectors = _normalize(vectors).astype(np.float16)
+        item_ids = [int(i) for i in item_ids]
+        with self._lock:
+            with write_conn(self.db_path) as conn:
+                conn.execute("BEGIN IMMEDIATE")  # hold the DB write lock from the MAX(row) read on
+                (next_row,) = conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM item_embeddings").fetchone()
+                next_row = max(next_row, len(self.row_ids))  # never reuse a row this store has handed out
+                assigned, rows, new = {}, [], []
+                for item_id in item_ids:
+                    row = assigned.get(item_id)
+                    if row is None:
+                        hit = conn.execute("SELECT row FROM item_embeddings WHERE item_id = ?", (item_id,)).fetchone()
+                        if hit is None:
+                            row, next_row = next_row, next_row + 1
+                            new.append((item_id, row))
+                        else:
+                            row = hit[0]
+                        assigned[item_id] = row
+                    rows.append(row)
+                conn.executemany("INSERT INTO item_embeddings(item_id, row) VALUES(?,?)", new)
+                if next_row > len(self.matrix):
+                    self.matrix.flush()
+                    self._open(next_row)
+                rows = np.array(rows, dtype=np.int64)
+                self.matrix[rows] = vectors
+                self.matrix.flush()
+            if next_row > len(self.row_ids):
+                self.row_ids = np.concatenate([self.row_ids, np.full(next_row - len(self.row_ids), -1)])
+            self.row_ids[rows] = item_ids
+            self._row_of.update(assigned)
+            if self.index is not None:
+                old = rows < len(self.index)
+                if old.any():
+                    self.index.update(rows[old], vectors[old].astype(np.float32))
+                if len(self.index) < len(self.row_ids):
+                    self.index.add(self.matrix[len(self.index):len(self.row_ids)].astype(np.float32))
+
+    def remove(self, item_id: int) -> bool:
+        with self._lock:
+            row = self._row_of.pop(item_id, None)
+            if row is None:
+                return False
+            self.row_ids[row] = -1
+            with write_conn(self.db_path) as conn:
+                conn.execute("DELETE FROM item_embeddings WHERE item_id = ?", (item_id,))
+            return True
+
+    def watch(self):
+        """Drop embeddings of items deleted through db.py."""
+        subscribe(self.on_db_change)
+
+    def close(self):
+        unsubscribe(self.on_db_change)
+        self.matrix.flush()
+
+    def on_db_change(self, event: str, payload, db_path: str):
+        if event == "delete" and db_path == self.db_path:
+            self.remove(payload)
+
+    # ---- reads ----
+    def get(self, item_id: int) -> np.ndarray | None:
+        row = self._row_of.get(item_id)
+        return None if row is None else self.matrix[row].astype(np.float32)
+
+    def build_index(self, nlist: int | None = None, nprobe: int = 8, pq_m: int | None = None,
+                    rerank: int = 256, sample_size: int = 65536, seed: int = 0) -> IVFIndex:
+        """Train an IVF (optionally IVF-PQ) index on a sample of the rows and attach it."""
+        with self._lock:
+            n = len(self.row_ids)
+            nlist = nlist or max(1, int(np.sqrt(n)))
+            rng = np.random.default_rng(seed)
+            sample_rows = np.sort(rng.choice(n, size=min(n, sample_size), replace=False))
+            index = IVFIndex(nlist, nprobe, pq_m, rerank)
+            index.train(self.matrix[sample_rows].astype(np.float32), seed=seed)
+            for start in range(0, n, 65536):
+                index.add(self.matrix[start:min(n, start + 65536)].astype(np.float32))
+            self.index = index
+            return index
+
+    def load_index(self, path: str) -> IVFIndex:
+        """Attach an index saved with IVFIndex.save, indexing rows added since."""
+        with self._lock:
+            index = IVFIndex.load(path)
+            n = len(self.row_ids)
+            for start in range(len(index), n, 65536):
+                index.add(self.matrix[start:min(n, start + 65536)].astype(np.float32))
+            self.index = index
+            return index
+
+    def search(self, query: np.ndarray, k: int = 10, exact: bool = False,
+               block_elems: int = 1 << 24) -> List[Tuple[int, float]]:
+        """(item id, cosine similarity) of the k rows most similar to query, best first."""
+        q = _normalize(query).ravel()
+        with self._lock:
+            n = len(self.row_ids)
+            valid = self.row_ids >= 0
+            if self.index is not None and not exact:
+                scores, rows = self.index.search(self.matrix, q, k, valid)
+            else:
+                scores, rows = np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+                step = max(1, block_elems // self.dim)
+                for start in range(0, n, step):
+                    block = self.matrix[start:min(n, start + step)].astype(np.float32) @ q
+                    block[~valid[start:start + len(block)]] = -np.inf
+                    scores, rows = _top_k(np.concatenate([scores, block]),
+                                          np.concatenate([rows, np.arange(start, start + len(block))]), k)
+                keep = scores > -np.inf
+                scores, rows = scores[keep], rows[keep]
+            return [(int(self.row_ids[r]), float(s)) for s, r in zip(scores, rows)]
+
+    def similar(self, item_id: int, k: int = 10, exact: bool = False) -> List[Tuple[int, float]]:
+        """Items most similar to item_id (itself excluded); [] if it has no embedding."""
+        vec = self.get(item_id)
+        if vec is None:
+            return []
+        return [(i, s) for i, s in self.search(vec, k + 1, exact=exact) if i != item_id][:k]
+
+
+# ---- Computing embeddings ----
+
+def resnet50_embedder(weights: str | None = "DEFAULT", device: str = "cpu") -> Callable[[list], np.ndarray]:
+    """
+    ResNet50 with the classifier removed: PIL images -> (N, 2048) penultimate
+    features, preprocessed with classifier.TRANSFORM (including the ImageNet
+    normalization the weights expect). weights=None gives random weights (no
+    download).
+    """
+    import torch
+    from torchvision import models
+
+    from src.vision.classifier import TRANSFORM as transform
+
+    model = models.resnet50(weights=weights)
+    model.fc = torch.nn.Identity()
+    model.eval().to(device)
+
+    def embed(images: list) -> np.ndarray:
+        batch = torch.stack([transform(img.convert("RGB")) for img in images]).to(device)
+        with torch.inference_mode():
+            return model(batch).cpu().numpy()
+
+    return embed
+
+
+def embed_items(store: EmbeddingStore, items: Iterable[Tuple[int, str]], embed: Callable[[list], np.ndarray],
+                batch_size: int = 32) -> int:
+    """Embed (item id, image path) pairs in batches into store; unreadable images are skipped."""
+    from PIL import Image
+
+    done = 0
+    batch_ids, batch_imgs = [], []
+
+    def flush():
+        nonlocal done
+        if batch_ids:
+            store.add(batch_ids, embed(batch_imgs))
+            done += len(batch_ids)
+            batch_ids.clear()
+            batch_imgs.clear()
+
+    for item_id, path in items:
+        try:
+            with Image.open(path) as img:
+                batch_imgs.append(img.convert("RGB"))
+        except Exception:
+            continue
+        batch_ids.append(item_id)
+        if len(batch_ids) >= batch_size:
+            flush()
+    flush()
+    return done
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.db.db import all_items
+
+    parser = argparse.ArgumentParser(description="Embed every item image into the embedding store")
+    parser.add_argument("--images", required=True, help="Directory holding the item images")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--all", action="store_true", help="Re-embed items that already have an embedding")
+    args = parser.parse_args()
+
+    store = EmbeddingStore()
+    todo = [(row[0], os.path.join(args.images, row[1])) for row in all_items()
+            if args.all or row[0] not in store]
+    print(f"Embedded {embed_items(store, todo, resnet50_embedder(), args.batch_size)} of {len(todo)} items")
@@ -0,0 +1,114 @@
+"""
+Background workers for the tagging queue (tag_jobs in schema.sql).
+
+Each of `workers` threads claims a small batch of jobs, tags the images
+(dominant colors in one batched call, type from the filename, both through
+the tag cache) and writes the results with db.finish_tag_job. The number of
+threads bounds concurrency; jobs live in SQLite, so anything queued is
+picked up again after a restart, and a job interrupted mid-batch once its
+claim's lease (db.TAG_LEASE_SECONDS) has run out. Workers in several
+processes (the app and the API) can share one queue. A batch that raises is
+logged, and its unfinished jobs are recorded as failed attempts (retried up
+to db.MAX_TAG_ATTEMPTS), so the thread keeps serving the queue.
+"""
+import logging
+import os
+import threading
+
+from src.db.db import claim_tag_jobs, finish_tag_job, requeue_running_jobs
+from src.db.tag_cache import TagCache
+from src.vision.tagger import classify_type_from_name, extract_dominant_colors
+
+log = logging.getLogger(__name__)
+
+
+class TagWorker:
+    def __init__(self, workers: int = 2, batch_size: int = 8, poll_interval: float = 2.0,
+                 db_path: str | None = None, cache_path: str | None = None, thumbnails=None):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.db_path = db_path
+        self.cache_path = cache_path
+        self.thumbnails = thumbnails  # optional ThumbnailStore, filled while tagging
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> "TagWorker":
+        requeue_running_jobs(self.db_path)
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"tag-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def wake(self):
+        """New jobs were queued: don't wait for the next poll."""
+        self._wake.set()
+
+    def stop(self, timeout: float | None = None):
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        with TagCache(self.cache_path) as cache:  # SQLite connections are per thread
+            while not self._stop.is_set():
+                self._wake.clear()  # before claiming, so a wake() during run_once isn't lost
+                try:
+                    handled = self.run_once(cache)
+                except Exception:
+                    log.exception("tagging batch failed")
+                    handled = 0  # back off instead of spinning on a persistent error
+                if not handled:
+                    self._wake.wait(self.poll_interval)
+
+    def run_once(self, cache: TagCache) -> int:
+        """
+        Claim and process one batch; returns the number of jobs handled. If
+        tagging raises, the jobs not yet finished get the error recorded
+        (so they are retried or marked failed) and the exception propagates.
+        """
+        jobs = claim_tag_jobs(self.batch_size, self.db_path)
+        if not jobs:
+            return 0
+        unfinished = {job_id: item_id for job_id, item_id, _ in jobs}
+        try:
+            self._tag(jobs, cache, unfinished)
+        except Exception as e:
+            for job_id, item_id in unfinished.items():
+                finish_tag_job(job_id, item_id, error=f"{type(e).__name__}: {e}", db_path=self.db_path)
+            raise
+        return len(jobs)
+
+    def _tag(self, jobs: list[tuple[int, int, str]], cache: TagCache, unfinished: dict[int, int]):
+        """Tag one claimed batch, removing each job from unfinished once its outcome is written."""
+        paths = [path for _, _, path in jobs]
+        present = [p for p in paths if os.path.exists(p)]
+        cached = cache.lookup(present)
+        todo = [p for p in present if not (cached.get(p) or {}).get("dominant_color")]
+        try:
+            colors = dict(zip(todo, extract_dominant_colors(todo)))
+        except Exception:
+            colors = {}  # fall back to per-image results (None) below
+        fresh = {}
+        for job_id, item_id, path in jobs:
+            hit = cached.get(path) or {}
+            color = hit.get("dominant_color") or colors.get(path)
+            if color is None:
+                error = "image not found" if path not in present else "could not read image"
+                finish_tag_job(job_id, item_id, error=error, db_path=self.db_path)
+                del unfinished[job_id]
+                continue
+            itype = hit.get("type") or classify_type_from_name(os.path.basename(path))
+            if not hit:
+                fresh[path] = {"dominant_color": color, "type": itype}
+            if self.thumbnails is not None:
+                self.thumbnails.get(path)
+            finish_tag_job(job_id, item_id, itype, color, db_path=self.db_path)
+            del unfinished[job_id]
+        if fresh:
+            cache.store(fresh)
@@ -1,28 +1,125 @@
-
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Iterable
 import numpy as np
 from PIL import Image
 from sklearn.cluster import KMeans
 
+from src.utils import metrics
+from src.utils.taxonomy import classify
+
+@metrics.timed("tagger.extract_dominant_color")
 def extract_dominant_color(image_path: str, k: int = 3) -> str:
-    img = Image.open(image_path).convert("RGB").resize((128,128))
+    with metrics.span("tagger.decode"):
+        img = Image.open(image_path).convert("RGB").resize((128,128))
     arr = np.array(img).reshape(-1,3)
-    km = KMeans(n_clusters=k, n_init="auto").fit(arr)
+    with metrics.span("tagger.kmeans"):
+        km = KMeans(n_clusters=k, n_init="auto").fit(arr)
     centers = km.cluster_centers_.astype(int)
     # Choose the most populous cluster
     labels, counts = np.unique(km.labels_, return_counts=True)
     dominant = centers[labels[np.argmax(counts)]]
     return f"rgb({dominant[0]},{dominant[1]},{dominant[2]})"
 
-# Placeholder for a real classifier; returns coarse type using filename hints.
+# ---- Batch dominant-color engine ----
+# Pixels are quantized to 4 bits per channel (4096 bins). Each bin keeps the
+# mean of the real pixels that fell into it, so k-means runs on at most 4096
+# weighted points per image instead of 16384 raw pixels, and all images of a
+# batch are clustered together in one set of NumPy operations.
+_QBITS = 4
+_NBINS = 1 << (3 * _QBITS)
+_LUMA = np.array([0.299, 0.587, 0.114])
+
+def _load_small(image_path: str, size: int) -> np.ndarray:
+    """Decode an image at reduced scale and return (size*size, 3) uint8 pixels."""
+    with Image.open(image_path) as img:
+        # JPEG: let libjpeg downscale during decode (DCT scaling) instead of
+        # decoding the full-resolution photo. No-op for other formats.
+        img.draft("RGB", (size, size))
+        img = img.convert("RGB").resize((size, size))
+        return np.asarray(img, dtype=np.uint8).reshape(-1, 3)
+
+def _batch_histograms(pixels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(N, P, 3) uint8 pixels -> per-image bin counts (N, B) and channel sums (N, B, 3)."""
+    n = pixels.shape[0]
+    q = (pixels >> (8 - _QBITS)).astype(np.int64)
+    bins = (q[..., 0] << (2 * _QBITS)) | (q[..., 1] << _QBITS) | q[..., 2]
+    flat = (bins + np.arange(n)[:, None] * _NBINS).ravel()
+    counts = np.bincount(flat, minlength=n * _NBINS).reshape(n, _NBINS)
+    sums = np.stack(
+        [np.bincount(flat, weights=pixels[..., c].ravel(), minlength=n * _NBINS) for c in range(3)],
+        axis=-1,
+    ).reshape(n, _NBINS, 3)
+    return counts, sums
+
+def _batch_kmeans(points: np.ndarray, weights: np.ndarray, k: int, max_iter: int = 20, tol: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted Lloyd iterations for N independent problems at once.
+
+    points: (N, M, 3), weights: (N, M). Returns centers (N, k, 3) and the
+    total weight assigned to each center (N, k).
+    """
+    n = points.shape[0]
+    rows = np.arange(n)[:, None]
+    # Deterministic init: centers at evenly spaced weighted luminance quantiles
+    order = np.argsort(points @ _LUMA, axis=1)
+    cum = np.cumsum(weights[rows, order], axis=1)
+    cum /= cum[:, -1:]
+    targets = (2 * np.arange(k) + 1) / (2 * k)
+    picks = (cum[:, :, None] >= targets).argmax(axis=1)  # (N, k)
+    centers = points[rows, order[rows, picks]]
+
+    onehot = None
+    for _ in range(max_iter):
+        d = ((points[:, :, None, :] - centers[:, None, :, :]) ** 2).sum(-1)  # (N, M, k)
+        labels = d.argmin(axis=2)
+        onehot = (labels[..., None] == np.arange(k)) * weights[..., None]
+        wsum = onehot.sum(axis=1)
+        new = np.einsum("nmk,nmc->nkc", onehot, points)
+        empty = wsum == 0
+        new = np.where(empty[..., None], centers, new / np.where(empty, 1, wsum)[..., None])
+        shift = np.abs(new - centers).max()
+        centers = new
+        if shift < tol:
+            break
+    return centers, onehot.sum(axis=1)
+
+def _format_rgb(rgb) -> str:
+    return f"rgb({rgb[0]},{rgb[1]},{rgb[2]})"
+
+@metrics.timed("tagger.extract_dominant_colors")
+def extract_dominant_colors(image_paths: Iterable[str], k: int = 3, size: int = 128, batch_size: int = 64) -> list[str | None]:
+    """
+    Batch version of extract_dominant_color.
+
+    Returns one 'rgb(R,G,B)' string per input path, in input order. Images
+    that cannot be opened or decoded yield None instead of failing the batch.
+    """
+    paths = list(image_paths)
+    out: list[str | None] = [None] * len(paths)
+    for start in range(0, len(paths), batch_size):
+        pixels, slots = [], []
+        for i, path in enumerate(paths[start:start + batch_size]):
+            try:
+                with metrics.span("tagger.decode"):
+                    pixels.append(_load_small(path, size))
+            except (OSError, ValueError):
+                continue
+            slots.append(start + i)
+        if not pixels:
+            continue
+        counts, sums = _batch_histograms(np.stack(pixels))
+        # Only keep bins used by at least one image in this batch
+        used = counts.any(axis=0)
+        counts, sums = counts[:, used].astype(float), sums[:, used]
+        points = sums / np.maximum(counts, 1)[..., None]
+        with metrics.span("tagger.batch_kmeans"):
+            centers, sizes = _batch_kmeans(points, counts, k)
+        metrics.incr("tagger.images", len(slots))
+        dominant = centers[np.arange(len(slots)), sizes.argmax(axis=1)].astype(int)
+        for slot, rgb in zip(slots, dominant):
+            out[slot] = _format_rgb(rgb)
+    return out
+
+# Placeholder for a real classifier; returns coarse type using filename hints
+# (keywords from src/utils/taxonomy.py).
 def classify_type_from_name(filename: str) -> str:
-    name = filename.lower()
-    if any(k in name for k in ["hoodie","sweater","tee","shirt","top","blouse"]):
-        return "top"
-    if any(k in name for k in ["jeans","pants","trouser","skirt","short"]):
-        return "bottom"
-    if any(k in name for k in ["jacket","coat","parka","hoodie"]):
-        return "outerwear"
-    if any(k in name for k in ["sneaker","shoe","boot"]):
-        return "shoes"
-    return "unknown"
+    return classify(filename)
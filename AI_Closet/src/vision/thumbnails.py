@@ -0,0 +1,118 @@
+"""
+Content-addressed thumbnail cache for the UIs.
+
+Thumbnails are written once per image content and size as
+<cache_dir>/<sha[:2]>/<sha>_<px>.<ext> (WebP when Pillow supports it, else
+JPEG), so renames and duplicate uploads share files. They are made at ingest
+(generate) or lazily on first display (get). A file's mtime doubles as its
+last-use time: get() touches it, and once the directory grows past max_bytes
+the least recently used files are deleted.
+"""
+import os
+import threading
+from typing import Dict, Iterable
+
+from PIL import Image, ImageOps, features
+
+from src.db.tag_cache import file_sha256
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_THUMB_DIR = os.environ.get("THUMB_CACHE_DIR", os.path.join(ROOT, "data", "thumbnails"))
+
+# Longest side in pixels
+THUMB_SIZES = {"small": 256, "medium": 640}
+
+
+class ThumbnailStore:
+    def __init__(self, cache_dir: str | None = None, max_bytes: int = 256 << 20, quality: int = 80):
+        self.cache_dir = cache_dir or DEFAULT_THUMB_DIR
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self.ext = "webp" if features.check("webp") else "jpg"
+        self._lock = threading.Lock()
+        # path -> (mtime_ns, size, sha256): hash each source once per process
+        self._keys: Dict[str, tuple] = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._total = sum(size for _, size, _ in self._scan())
+
+    def _scan(self):
+        """(path, bytes, mtime) of every cached thumbnail."""
+        for sub in os.scandir(self.cache_dir):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith(".tmp"):
+                    continue  # being written
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue  # evicted by another process meanwhile
+                yield entry.path, st.st_size, st.st_mtime
+
+    def key(self, src_path: str) -> str:
+        st = os.stat(src_path)
+        with self._lock:
+            cached = self._keys.get(src_path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        sha = file_sha256(src_path)
+        with self._lock:
+            self._keys[src_path] = (st.st_mtime_ns, st.st_size, sha)
+        return sha
+
+    def path_for(self, key: str, size: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}_{THUMB_SIZES[size]}.{self.ext}")
+
+    def generate(self, src_path: str, sizes: Iterable[str] = THUMB_SIZES) -> Dict[str, str]:
+        """Write the missing thumbnails of src_path (decoding it once); returns {size: path}."""
+        key = self.key(src_path)
+        targets = {s: self.path_for(key, s) for s in sizes}
+        todo = sorted((s for s, p in targets.items() if not os.path.exists(p)), key=lambda s: -THUMB_SIZES[s])
+        if todo:
+            with Image.open(src_path) as img:
+                largest = THUMB_SIZES[todo[0]]
+                img.draft("RGB", (largest, largest))  # JPEG: decode at reduced scale
+                img = ImageOps.exif_transpose(img).convert("RGB")
+                for s in todo:  # largest first, each from the previous
+                    img.thumbnail((THUMB_SIZES[s], THUMB_SIZES[s]), Image.LANCZOS)
+                    self._write(img, targets[s])
+            self._evict()
+        return targets
+
+    def _write(self, img: Image.Image, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        img.save(tmp, format="WEBP" if self.ext == "webp" else "JPEG", quality=self.quality)
+        os.replace(tmp, path)  # readers never see a partial file
+        with self._lock:
+            self._total += os.path.getsize(path)
+
+    def get(self, src_path: str, size: str = "small") -> str | None:
+        """Path of src_path's thumbnail (made on first use); None if the source can't be read."""
+        try:
+            path = self.path_for(self.key(src_path), size)
+            if os.path.exists(path):
+                os.utime(path)  # mark as recently used
+                return path
+            return self.generate(src_path, [size])[size]
+        except OSError:
+            return None
+
+    def _evict(self):
+        with self._lock:
+            if self._total <= self.max_bytes:
+                return
+            files = sorted(self._scan(), key=lambda f: f[2])
+            total = sum(size for _, size, _ in files)
+            for path, size, _ in files:
+                if total <= self.max_bytes * 0.9:  # headroom so we don't rescan on every write
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+            self._total = total
+
+    def bytes_used(self) -> int:
+        return self._total
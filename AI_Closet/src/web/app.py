@@ -1,6 +1,4 @@
 import streamlit as st
-import pandas as pd
-from PIL import Image
 import os
 import sys
 
@@ -9,48 +7,40 @@ PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "..", ".."))  # go up 2
 sys.path.append(PROJECT_ROOT)
 
 # Now the import works because src is in the Python path
-from src.recommender.rules import recommend as recommend_outfit, Item
+from src.recommender.rules import recommend as recommend_outfit
+from src.vision.thumbnails import ThumbnailStore
+from src.utils.wardrobe_store import WardrobeStore
+
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+CSV_PATH = os.path.join(DATA_DIR, "cleaned_tags.csv")
 
 
 # ---------------------------------------------------
 # Load Data
 # ---------------------------------------------------
-@st.cache_data
-def load_data():
-    return pd.read_csv("data/cleaned_tags.csv")
+@st.cache_resource
+def load_store(csv_mtime: float) -> WardrobeStore:
+    # Columnar store + id index; the .npz snapshot makes restarts one bulk
+    # load. Keyed on the CSV's mtime, so editing the CSV reloads it.
+    return WardrobeStore.load(CSV_PATH)
 
-df = load_data()
+store = load_store(os.path.getmtime(CSV_PATH))
+
+
+@st.cache_resource
+def get_thumbnails():
+    # Downscaled copies for st.image instead of the full-size originals
+    return ThumbnailStore()
+
+
+def resolve_image(path: str) -> str | None:
+    # CSV paths are relative to data/ (e.g. images/pants1.jpg)
+    for candidate in (path, os.path.join(DATA_DIR, path)):
+        if candidate and os.path.exists(candidate):
+            return candidate
+    return None
 
 
-# ---------------------------------------------------
-# Convert DataFrame into Item objects for recommender
-# ---------------------------------------------------
-def df_to_items(df):
-    items = []
-    for _, row in df.iterrows():
-        items.append(
-            Item(
-<<<<<<< HEAD
-                id=row["id"],
-                type=row["category"],   # adjust if your CSV uses different column names
-                color=row["color"]
-=======
-                type=row["category"],   # category → type
-                color=row["color"],
-                image_path=row["image_path"],
-                tags=row["tags"]
->>>>>>> 5d4203e819827c386a0450dc8cdba8fa7f62391a
-            )
-        )
-    return items
-
-
-<<<<<<< HEAD
-=======
-
-
-
->>>>>>> 5d4203e819827c386a0450dc8cdba8fa7f62391a
 # ---------------------------------------------------
 # Streamlit UI
 # ---------------------------------------------------
@@ -64,19 +54,15 @@ occasion = st.sidebar.selectbox("Occasion:", ["Any", "Casual", "Formal", "Sport"
 st.subheader("Your Wardrobe Items")
 
 # Select one item
-<<<<<<< HEAD
-selected_item = st.selectbox("Choose an item you want to style:", df["item_name"].unique())
-
-# Display image of selected item
-image_path = df.loc[df["item_name"] == selected_item, "image_path"].values[0]
-=======
-selected_item = st.selectbox("Choose an item you want to style:", df["category"].unique())
+names = store.columns["name"]
+selected_id = st.selectbox("Choose an item you want to style:", store.ids,
+                           format_func=lambda i: names[store.row(i)])
 
 # Display image of selected item
-image_path = df.loc[df["category"] == selected_item, "image_path"].values[0]
->>>>>>> 5d4203e819827c386a0450dc8cdba8fa7f62391a
-if os.path.exists(image_path):
-    st.image(Image.open(image_path), width=250)
+image_path = resolve_image(store.get(selected_id)["image_path"]) if selected_id is not None else None
+thumb = get_thumbnails().get(image_path, "medium") if image_path else None
+if thumb:
+    st.image(thumb, width=250)
 
 
 # ---------------------------------------------------
@@ -86,9 +72,8 @@ if st.button("Recommend Outfit"):
 
     with st.spinner("Thinking..."):
 
-        # Convert whole wardrobe into Item objects
-        items_list = df_to_items(df)
-<<<<<<< HEAD
+        # Item objects are built once per store, not per click
+        items_list = store.items()
 
         # Map weather → approximate temperature
         temp_lookup = {
@@ -110,42 +95,12 @@ if st.button("Recommend Outfit"):
         st.write("---")
 
         for item in outfit:
-            # item is an Item(dataclass)
-            df_row = df[df["id"] == item.id].iloc[0]
-
-            st.write(f"• **{df_row['item_name']}** ({item.type}, {item.color})")
-
-            if os.path.exists(df_row["image_path"]):
-                st.image(df_row["image_path"], width=200)
-=======
-
-        # Map weather → approximate temperature
-        temp_lookup = {
-            "Cold": 55,
-            "Hot": 85,
-            "Mild": 70,
-            "Any": 70,
-        }
-
-        context = {"temp_f": temp_lookup[weather]}
-
-        # Run the recommendation engine
-        outfits = recommend_outfit(items_list, context)
-
-    st.subheader("Suggested Outfits:")
-
-    # Display results
-    for outfit in outfits:
-        st.write("---")
-
-        for item in outfit:
-            # item is an Item(dataclass)
-            # Using category to find the item (assuming no duplicates)
-            df_row = df[df["category"] == item.type].iloc[0]
-
-            st.write(f"• **{df_row['category']}** ({item.type}, {item.color})")
+            # item is an Item(dataclass); O(1) lookup through the id index
+            row = store.get(item.id)
 
-            if os.path.exists(df_row["image_path"]):
-                st.image(df_row["image_path"], width=200)
+            st.write(f"• **{row['name']}** ({row['category']}, {item.color})")
 
->>>>>>> 5d4203e819827c386a0450dc8cdba8fa7f62391a
+            path = resolve_image(row["image_path"])
+            thumb = get_thumbnails().get(path) if path else None
+            if thumb:
+                st.image(thumb, width=200)
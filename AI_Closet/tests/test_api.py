@@ -0,0 +1,100 @@
+import io
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+import numpy as np
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import src.db.db as db
+from src.api.app import create_app
+from src.utils import metrics
+
+
+def png(rgb):
+    buf = io.BytesIO()
+    Image.fromarray(np.full((64, 64, 3), rgb, dtype=np.uint8)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class TestApi(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(db.close_all)
+        self.db_path = os.path.join(self.tmp.name, "wardrobe.db")
+        db.init_db(self.db_path)
+        db.add_items([("tee.jpg", "top", "rgb(230,230,230)", None, "summer", 1, None),
+                      ("jeans.jpg", "bottom", "rgb(30,30,120)", None, None, 1, None),
+                      ("black.jpg", "bottom", "rgb(10,10,10)", None, None, 4, None)], db_path=self.db_path)
+        app = create_app(self.db_path, os.path.join(self.tmp.name, "images"), workers=1,
+                         thumbnails_dir=os.path.join(self.tmp.name, "thumbs"),
+                         tag_cache_path=os.path.join(self.tmp.name, "tag_cache.db"))
+        self.client = TestClient(app)
+        self.client.__enter__()  # run the lifespan (warm index, workers)
+        self.addCleanup(self.client.__exit__, None, None, None)
+
+    def test_items_listing_and_paging(self):
+        items = self.client.get("/items", params={"limit": 2}).json()
+        self.assertEqual([i["filename"] for i in items], ["black.jpg", "jeans.jpg"])
+        nxt = self.client.get("/items", params={"after_id": items[-1]["id"]}).json()
+        self.assertEqual([i["filename"] for i in nxt], ["tee.jpg"])
+        tops = self.client.get("/items", params={"type": "top"}).json()
+        self.assertEqual([i["id"] for i in tops], [1])
+        self.assertEqual(len(self.client.get("/items", params={"formality_min": 3}).json()), 1)
+        self.assertEqual(self.client.get("/items/99").status_code, 404)
+
+    def test_recommend_rankings(self):
+        basic = self.client.post("/recommend", json={"temp_f": 75}).json()
+        self.assertEqual([[i["id"] for i in o] for o in basic["outfits"]], [[1, 3], [1, 2]])
+        for ranking in ("feedback", "outfit"):
+            res = self.client.post("/recommend", json={"temp_f": 75, "ranking": ranking})
+            self.assertEqual(res.status_code, 200)
+            self.assertTrue(res.json()["outfits"])
+        self.assertEqual(self.client.post("/recommend", json={"k": 0}).status_code, 422)
+
+        self.assertEqual(self.client.post("/feedback", json={"item_ids": [1, 3], "label": "dislike"}).status_code, 201)
+        after = self.client.post("/recommend", json={"temp_f": 75}).json()
+        self.assertGreater(after["version"], basic["version"])
+
+    def test_recommend_sees_writes_from_other_processes(self):
+        basic = self.client.post("/recommend", json={"temp_f": 75}).json()
+        other = sqlite3.connect(self.db_path)  # e.g. scripts/sync_db.py
+        with other:
+            other.execute("DELETE FROM items WHERE filename = 'black.jpg'")
+        other.close()
+        after = self.client.post("/recommend", json={"temp_f": 75}).json()
+        self.assertGreater(after["version"], basic["version"])
+        self.assertEqual([[i["id"] for i in o] for o in after["outfits"]], [[1, 2]])
+
+    def test_upload_is_tagged_in_background(self):
+        res = self.client.post("/items", files=[("files", ("red_shirt.png", png((200, 20, 20)), "image/png"))])
+        self.assertEqual(res.status_code, 202)
+        (item_id,) = res.json()["ids"]
+        deadline = time.time() + 10
+        while self.client.get(f"/items/{item_id}").json()["tag_status"] == "pending" and time.time() < deadline:
+            time.sleep(0.05)
+        item = self.client.get(f"/items/{item_id}").json()
+        self.assertEqual((item["type"], item["dominant_color"], item["tag_status"]), ("top", "rgb(200,20,20)", "done"))
+        thumb = self.client.get(f"/items/{item_id}/thumbnail")
+        self.assertEqual(thumb.status_code, 200)
+        self.assertEqual(self.client.post("/items", files=[("files", ("x.gif", b"GIF", "image/gif"))]).status_code, 415)
+        self.assertEqual(self.client.delete(f"/items/{item_id}").status_code, 204)
+        self.assertEqual(self.client.get("/health").json()["items"], 3)
+
+    def test_metrics_export(self):
+        was = metrics.enabled()
+        metrics.enable()
+        self.addCleanup(metrics.enable, was)
+        self.client.post("/recommend", json={"ranking": "feedback"})
+        text = self.client.get("/metrics").text
+        self.assertIn('ai_closet_latency_seconds_count{op="recommender.recommend"}', text)
+        snap = self.client.get("/metrics", params={"format": "json"}).json()
+        self.assertGreaterEqual(snap["histograms"]["recommender.top_k_pairs"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+import torch
+from PIL import Image
+
+from src.utils import colab_postprocess
+from src.vision.classifier import class_names, classify_images, load_model, tag_folder
+
+
+class TestBatchClassifier(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.images = os.path.join(self.tmp.name, "images")
+        os.makedirs(self.images)
+        rng = np.random.default_rng(0)
+        for i in range(5):
+            arr = rng.integers(0, 256, size=(300, 260, 3)).astype(np.uint8)
+            Image.fromarray(arr).save(os.path.join(self.images, f"img{i}.jpg"))
+        with open(os.path.join(self.images, "broken.jpg"), "wb") as f:
+            f.write(b"not a jpeg")
+
+    def test_batched_matches_one_at_a_time(self):
+        torch.manual_seed(0)
+        model = load_model(arch="resnet18")
+        paths = sorted(os.path.join(self.images, f) for f in os.listdir(self.images))
+        batched = list(classify_images(paths, model, batch_size=4, num_workers=0))
+        single = [r for p in paths for r in classify_images([p], model, batch_size=1, num_workers=0)]
+        self.assertEqual([r["image"] for r in batched], [p for p in paths if "broken" not in p])
+        self.assertEqual([r["top_classes"][0] for r in batched], [r["top_classes"][0] for r in single])
+        np.testing.assert_allclose([r["top_scores"] for r in batched], [r["top_scores"] for r in single], rtol=1e-3)
+
+    def test_quantized_model_runs(self):
+        model = load_model(arch="resnet18", quantize=True)
+        paths = [os.path.join(self.images, "img0.jpg")]
+        (row,) = classify_images(paths, model, class_names("resnet18"), num_workers=0, threads=1)
+        self.assertEqual(len(row["labels"]), 5)
+
+    def test_output_feeds_colab_postprocess(self):
+        weights = os.path.join(self.tmp.name, "resnet18.pth")
+        torch.save(load_model(arch="resnet18").state_dict(), weights)
+        raw = os.path.join(self.tmp.name, "tags_colab.csv")
+        self.assertEqual(tag_folder(self.images, raw, weights, arch="resnet18", batch_size=2, num_workers=2), 5)
+
+        out = os.path.join(self.tmp.name, "tags.csv")
+        colab_postprocess.main(raw, out, self.images, compute_color=False)
+        df = pd.read_csv(out)
+        self.assertEqual(sorted(df["filename"]), [f"img{i}.jpg" for i in range(5)])
+        self.assertTrue(set(df["type"]) <= {"top", "bottom", "shoes", "outerwear", "unknown"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from src.utils import colab_postprocess
+
+
+class TestColabPostprocess(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.images = os.path.join(self.tmp.name, "images")
+        os.makedirs(self.images)
+        rng = np.random.default_rng(0)
+        rows = []
+        for i in range(7):
+            name = f"img{i}.png"
+            Image.fromarray(np.full((32, 32, 3), rng.integers(0, 256, 3), dtype=np.uint8)).save(
+                os.path.join(self.images, name))
+            rows.append({"image": f"/content/{name}", "labels": "['jersey', 'sock']"})
+        rows.append({"image": "/content/missing.png", "labels": "['jean']"})
+        self.raw = os.path.join(self.tmp.name, "tags_colab.csv")
+        pd.DataFrame(rows).to_csv(self.raw, index=False)
+
+    def run_main(self, name, **kwargs):
+        out = os.path.join(self.tmp.name, name)
+        colab_postprocess.main(self.raw, out, self.images, compute_color=True, use_cache=False, **kwargs)
+        return pd.read_csv(out)
+
+    def test_process_pool_matches_single_process(self):
+        serial = self.run_main("serial.csv", workers=1, chunk_size=3)
+        pooled = self.run_main("pooled.csv", workers=2, chunk_size=3)
+        pd.testing.assert_frame_equal(serial, pooled)
+        self.assertEqual(serial["dominant_color"].notna().sum(), 7)
+        self.assertEqual(serial["type"].tolist(), ["top"] * 7 + ["bottom"])
+
+    def test_chunk_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            colab_postprocess.compute_colors(["a.png"], chunk_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,15 @@
+import os
+import sqlite3
+import tempfile
+import threading
 import pandas as pd
 import unittest
+from unittest import mock
 
 from src.utils.validate_data import validate_dataframe
-from src.utils.data_loader import load_tags_csv
+from src.db.db import init_db
+from src.utils import data_loader
+from src.utils.data_loader import load_tags_csv, sync_items_from_df, stream_and_sync
 
 
 class TestDataLoaderAndValidation(unittest.TestCase):
@@ -21,6 +28,39 @@ class TestDataLoaderAndValidation(unittest.TestCase):
         # Just basic sanity check; don't need exact text match
         self.assertTrue(any("filename" in msg.lower() for msg in issues))
 
+    def test_validate_dataframe_structured_issues_and_cap(self):
+        df = pd.DataFrame(
+            {
+                "filename": ["a.jpg", "b.jpg", "c.jpg", "d.jpg"],
+                "color": ["rgb(1,2,3)", "red", "rgb(1,2)", None],
+                "formality": [3, 9, "2.5", None],
+            }
+        )
+        report = validate_dataframe(df, max_issues=2)
+        by_code = {i.code: i for i in report.issues}
+        self.assertEqual(set(by_code), {"bad_color", "formality_range", "formality_not_int"})
+        self.assertEqual(by_code["bad_color"].column, "color")
+        self.assertEqual(by_code["bad_color"].rows.tolist(), [1, 2])
+        self.assertEqual(by_code["formality_range"].rows.tolist(), [1])
+        self.assertEqual(len(report), 4)
+        self.assertEqual(len(list(report)), 2)
+
+    def test_validate_dataframe_huge_and_infinite_formality(self):
+        df = pd.DataFrame(
+            {
+                "filename": ["a.jpg", "b.jpg", "c.jpg", "d.jpg", "e.jpg"],
+                "formality": ["1e20", float("inf"), float("-inf"), 9, 2],
+            }
+        )
+        report = validate_dataframe(df)
+        by_code = {i.code: i for i in report.issues}
+        self.assertEqual(set(by_code), {"formality_range"})
+        self.assertEqual(by_code["formality_range"].rows.tolist(), [0, 1, 2, 3])
+        messages = list(report)
+        self.assertIn("formality 1e+20 out of", messages[0])
+        self.assertIn("formality inf out of", messages[1])
+        self.assertIn("formality 9 out of", messages[3])
+
     def test_load_tags_csv_normalizes_columns(self):
         # This test assumes you will later create data/tags.csv
         # For now, just assert the function exists and raises FileNotFoundError
@@ -32,6 +72,85 @@ class TestDataLoaderAndValidation(unittest.TestCase):
         else:
             self.fail("Expected FileNotFoundError for missing CSV.")
 
+    def test_sync_items_upsert_is_idempotent(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "wardrobe.db")
+            init_db(db_path)
+            df = pd.DataFrame(
+                {
+                    "filename": ["a.jpg", None, "b.jpg", "d.jpg", "e.jpg", "f.jpg"],
+                    "image_name": [None, "c.jpg", None, None, None, None],
+                    "type": ["top", "bottom", None, None, None, None],
+                    "dominant_color": ["rgb(1,2,3)", None, "rgb(4,5,6)", None, None, None],
+                    "formality": ["2", "nope", 3.0, "2.7", "1e20", 9],
+                }
+            )
+            self.assertEqual(sync_items_from_df(df, upsert=True, db_path=db_path), 6)
+            df.loc[0, "type"] = "outerwear"
+            self.assertEqual(sync_items_from_df(df, upsert=True, db_path=db_path), 6)
+
+            conn = sqlite3.connect(db_path)
+            rows = conn.execute("SELECT filename, type, formality FROM items ORDER BY filename").fetchall()
+            conn.close()
+            self.assertEqual(rows, [("a.jpg", "outerwear", 2), ("b.jpg", None, 3), ("c.jpg", "bottom", None),
+                                    ("d.jpg", None, 2), ("e.jpg", None, None), ("f.jpg", None, 9)])
+
+    def test_stream_and_sync_resumes_after_interruption(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "wardrobe.db")
+            csv_path = os.path.join(tmp, "tags.csv")
+            init_db(db_path)
+            pd.DataFrame(
+                {"filename": [f"{i}.jpg" for i in range(10)], "type": "top", "formality": 2}
+            ).to_csv(csv_path, index=False)
+
+            real_sync = data_loader.sync_items_from_df
+            calls = []
+
+            def flaky_sync(df, **kwargs):
+                calls.append(len(df))
+                if len(calls) == 3:
+                    raise RuntimeError("interrupted")
+                return real_sync(df, **kwargs)
+
+            with mock.patch.object(data_loader, "sync_items_from_df", flaky_sync):
+                with self.assertRaises(RuntimeError):
+                    stream_and_sync(csv_path, chunksize=4, db_path=db_path)
+
+            # Plain inserts (no upsert): any re-processed chunk would duplicate rows
+            self.assertEqual(stream_and_sync(csv_path, chunksize=4, db_path=db_path), 2)
+            conn = sqlite3.connect(db_path)
+            names = [r[0] for r in conn.execute("SELECT filename FROM items")]
+            progress = conn.execute("SELECT COUNT(*) FROM ingest_progress").fetchone()[0]
+            conn.close()
+            self.assertEqual(sorted(names), sorted(f"{i}.jpg" for i in range(10)))
+            self.assertEqual(progress, 0)
+
+    def test_iter_tags_csv_skips_rows_by_number(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "tags.csv")
+            pd.DataFrame({"filename": [f"{i}.jpg" for i in range(10)]}).to_csv(csv_path, index=False)
+            chunks = list(data_loader.iter_tags_csv(csv_path, chunksize=4, skip_rows=6))
+            self.assertEqual([c.index.tolist() for c in chunks], [[6, 7, 8, 9]])
+            self.assertEqual(chunks[0]["filename"].tolist(), ["6.jpg", "7.jpg", "8.jpg", "9.jpg"])
+
+    def test_prefetch_stops_producer_when_consumer_fails(self):
+        closed = []
+
+        def chunks():
+            try:
+                for i in range(100):
+                    yield pd.DataFrame({"n": [i]})
+            finally:
+                closed.append(True)
+
+        threads = threading.active_count()
+        with self.assertRaises(RuntimeError):
+            for _ in data_loader._prefetch(chunks()):
+                raise RuntimeError("consumer failed")
+        self.assertEqual(closed, [True])
+        self.assertEqual(threading.active_count(), threads)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from src.db.db import init_db, add_items, query_items, close_all
+
+
+class TestQueryItems(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(close_all)
+        self.db = os.path.join(self.tmp.name, "wardrobe.db")
+        init_db(self.db)
+        types = ["top", "bottom", "shoes"]
+        add_items(
+            [(f"{i}.jpg", types[i % 3], "rgb(1,1,1)", None, "winter" if i % 2 else "summer", i % 6, None)
+             for i in range(30)],
+            db_path=self.db,
+        )
+
+    def test_filters(self):
+        rows = query_items(type="top", season="winter", formality_range=(2, 5), limit=100, db_path=self.db)
+        self.assertTrue(rows)
+        for row in rows:
+            type_, season, formality = row[2], row[5], row[6]
+            self.assertEqual((type_, season), ("top", "winter"))
+            self.assertTrue(2 <= formality <= 5)
+
+    def test_keyset_pages_cover_everything_once(self):
+        seen, cursor = [], None
+        while True:
+            page = query_items(type=["top", "bottom"], after_id=cursor, limit=7, db_path=self.db)
+            if not page:
+                break
+            seen.extend(r[0] for r in page)
+            cursor = page[-1][0]
+        self.assertEqual(len(seen), 20)
+        self.assertEqual(seen, sorted(set(seen), reverse=True))
+
+
+class TestMigration(unittest.TestCase):
+    def test_init_db_adds_and_backfills_color_columns(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = os.path.join(tmp, "old.db")
+            conn = sqlite3.connect(db)
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, filename TEXT NOT NULL, "
+                         "type TEXT, dominant_color TEXT, pattern TEXT, season TEXT, formality INTEGER, "
+                         "notes TEXT, added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+            conn.execute("INSERT INTO items(filename, dominant_color) VALUES('a.jpg', 'rgb(255,0,0)'), ('b.jpg', 'red')")
+            conn.commit()
+            conn.close()
+
+            init_db(db)
+            rows = query_items(db_path=db)
+            close_all()
+            by_name = {r[1]: r for r in rows}
+            self.assertEqual(by_name["a.jpg"][7], 0xFF0000)
+            self.assertAlmostEqual(by_name["a.jpg"][8], 53.24, places=2)
+            self.assertIsNone(by_name["b.jpg"][7])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import src.db.db as db
+from src.vision.embeddings import EmbeddingStore
+
+
+class TestEmbeddingStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "wardrobe.db")
+        db.init_db(self.db_path)
+        self.path = os.path.join(self.tmp.name, "embeddings.f16")
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(40, 32))
+        self.vectors = centers[rng.integers(0, 40, 3000)] + 0.2 * rng.normal(size=(3000, 32))
+        self.ids = list(range(1, 3001))
+
+    def tearDown(self):
+        db.close_all()
+        self.tmp.cleanup()
+
+    def open_store(self):
+        return EmbeddingStore(dim=32, path=self.path, db_path=self.db_path)
+
+    def test_exact_search_matches_brute_force(self):
+        store = self.open_store()
+        store.add(self.ids[:1000], self.vectors[:1000])
+        store.add(self.ids[1000:], self.vectors[1000:])  # grows the file
+        unit = self.vectors / np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        expected = np.argsort(-(unit @ unit[10]), kind="stable")[1:6] + 1
+        got = [i for i, _ in store.similar(11, k=5, exact=True)]
+        self.assertEqual(sorted(got), sorted(expected.tolist()))
+
+    def test_persists_and_forgets_deleted_items(self):
+        store = self.open_store()
+        store.add(self.ids, self.vectors)
+        store.add([5], self.vectors[[0]])  # overwrite with item 1's vector
+        self.assertTrue(store.remove(7))
+        reopened = self.open_store()
+        self.assertEqual(len(reopened), 2999)
+        self.assertNotIn(7, reopened)
+        np.testing.assert_allclose(reopened.get(5), reopened.get(1), atol=1e-3)
+        self.assertNotIn(7, [i for i, _ in reopened.similar(5, k=50, exact=True)])
+
+    def test_stores_sharing_a_file_get_distinct_rows(self):
+        a, b = self.open_store(), self.open_store()  # e.g. two processes
+        a.add(self.ids[:10], self.vectors[:10])
+        b.add(self.ids[10:20], self.vectors[10:20])
+        a.add([3], self.vectors[[3]])  # re-adding keeps the existing row
+        reopened = self.open_store()
+        self.assertEqual(len(reopened), 20)
+        self.assertEqual(sorted(reopened._row_of.values()), list(range(20)))
+        np.testing.assert_allclose(reopened.get(15), self.vectors[14] / np.linalg.norm(self.vectors[14]), atol=1e-3)
+
+    def test_ivf_pq_recall(self):
+        store = self.open_store()
+        store.add(self.ids, self.vectors)
+        store.build_index(nlist=40, nprobe=4, pq_m=8, rerank=64)
+        store.add([3001], self.vectors[[0]])  # indexed incrementally
+        hits = 0
+        for item_id in range(1, 3001, 100):
+            exact = {i for i, _ in store.similar(item_id, k=10, exact=True)}
+            approx = {i for i, _ in store.similar(item_id, k=10)}
+            hits += len(exact & approx)
+        self.assertGreaterEqual(hits / (30 * 10), 0.9)
+        self.assertIn(3001, [i for i, _ in store.similar(1, k=3)])
+
+        index_path = os.path.join(self.tmp.name, "ivf.npz")
+        store.index.save(index_path)
+        reopened = self.open_store()
+        reopened.load_index(index_path)
+        self.assertEqual(reopened.similar(1, k=5), store.similar(1, k=5))
+
+
+if __name__ == "__main__":
+    unittest.main()
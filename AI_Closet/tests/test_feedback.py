@@ -0,0 +1,68 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+import src.db.db as db
+from src.recommender.engine import item_features, top_k_pairs
+from src.recommender.feedback import FeedbackScorer, pair_features
+from src.recommender.rules import Item
+
+
+def random_items(n, type_, rng):
+    return [Item(i, type_, "rgb({},{},{})".format(*(rng.randrange(256) for _ in range(3))),
+                 season=rng.choice([None, "winter", "summer"]), formality=rng.choice([None, 1, 4]))
+            for i in range(n)]
+
+
+class TestFeedbackScorer(unittest.TestCase):
+    def test_pair_logits_match_feature_model(self):
+        rng = random.Random(0)
+        tops, others = random_items(30, "top", rng), random_items(20, "bottom", rng) + random_items(5, "shoes", rng)
+        scorer = FeedbackScorer()
+        for _ in range(20):
+            scorer.update([rng.choice(tops), rng.choice(others), rng.choice(others)], rng.random() < 0.5)
+        tf, of = item_features(tops), item_features(others)
+        a = {k: v[:, None] for k, v in tf.items()}
+        b = {k: v[None, :] for k, v in of.items()}
+        expected = pair_features(a, b) @ scorer.weights + scorer.type_weights[tf["type"][:, None], of["type"][None, :]]
+        np.testing.assert_allclose(scorer.pair_logits(a, b), expected, rtol=1e-5, atol=1e-5)
+        self.assertLessEqual(expected.max(), scorer.pair_upper() + 1e-5)
+
+    def test_feedback_moves_ranking(self):
+        rng = random.Random(1)
+        tops, bottoms = random_items(40, "top", rng), random_items(40, "bottom", rng)
+        scorer = FeedbackScorer()
+        t, b = top_k_pairs(tops, bottoms, k=1, score_fn=scorer.score_fn)[0][:2]
+        for _ in range(30):
+            scorer.update([tops[t], bottoms[b]], liked=False)
+        self.assertNotEqual(top_k_pairs(tops, bottoms, k=1, score_fn=scorer.score_fn)[0][:2], (t, b))
+
+    def test_learns_from_db_and_replays_history(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "wardrobe.db")
+            db.init_db(path)
+            try:
+                db.add_items([("tee.jpg", "top", "rgb(200,200,200)", None, "summer", 1, None),
+                              ("jeans.jpg", "bottom", "rgb(20,20,90)", None, "summer", 1, None),
+                              ("boots.jpg", "shoes", "rgb(90,60,30)", None, None, None, None)], db_path=path)
+                live = FeedbackScorer.from_db(path)
+                db.add_feedback([1, 2, 3], "like", db_path=path)
+                db.add_feedback([1, 3], "dislike", reason="clash", db_path=path)
+                self.assertEqual(live.updates, 2)
+                self.assertEqual(db.list_feedback(db_path=path)[1], (2, [1, 3], "dislike"))
+                with self.assertRaises(ValueError):
+                    db.add_feedback([1, 2], "meh", db_path=path)
+
+                replayed = FeedbackScorer.from_db(path, watch=False)
+                np.testing.assert_array_equal(replayed.weights, live.weights)
+                np.testing.assert_array_equal(replayed.type_weights, live.type_weights)
+                live.close()
+            finally:
+                db.close_all()
+
+
+if __name__ == "__main__":
+    unittest.main()
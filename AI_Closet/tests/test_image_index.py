@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from src.utils.image_index import ImageIndex
+
+
+class TestImageIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = self.tmp.name
+        for name in ("shirt.jpg", "pants.png", "pants.jpeg", "notes.txt", "coat.PNG"):
+            self.touch(name)
+        os.mkdir(os.path.join(self.dir, "sub"))
+        self.touch(os.path.join("sub", "hat.jpg"))
+
+    def touch(self, name):
+        with open(os.path.join(self.dir, name), "wb") as f:
+            f.write(b"x")
+
+    def test_resolves_like_find_image_path(self):
+        index = ImageIndex(self.dir)
+        p = lambda name: os.path.join(self.dir, name)
+        self.assertEqual(index.resolve("shirt.jpg"), p("shirt.jpg"))
+        self.assertEqual(index.resolve("shirt.png"), p("shirt.jpg"))        # other extension on disk
+        self.assertEqual(index.resolve("pants.png"), p("pants.png"))        # exact name wins
+        self.assertEqual(index.resolve("pants.webp"), p("pants.jpeg"))      # .jpeg preferred over .png
+        self.assertEqual(index.resolve("coat"), p("coat.PNG"))
+        self.assertEqual(index.resolve("sub/hat.jpg"), p(os.path.join("sub", "hat.jpg")))
+        self.assertIsNone(index.resolve("notes.txt"))
+        self.assertIsNone(index.resolve("missing.jpg"))
+        self.assertIsNone(index.resolve(""))
+        self.assertEqual(len(index), 4)
+
+    def test_rescans_only_when_directory_changes(self):
+        index = ImageIndex(self.dir, check_interval=0)
+        index.resolve("shirt.jpg")
+        old = os.stat(self.dir).st_mtime - 100  # make the listing look long settled
+        os.utime(self.dir, (old, old))
+        index.refresh(force=True)
+        scans = index.scans
+        for _ in range(5):
+            index.resolve("shirt.jpg")
+        self.assertEqual(index.scans, scans)
+
+        self.touch("socks.png")
+        os.remove(os.path.join(self.dir, "shirt.jpg"))
+        self.assertEqual(index.resolve("socks.jpg"), os.path.join(self.dir, "socks.png"))
+        self.assertIsNone(index.resolve("shirt.jpg"))
+        self.assertGreater(index.scans, scans)
+
+    def test_add_without_rescan(self):
+        index = ImageIndex(self.dir, check_interval=3600)
+        index.resolve("shirt.jpg")
+        self.touch("new.jpg")
+        index.add(os.path.join(self.dir, "new.jpg"))
+        self.assertEqual(index.resolve("new.png"), os.path.join(self.dir, "new.jpg"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import unittest
+
+import src.db.db as db
+from src.recommender.index import WardrobeIndex
+from src.recommender.cache import RecommendationCache
+from src.recommender.sampler import FeistelPermutation, sample_outfits
+from src.recommender.rules import basic_color_ok
+from src.recommender.rules import Item, recommend
+
+
+def random_item(rng, id_):
+    rgb = ",".join(str(rng.choice([10, 40, 200])) for _ in range(3))
+    return Item(id_, rng.choice(["top", "bottom", "outerwear", "shoes"]), f"rgb({rgb})")
+
+
+class TestWardrobeIndex(unittest.TestCase):
+    def test_matches_recommend_through_adds_and_deletes(self):
+        rng = random.Random(0)
+        index = WardrobeIndex()
+        items = {}
+        for id_ in range(1, 120):
+            items[id_] = random_item(rng, id_)
+            index.add(items[id_])
+        for id_ in rng.sample(sorted(items), 40):
+            self.assertTrue(index.remove(id_))
+            del items[id_]
+
+        newest_first = [items[i] for i in sorted(items, reverse=True)]
+        self.assertEqual(index.items(), newest_first)
+        for ctx in ({"temp_f": 50}, {"temp_f": 80}):
+            self.assertEqual(index.recommend(ctx, k=15), recommend(newest_first, ctx, k=15))
+
+    def test_follows_db_writes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "wardrobe.db")
+            db.init_db(path)
+            old_default = db.DEFAULT_DB
+            db.DEFAULT_DB = path  # add_item writes to the default DB
+            try:
+                index = WardrobeIndex.from_db(path)
+                top = db.add_item("tee.jpg", type_="top", dominant_color="rgb(200,200,200)")
+                bottom = db.add_item("jeans.jpg", type_="bottom", dominant_color="rgb(20,20,20)")
+                self.assertEqual([[i.id for i in o] for o in index.recommend({"temp_f": 70})], [[top, bottom]])
+
+                db.delete_item(bottom, db_path=path)
+                self.assertEqual(index.recommend({"temp_f": 70}), [])
+
+                db.add_items([("x.jpg", "bottom", "rgb(1,1,1)", None, None, None, None)], db_path=path)
+                self.assertTrue(index.stale)
+                index.reload()
+                self.assertEqual(len(index), 2)
+                index.close()
+            finally:
+                db.DEFAULT_DB = old_default
+                db.close_all()
+
+
+class TestSampler(unittest.TestCase):
+    def test_feistel_is_a_permutation(self):
+        for n in (1, 2, 7, 100, 1000):
+            perm = FeistelPermutation(n, seed=42)
+            self.assertEqual(sorted(perm(i) for i in range(n)), list(range(n)))
+
+    def test_samples_are_distinct_valid_and_deterministic(self):
+        rng = random.Random(3)
+        tops = [Item(i, "top", random_item(rng, i).color) for i in range(30)]
+        bottoms = [Item(100 + i, "bottom", random_item(rng, i).color) for i in range(20)]
+        outer = [Item(200, "outerwear", "rgb(90,60,30)")]
+        ctx = {"temp_f": 50, "occasion": "work"}
+
+        all_valid = sum(basic_color_ok(t.color, b.color) for t in tops for b in bottoms)
+        outfits = list(sample_outfits(tops, bottoms, ctx, seed=1, outerwear=outer))
+        self.assertEqual(len(outfits), all_valid)
+        self.assertEqual(len({(o[0].id, o[1].id) for o in outfits}), all_valid)
+        self.assertTrue(all(basic_color_ok(o[0].color, o[1].color) and o[2] is outer[0] for o in outfits))
+
+        again = list(sample_outfits(tops, bottoms, dict(ctx), seed=1, outerwear=outer))
+        self.assertEqual(again, outfits)
+        other = list(sample_outfits(tops, bottoms, ctx, seed=2, outerwear=outer))
+        self.assertNotEqual([o[:2] for o in other[:10]], [o[:2] for o in outfits[:10]])
+
+    def test_index_sample_after_deletes(self):
+        rng = random.Random(5)
+        index = WardrobeIndex()
+        for id_ in range(1, 60):
+            index.add(random_item(rng, id_))
+        for id_ in range(1, 60, 3):
+            index.remove(id_)
+        outfits = index.sample({"temp_f": 80}, seed=7, n=10)
+        for outfit in outfits:
+            self.assertTrue(all(item.id in index for item in outfit))
+        self.assertEqual(outfits, index.sample({"temp_f": 80}, seed=7, n=10))
+
+        # Same items, different add/remove history (and so _by_type order): same sample
+        fresh = WardrobeIndex()
+        for item in sorted(index.items(), key=lambda i: -i.id):
+            fresh.add(item)
+        self.assertEqual(fresh.sample({"temp_f": 80}, seed=7, n=10), outfits)
+
+    def test_index_sample_without_valid_pairs(self):
+        index = WardrobeIndex()
+        for id_ in range(1, 2001):
+            index.add(Item(id_, "top" if id_ <= 1000 else "bottom", "rgb(10,10,10)"))
+        t0 = time.perf_counter()
+        self.assertEqual(index.sample({"temp_f": 80}, seed=1, n=10), [])
+        self.assertLess(time.perf_counter() - t0, 0.5)
+
+        index.add(Item(5000, "bottom", "rgb(230,230,230)"))  # the only valid partner of every top
+        outfits = index.sample({"temp_f": 80}, seed=1, n=10)
+        self.assertEqual(len(outfits), 10)
+        self.assertTrue(all(o[1].id == 5000 for o in outfits))
+        self.assertEqual(len({o[0].id for o in outfits}), 10)
+
+
+class TestRecommendationCache(unittest.TestCase):
+    def test_hits_misses_and_lru_eviction(self):
+        cache = RecommendationCache(maxsize=2)
+        calls = []
+
+        def compute(tag):
+            return lambda: calls.append(tag) or [[tag, "b"]]
+
+        self.assertEqual(cache.get_or_compute(1, {"temp_f": 60.0, "occasion": "Work"}, compute("a")), [["a", "b"]])
+        # Same context after normalization -> hit; result is a fresh copy
+        hit = cache.get_or_compute(1, {"occasion": "work ", "temp_f": 60}, compute("x"))
+        hit[0].reverse()
+        self.assertEqual(cache.get_or_compute(1, {"temp_f": 60, "occasion": "work"}, compute("x")), [["a", "b"]])
+        # New wardrobe version -> miss; third key evicts the least recently used
+        cache.get_or_compute(2, {"temp_f": 60, "occasion": "work"}, compute("c"))
+        cache.get_or_compute(2, {"temp_f": 90, "occasion": "work"}, compute("d"))
+        self.assertEqual(calls, ["a", "c", "d"])
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (2, 3))
+
+    def test_db_writes_bump_version(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "wardrobe.db")
+            db.init_db(path)
+            before = db.wardrobe_version()
+            db.add_items([("x.jpg", "top", None, None, None, None, None)], db_path=path)
+            self.assertGreater(db.wardrobe_version(), before)
+            db.close_all()
+
+    def test_sees_writes_from_other_connections(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "wardrobe.db")
+            db.init_db(path)
+            try:
+                self.assertFalse(db.check_external_writes(path))  # baseline
+                index = WardrobeIndex.from_db(path)
+                db.add_items([("tee.jpg", "top", "rgb(200,200,200)", None, None, None, None)], db_path=path)
+                index.reload()
+                # In-process writes are already notified
+                self.assertFalse(db.check_external_writes(path))
+
+                other = sqlite3.connect(path)  # e.g. scripts/sync_db.py in another process
+                with other:
+                    other.execute("INSERT INTO items(filename, type, dominant_color) "
+                                  "VALUES('jeans.jpg', 'bottom', 'rgb(20,20,20)')")
+                other.close()
+                before = db.wardrobe_version()
+                self.assertTrue(db.check_external_writes(path))
+                self.assertGreater(db.wardrobe_version(), before)
+                self.assertTrue(index.stale)
+                index.reload()
+                self.assertEqual(len(index), 2)
+                self.assertFalse(db.check_external_writes(path))
+                index.close()
+            finally:
+                db.close_all()
+
+
+if __name__ == "__main__":
+    unittest.main()
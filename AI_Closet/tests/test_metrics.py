@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.db.db import add_items, close_all, init_db, query_items
+from src.recommender.rules import Item, recommend
+from src.utils import metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.was_enabled = metrics.enabled()
+        metrics.reset()
+        self.addCleanup(metrics.enable, self.was_enabled)
+        self.addCleanup(metrics.reset)
+
+    def test_disabled_records_nothing(self):
+        metrics.enable(False)
+
+        @metrics.timed("noop")
+        def f(x):
+            return x + 1
+
+        self.assertEqual(f(1), 2)
+        with metrics.span("block"):
+            pass
+        metrics.incr("events")
+        self.assertEqual(metrics.snapshot(), {"histograms": {}, "counters": {}})
+
+    def test_timed_and_span_fill_histograms(self):
+        metrics.enable()
+
+        @metrics.timed()
+        def boom():
+            raise ValueError
+
+        for _ in range(3):
+            with metrics.span("block"):
+                pass
+        with self.assertRaises(ValueError):
+            boom()
+        metrics.incr("events", 2)
+
+        snap = metrics.snapshot()
+        self.assertEqual(snap["histograms"]["block"]["count"], 3)
+        self.assertEqual(snap["histograms"]["block"]["buckets"]["+Inf"], 3)
+        self.assertIn(f"{__name__}.TestMetrics.test_timed_and_span_fill_histograms.<locals>.boom",
+                      snap["histograms"])  # failed calls are timed too
+        self.assertEqual(snap["counters"], {"events": 2})
+        self.assertEqual(json.loads(metrics.to_json()), snap)
+
+    def test_prometheus_text(self):
+        metrics.enable()
+        metrics.observe("db.list_items", 0.003)
+        metrics.observe("db.list_items", 0.2)
+        metrics.incr("db.connections")
+        text = metrics.to_prometheus()
+        self.assertIn("# TYPE ai_closet_latency_seconds histogram", text)
+        self.assertIn('ai_closet_latency_seconds_bucket{op="db.list_items",le="0.0025"} 0', text)
+        self.assertIn('ai_closet_latency_seconds_bucket{op="db.list_items",le="0.005"} 1', text)
+        self.assertIn('ai_closet_latency_seconds_bucket{op="db.list_items",le="+Inf"} 2', text)
+        self.assertIn('ai_closet_latency_seconds_count{op="db.list_items"} 2', text)
+        self.assertIn('ai_closet_events_total{name="db.connections"} 1', text)
+
+    def test_prometheus_counters_keep_full_precision(self):
+        metrics.enable()
+        metrics.incr("rows", 12_345_678)
+        metrics.incr("bytes", 0.1)
+        metrics.incr("bytes", 0.2)
+        text = metrics.to_prometheus()
+        self.assertIn('ai_closet_events_total{name="rows"} 12345678\n', text)
+        self.assertIn('ai_closet_events_total{name="bytes"} 0.30000000000000004\n', text)
+
+    def test_hot_paths_are_instrumented(self):
+        metrics.enable()
+        with tempfile.TemporaryDirectory() as tmp:
+            self.addCleanup(close_all)
+            db_path = os.path.join(tmp, "wardrobe.db")
+            init_db(db_path)
+            add_items([("tee.jpg", "top", "rgb(200,200,200)", None, None, 1, None)], db_path=db_path)
+            query_items(db_path=db_path)
+        recommend([Item(1, "top", "rgb(200,200,200)"), Item(2, "bottom", "rgb(20,20,90)")], {})
+
+        snap = metrics.snapshot()
+        for op in ("db.add_items", "db.query_items", "db.connect", "recommender.recommend",
+                   "recommender.top_k_pairs"):
+            self.assertIn(op, snap["histograms"])
+        self.assertEqual(snap["counters"]["recommender.pairs_scored"], 1)
+
+    def test_profiled_captures_one_block(self):
+        def work():
+            return sum(i * i for i in range(10_000))
+
+        with metrics.profiled(limit=10) as prof:
+            work()
+        self.assertIn("work", prof.text)
+        self.assertIsNotNone(prof.stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import itertools
+import random
+import unittest
+
+from src.recommender.outfit_search import (
+    default_pair_score, default_slots, context_mask, search_outfits,
+)
+from src.recommender.engine import item_features
+from src.recommender.rules import Item
+
+
+def random_items(n, seed=0):
+    rng = random.Random(seed)
+    items = []
+    for id_ in range(n):
+        rgb = ",".join(str(rng.randrange(256)) for _ in range(3))
+        items.append(Item(id_, rng.choice(["top", "bottom", "shoes", "outerwear"]), f"rgb({rgb})",
+                          season=rng.choice([None, "winter", "summer"]),
+                          formality=rng.choice([None, 0, 1, 2, 3, 4, 5])))
+    return items
+
+
+def brute_force(items, context, k):
+    slots = default_slots(context)
+    feats = item_features(items)
+    ok = context_mask(feats, context)
+    cands = [[i for i in range(len(items)) if ok[i] and items[i].type in s.types] for s in slots]
+
+    def score(combo):
+        total = 0.0
+        for (a, sa), (b, sb) in itertools.combinations(zip(combo, slots), 2):
+            fa = {key: v[[a]][:, None] for key, v in feats.items()}
+            fb = {key: v[[b]][None, :] for key, v in feats.items()}
+            total += float(default_pair_score(fa, fb, sa.name, sb.name).ravel()[0])
+        return total
+
+    scores = sorted((score(c) for c in itertools.product(*cands)), reverse=True)
+    return [s for s in scores if s != float("-inf")][:k]
+
+
+class TestOutfitSearch(unittest.TestCase):
+    def test_matches_brute_force(self):
+        for seed, ctx in enumerate([{"temp_f": 50, "occasion": "work", "season": "winter"},
+                                    {"temp_f": 80}, {"temp_f": 40, "occasion": "casual"}]):
+            items = random_items(60, seed)
+            got = [s for s, _ in search_outfits(items, ctx, k=8)]
+            expected = brute_force(items, ctx, 8)
+            self.assertEqual(len(got), len(expected))
+            for g, e in zip(got, expected):
+                self.assertAlmostEqual(g, e, places=4)
+
+    def test_outfits_respect_constraints(self):
+        items = random_items(300, 7)
+        ctx = {"temp_f": 50, "occasion": "formal", "season": "summer"}
+        for _, outfit in search_outfits(items, ctx, k=20):
+            self.assertEqual([i.type for i in outfit], ["top", "bottom", "shoes", "outerwear"])
+            for it in outfit:
+                self.assertIn(it.season, (None, "summer"))
+                self.assertTrue(it.formality is None or 3 <= it.formality <= 5)
+
+    def test_optional_slot_dropped_and_required_slot_empty(self):
+        items = [Item(1, "top", "rgb(250,250,250)"), Item(2, "bottom", "rgb(20,20,20)")]
+        ((_, outfit),) = search_outfits(items, {"temp_f": 50}, k=5)
+        self.assertEqual([i.id for i in outfit], [1, 2])
+        self.assertEqual(search_outfits(items[:1], {"temp_f": 50}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 
+import random
 import unittest
-from src.recommender.rules import Item, recommend
+from src.recommender.rules import Item, recommend, basic_color_ok, is_cool
+from src.recommender.engine import top_k_pairs, contrast_score, item_features
 
 class TestRules(unittest.TestCase):
     def test_recommend_minimal(self):
@@ -12,5 +14,32 @@ class TestRules(unittest.TestCase):
         recs = recommend(items, ctx)
         self.assertTrue(len(recs) >= 1)
 
+    def test_recommend_matches_nested_loop(self):
+        rng = random.Random(0)
+        items = [
+            Item(i, rng.choice(["top", "bottom", "outerwear"]),
+                 "rgb({},{},{})".format(*(rng.choice([10, 40, 200]) for _ in range(3))))
+            for i in range(80)
+        ]
+        ctx = {"temp_f": 50}
+        tops = [i for i in items if i.type == "top"]
+        bottoms = [i for i in items if i.type == "bottom"]
+        outer = [i for i in items if i.type == "outerwear"]
+        expected = [[t, b, outer[0]] for t in tops for b in bottoms if basic_color_ok(t.color, b.color)]
+        self.assertTrue(is_cool(ctx["temp_f"]))
+        self.assertEqual(recommend(items, ctx, k=25), expected[:25])
+
+    def test_top_k_pairs_small_blocks_match_brute_force(self):
+        rng = random.Random(1)
+        tops = [Item(i, "top", "rgb({},{},{})".format(*(rng.randrange(256) for _ in range(3)))) for i in range(37)]
+        bottoms = [Item(i, "bottom", "rgb({},{},{})".format(*(rng.randrange(256) for _ in range(3)))) for i in range(23)]
+        t = {k: v[:, None] for k, v in item_features(tops).items()}
+        b = {k: v[None, :] for k, v in item_features(bottoms).items()}
+        full = contrast_score(t, b)
+        brute = sorted(((float(full[i, j]), i, j) for i in range(37) for j in range(23) if full[i, j] > float("-inf")),
+                       key=lambda x: (-x[0], x[1], x[2]))[:15]
+        got = top_k_pairs(tops, bottoms, k=15, score_fn=contrast_score, block_elems=50)
+        self.assertEqual([(i, j) for i, j, _ in got], [(i, j) for _, i, j in brute])
+
 if __name__ == "__main__":
     unittest.main()
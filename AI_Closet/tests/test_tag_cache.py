@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from src.db.tag_cache import TagCache
+
+
+class TestTagCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = TagCache(os.path.join(self.tmp.name, "tag_cache.db"), max_entries=2)
+        self.addCleanup(self.cache.close)
+
+    def _write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_hit_by_content_and_miss_after_change(self):
+        a = self._write("a.jpg", b"aaaa")
+        self.cache.store({a: {"dominant_color": "rgb(1,2,3)", "type": "top"}})
+        self.assertEqual(self.cache.lookup([a]), {a: {"dominant_color": "rgb(1,2,3)", "type": "top"}})
+
+        # Same bytes under another name share the entry
+        copy = self._write("copy.jpg", b"aaaa")
+        self.assertIn(copy, self.cache.lookup([copy]))
+
+        # New content at the same path is a miss (fresh cache, no in-session memo)
+        self._write("a.jpg", b"bbbbbb")
+        fresh = TagCache(self.cache.db_path)
+        self.addCleanup(fresh.close)
+        self.assertEqual(fresh.lookup([a]), {})
+
+    def test_rewritten_file_is_a_miss_in_the_same_session(self):
+        a = self._write("shirt.png", b"red!")
+        self.cache.store({a: {"dominant_color": "rgb(200,20,20)", "type": "top"}})
+        self.assertIn(a, self.cache.lookup([a]))
+
+        # Re-upload under the same name: new content, same size
+        st = os.stat(a)
+        self._write("shirt.png", b"grn!")
+        os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        self.assertEqual(self.cache.lookup([a]), {})
+        self.cache.store({a: {"dominant_color": "rgb(20,200,20)", "type": "top"}})
+        self.assertEqual(self.cache.lookup([a])[a]["dominant_color"], "rgb(20,200,20)")
+
+    def test_evicts_least_recently_used(self):
+        paths = [self._write(f"{i}.jpg", bytes([i]) * 4) for i in range(3)]
+        for p in paths:
+            self.cache.store({p: {"dominant_color": "rgb(0,0,0)", "type": "top"}})
+        self.assertEqual(set(self.cache.lookup(paths)), set(paths[1:]))
+
+
+if __name__ == "__main__":
+    unittest.main()
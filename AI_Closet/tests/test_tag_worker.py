@@ -0,0 +1,119 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+import src.db.db as db
+from src.db.tag_cache import TagCache
+from src.recommender.index import WardrobeIndex
+from src.vision.tag_worker import TagWorker
+
+
+class TestTagQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(db.close_all)
+        self.db_path = os.path.join(self.tmp.name, "wardrobe.db")
+        self.cache_path = os.path.join(self.tmp.name, "tag_cache.db")
+        db.init_db(self.db_path)
+
+    def image(self, name, rgb):
+        path = os.path.join(self.tmp.name, name)
+        Image.fromarray(np.full((64, 64, 3), rgb, dtype=np.uint8)).save(path)
+        return path
+
+    def statuses(self):
+        return {r[1]: r[11] for r in db.all_items(self.db_path)}
+
+    def test_uploads_are_pending_until_tagged(self):
+        index = WardrobeIndex.from_db(self.db_path)
+        self.addCleanup(index.close)
+        files = [("red_shirt.png", self.image("red_shirt.png", (200, 20, 20))),
+                 ("jeans.png", self.image("jeans.png", (20, 20, 120))),
+                 ("gone.png", os.path.join(self.tmp.name, "gone.png"))]
+        ids = db.enqueue_uploads(files, self.db_path)
+        self.assertEqual(set(self.statuses().values()), {"pending"})
+        self.assertEqual(len(index), 3)
+
+        worker = TagWorker(batch_size=2, db_path=self.db_path)
+        with TagCache(self.cache_path) as cache:
+            while worker.run_once(cache):
+                pass
+        self.assertEqual(self.statuses(), {"red_shirt.png": "done", "jeans.png": "done", "gone.png": "failed"})
+        rows = {r[0]: r for r in db.all_items(self.db_path)}
+        self.assertEqual(rows[ids[0]][2:4], ("top", "rgb(200,20,20)"))
+        self.assertEqual(rows[ids[1]][7], 0x141478)  # numeric color columns filled too
+        self.assertEqual(db.tag_queue_counts(self.db_path), {"done": 2, "failed": 1})
+        self.assertEqual([i.type for i in index.items()], ["unknown", "bottom", "top"])
+
+    def test_interrupted_jobs_resume_after_restart(self):
+        db.enqueue_uploads([(f"tee{i}.png", self.image(f"tee{i}.png", (i, 200, 90))) for i in range(5)],
+                           self.db_path)
+        # Then the process "dies" and its lease runs out
+        self.assertEqual(len(db.claim_tag_jobs(3, self.db_path, lease=0)), 3)
+        worker = TagWorker(workers=2, poll_interval=0.05, db_path=self.db_path, cache_path=self.cache_path)
+        worker.start()
+        try:
+            deadline = time.time() + 10
+            while db.tag_queue_counts(self.db_path) != {"done": 5} and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            worker.stop()
+        self.assertEqual(db.tag_queue_counts(self.db_path), {"done": 5})
+        self.assertEqual(set(self.statuses().values()), {"done"})
+
+    def test_start_leaves_jobs_of_live_workers_alone(self):
+        db.enqueue_uploads([(f"tee{i}.png", self.image(f"tee{i}.png", (i, 200, 90))) for i in range(3)],
+                           self.db_path)
+        claimed = db.claim_tag_jobs(2, self.db_path)  # a worker in another process, still running
+        self.assertEqual(db.requeue_running_jobs(self.db_path), 0)
+        worker = TagWorker(db_path=self.db_path, cache_path=self.cache_path)
+        with TagCache(self.cache_path) as cache:
+            self.assertEqual(worker.run_once(cache), 1)  # only the unclaimed job
+            self.assertEqual(worker.run_once(cache), 0)
+        self.assertEqual(db.tag_queue_counts(self.db_path), {"running": 2, "done": 1})
+        for job_id, item_id, path in claimed:  # the other worker finishes its jobs
+            db.finish_tag_job(job_id, item_id, "top", "rgb(1,200,90)", db_path=self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        attempts = [a for (a,) in conn.execute("SELECT attempts FROM tag_jobs ORDER BY id")]
+        conn.close()
+        self.assertEqual(attempts, [1, 1, 1])
+
+    def test_failed_batch_releases_its_jobs(self):
+        db.enqueue_uploads([(f"tee{i}.png", self.image(f"tee{i}.png", (i, 200, 90))) for i in range(3)],
+                           self.db_path)
+        worker = TagWorker(workers=1, batch_size=3, poll_interval=0.05, db_path=self.db_path,
+                           cache_path=self.cache_path)
+        calls = []
+
+        def flaky(name):
+            calls.append(name)
+            if len(calls) == 2:
+                raise RuntimeError("classifier crashed")
+            return "top"
+
+        with mock.patch("src.vision.tag_worker.classify_type_from_name", flaky), \
+                self.assertLogs("src.vision.tag_worker", level="ERROR"):
+            worker.start()
+            try:
+                deadline = time.time() + 10
+                while db.tag_queue_counts(self.db_path) != {"done": 3} and time.time() < deadline:
+                    time.sleep(0.05)
+            finally:
+                worker.stop()
+        # The crash cost the two unfinished jobs one attempt; the thread survived and retried them
+        self.assertEqual(db.tag_queue_counts(self.db_path), {"done": 3})
+        conn = sqlite3.connect(self.db_path)
+        attempts = [a for (a,) in conn.execute("SELECT attempts FROM tag_jobs ORDER BY id")]
+        conn.close()
+        self.assertEqual(attempts, [1, 2, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
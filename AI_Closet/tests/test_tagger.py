@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from src.vision.tagger import extract_dominant_colors
+
+
+class TestDominantColors(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _save(self, name, arr):
+        path = os.path.join(self.tmp.name, name)
+        Image.fromarray(arr.astype(np.uint8)).save(path)
+        return path
+
+    def test_batch_matches_solid_and_majority_colors(self):
+        solid = self._save("solid.png", np.full((64, 64, 3), (10, 120, 200)))
+        mostly_red = np.full((128, 128, 3), (240, 240, 240))
+        mostly_red[10:118, 10:118] = (200, 30, 30)
+        red = self._save("red.png", mostly_red)
+
+        self.assertEqual(extract_dominant_colors([solid, red]), ["rgb(10,120,200)", "rgb(200,30,30)"])
+
+    def test_unreadable_image_yields_none(self):
+        bad = os.path.join(self.tmp.name, "bad.jpg")
+        with open(bad, "wb") as f:
+            f.write(b"not an image")
+        good = self._save("good.png", np.full((32, 32, 3), 50))
+        self.assertEqual(extract_dominant_colors([bad, good]), [None, "rgb(50,50,50)"])
+
+
+if __name__ == "__main__":
+    unittest.main()
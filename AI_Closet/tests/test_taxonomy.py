@@ -0,0 +1,70 @@
+import os
+import unittest
+
+import pandas as pd
+
+from src.utils.colab_postprocess import to_coarse_type
+from src.utils.taxonomy import classify, classify_labels, classify_series
+from src.vision.tagger import classify_type_from_name
+
+TAGS_CSV = os.path.join(os.path.dirname(__file__), "..", "data", "tags.csv")
+
+
+class TestTaxonomy(unittest.TestCase):
+    def test_filename_keywords(self):
+        self.assertEqual(classify("grey_sweatshirt.jpg"), "top")
+        self.assertEqual(classify("laptop_bag.jpg"), "unknown")
+        self.assertEqual(classify("stolen.jpg"), "unknown")
+        self.assertEqual(classify("jeans-01.png"), "bottom")
+        self.assertEqual(classify("RedSneakers2.JPG"), "shoes")
+        self.assertEqual(classify("ShirtBlue.png"), "top")
+
+    def test_filenames_with_glued_words(self):
+        expected = {"tshirt.jpg": "top", "TShirt.png": "top", "sweatpants.jpg": "bottom", "tanktop.png": "top",
+                    "workboots.jpg": "shoes", "rainjacket.jpg": "outerwear", "short_sleeve_top.jpg": "top",
+                    "shortsleevetop.jpg": "top", "sweatshorts.jpg": "bottom"}
+        self.assertEqual({name: classify(name) for name in expected}, expected)
+
+    def test_tags_csv_filenames(self):
+        names = pd.read_csv(TAGS_CSV)["filename"]
+        types = dict(zip(names, classify_series(names)))
+        self.assertEqual({name: classify(name) for name in names}, types)
+        for name, type_ in [("bluejeans.jpeg", "bottom"), ("darkbluejeans.jpeg", "bottom"),
+                            ("longjeanskirt.jpeg", "bottom"), ("blackjacket.jpeg", "outerwear"),
+                            ("browncoat.jpeg", "outerwear"), ("blueshirt.jpeg", "top"),
+                            ("whitesweater.jpeg", "top"), ("redblackflannel.jpeg", "top"),
+                            ("whitewomenlongsleeve.jpeg", "top"), ("yellowwomanshortsleevetop.jpeg", "top"),
+                            ("blackshoes.jpeg", "shoes"), ("colorfulshoes.jpeg", "shoes"),
+                            ("blackbeanie.jpeg", "unknown"), ("brownhat.jpg", "unknown")]:
+            self.assertEqual(types[name], type_, name)
+
+    def test_labels_match_whole_words(self):
+        self.assertEqual(classify_labels(["desktop computer", "laptop"]), "unknown")
+        self.assertEqual(classify_labels(["sweatshirt"]), "top")
+        self.assertEqual(classify_labels(["bluejeans"]), "unknown")
+
+    def test_one_type_per_keyword(self):
+        # Filenames and labels agree: hoodie is a top everywhere
+        self.assertEqual(classify_type_from_name("zip_hoodie.jpg"), "top")
+        self.assertEqual(to_coarse_type(["hoodie"]), "top")
+        self.assertEqual(classify("long_trench_coat.jpg"), "outerwear")
+
+    def test_most_confident_label_wins(self):
+        self.assertEqual(to_coarse_type(["running shoe", "jersey"]), "shoes")
+        self.assertEqual(to_coarse_type(["jersey", "running shoe"]), "top")
+        self.assertEqual(to_coarse_type(["mask", "bolo tie"]), "unknown")
+
+    def test_classify_series_matches_classify(self):
+        values = pd.Series(["blue_tee.jpg", None, ["jean", "coat"], "['cardigan', 'stole']", "blue_tee.jpg", "x"],
+                           index=[10, 11, 12, 13, 14, 15])
+        expected = ["top", "unknown", "bottom", "top", "top", "unknown"]
+        out = classify_series(values)
+        self.assertEqual(out.tolist(), expected)
+        self.assertEqual(out.index.tolist(), values.index.tolist())
+        labels = pd.Series(["['laptop', 'jersey']", "['desktop computer']", ["bluejeans", "shoe"]])
+        self.assertEqual(classify_series(labels, labels=True).tolist(), ["top", "unknown", "shoes"])
+        self.assertEqual(classify_series(pd.Series([], dtype=object)).tolist(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from src.vision.thumbnails import THUMB_SIZES, ThumbnailStore
+
+
+class TestThumbnailStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache_dir = os.path.join(self.tmp.name, "thumbs")
+        rng = np.random.default_rng(0)
+        self.photos = []
+        for i in range(4):
+            path = os.path.join(self.tmp.name, f"photo{i}.jpg")
+            Image.fromarray(rng.integers(0, 256, size=(1200, 900, 3)).astype(np.uint8)).save(path, quality=95)
+            self.photos.append(path)
+
+    def test_generate_then_get_reuses_content_addressed_files(self):
+        store = ThumbnailStore(self.cache_dir)
+        made = store.generate(self.photos[0])
+        self.assertEqual(set(made), set(THUMB_SIZES))
+        for size, path in made.items():
+            with Image.open(path) as img:
+                self.assertEqual(max(img.size), THUMB_SIZES[size])
+        self.assertLess(os.path.getsize(made["small"]), os.path.getsize(self.photos[0]) / 10)
+
+        copy = os.path.join(self.tmp.name, "renamed.jpg")
+        shutil.copy(self.photos[0], copy)
+        self.assertEqual(store.get(copy, "small"), made["small"])  # same content, same file
+
+    def test_lazy_get_and_unreadable_source(self):
+        store = ThumbnailStore(self.cache_dir)
+        path = store.get(self.photos[1], "medium")
+        self.assertTrue(os.path.exists(path))
+        bad = os.path.join(self.tmp.name, "bad.jpg")
+        with open(bad, "wb") as f:
+            f.write(b"not an image")
+        self.assertIsNone(store.get(bad))
+        self.assertIsNone(store.get(os.path.join(self.tmp.name, "missing.jpg")))
+
+    def test_lru_eviction_by_size(self):
+        store = ThumbnailStore(self.cache_dir)
+        one = os.path.getsize(store.get(self.photos[0]))
+        store = ThumbnailStore(self.cache_dir, max_bytes=int(one * 2.5))
+        old = store.get(self.photos[0])
+        os.utime(old, (1, 1))  # long unused
+        store.get(self.photos[1])
+        store.get(self.photos[2])
+        store.get(self.photos[3])
+        self.assertFalse(os.path.exists(old))
+        self.assertLessEqual(store.bytes_used(), store.max_bytes)
+        self.assertTrue(os.path.exists(store.get(self.photos[3])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+from src.recommender.rules import recommend
+from src.utils.wardrobe_store import WardrobeStore
+
+CSV = """item_id,category,color,material,image_path
+1,pants,black,denim,images/pants1.jpg
+2,shirt,"rgb(240,240,240)",cotton,images/shirt1.jpg
+3,jacket,navy,wool,images/jacket1.jpg
+4,dress,mauve-ish,silk,
+"""
+
+
+class TestWardrobeStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.csv = os.path.join(self.tmp.name, "cleaned_tags.csv")
+        with open(self.csv, "w") as f:
+            f.write(CSV)
+
+    def test_columns_and_lookup(self):
+        store = WardrobeStore.load(self.csv)
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store.ids, [1, 2, 3, 4])
+        self.assertEqual(store.columns["type"].tolist(), ["bottom", "top", "outerwear", "unknown"])
+        self.assertEqual(store.get(3), {"id": 3, "name": "jacket1", "category": "jacket", "type": "outerwear",
+                                        "color": "navy", "rgb": 0x000080, "image_path": "images/jacket1.jpg"})
+        self.assertEqual(store.get(2)["rgb"], 0xF0F0F0)
+        self.assertEqual(store.get(4)["name"], "item 4")  # no image to name it after
+        self.assertEqual(store.get(4)["rgb"], 0x808080)   # unknown color -> gray
+        self.assertIsNone(store.get(99))
+        self.assertNotIn(99, store)
+
+    def test_items_feed_the_recommender(self):
+        store = WardrobeStore.load(self.csv)
+        self.assertIs(store.items(), store.items())
+        outfits = recommend(store.items(), {"temp_f": 50})
+        self.assertEqual([[i.id for i in o] for o in outfits], [[2, 1, 3]])
+
+    def test_snapshot_reused_until_csv_changes(self):
+        snap = os.path.join(self.tmp.name, "cleaned_tags.npz")
+        WardrobeStore.load(self.csv)
+        self.assertTrue(os.path.exists(snap))
+        loaded = WardrobeStore.from_snapshot(snap)
+        self.assertEqual(loaded.get(1), WardrobeStore.load(self.csv).get(1))
+
+        with open(self.csv, "a") as f:
+            f.write("5,skirt,beige,linen,images/skirt1.jpg\n")
+        later = time.time() + 5
+        os.utime(self.csv, (later, later))
+        store = WardrobeStore.load(self.csv)
+        self.assertEqual(store.get(5)["type"], "bottom")
+        self.assertEqual(len(WardrobeStore.from_snapshot(snap)), 5)
+
+    def test_tags_csv_columns(self):
+        df = pd.DataFrame({"filename": ["a.jpg", "b.jpg"], "type": ["top", "bottom"],
+                           "dominant_color": ["rgb(1,2,3)", None]})
+        store = WardrobeStore.from_frame(df)
+        self.assertEqual(store.ids, [1, 2])
+        self.assertEqual(store.columns["name"].tolist(), ["a", "b"])
+        self.assertEqual(store.get(1)["rgb"], 0x010203)
+
+
+if __name__ == "__main__":
+    unittest.main()